@@ -7,57 +7,42 @@
 # google scholar: https://scholar.google.com/citations?user=NPq5a_0AAAAJ&hl=en
 # Copyright (C) 2021. All Rights Reserved.
 
-def pre_word_segment(file=None, seg_fn=None):
-    import pandas as pd
-    
-    # Baca file CSV
-    df = pd.read_csv('dataset/gabungan_dataset.csv')
-    
-    # Ambil kolom yang berisi teks (sesuaikan dengan nama kolom di dataset Anda)
-    texts = df['Cleaned_Tweet'].tolist()
-    
-    # Proses segmentasi untuk setiap teks
-    segmented_texts = []
-    for text in texts:
-        if isinstance(text, str):
-            # Segmentasi teks
-            segmented = ' '.join(seg_fn(text))
-            segmented_texts.append(segmented)
-        else:
-            segmented_texts.append('')
-    
-    # Simpan hasil segmentasi ke DataFrame baru
-    df['Segmented_Text'] = segmented_texts
-    
-    # Simpan hasil ke file baru
-    output_file = file.replace('.csv', '_segmented.csv')
-    df.to_csv(output_file, index=False)
-    
-    print('Segmentation done! Results saved to:', output_file)
+import argparse
+
+from segmenter import CHUNK_SIZE, SEGMENTERS, segment_file
+
+
+def pre_word_segment(file=None, seg_fn=None, text_column='Cleaned_Tweet', chunksize=CHUNK_SIZE,
+                     workers=None, use_cache=True):
+    # seg_fn: nama di segmenter.SEGMENTERS ("simple", "sastrawi", ...) atau fungsi text -> list token.
+    # File dibaca per chunk; hasil segmentasi di-cache per hash teks (dataset/.cache/segments.db),
+    # jadi setelah dataset bertambah hanya baris baru yang diproses ulang.
+    file = file or 'dataset/gabungan_dataset.csv'
+    output_file, rows = segment_file(
+        file,
+        seg_fn=seg_fn or 'simple',
+        text_column=text_column,
+        chunksize=chunksize,
+        use_cache=use_cache,
+        workers=workers,
+    )
+    print(f'Segmentation done! {rows} rows saved to:', output_file)
+    return output_file
 
 
 if __name__ == '__main__':
     # Before annotating non-blank segmented text, you need to segment the data.
-    # You can try other word segmentation tools here and PR to this repo.
+    # You can try other word segmentation tools here and PR to this repo
+    # (daftarkan dengan segmenter.register_segmenter).
+    parser = argparse.ArgumentParser(description="Segmentasi kata untuk data non-Inggris")
+    parser.add_argument("--input", default="dataset/gabungan_dataset.csv")
+    parser.add_argument("--seg-fn", default="simple", choices=sorted(SEGMENTERS))
+    parser.add_argument("--text-column", default="Cleaned_Tweet")
+    parser.add_argument("--chunksize", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--no-cache", action="store_true", help="segmentasi ulang semua baris")
+    args = parser.parse_args()
 
-    # Gunakan metode tokenisasi sederhana
-    def simple_tokenize(text):
-        if not isinstance(text, str):
-            return []
-        # Pisahkan berdasarkan spasi dan tanda baca
-        import re
-        # Pisahkan tanda baca dari kata
-        text = re.sub(r'([.,!?;:])', r' \1 ', text)
-        # Hilangkan karakter khusus dan angka
-        text = re.sub(r'[^a-zA-Z\s.,!?;:]', ' ', text)
-        # Pisahkan berdasarkan spasi
-        tokens = [token.strip() for token in text.split() if token.strip()]
-        return tokens
-    
-    # Gunakan tokenizer sederhana
-    seg_fn = simple_tokenize
-    
-    # Proses file gabungan_dataset.csv
-    input_file = 'dataset/gabungan_dataset.csv'
-    print(f"Processing file: {input_file}")
-    pre_word_segment(file=input_file, seg_fn=seg_fn)
+    print(f"Processing file: {args.input}")
+    pre_word_segment(file=args.input, seg_fn=args.seg_fn, text_column=args.text_column,
+                     chunksize=args.chunksize, workers=args.workers, use_cache=not args.no_cache)
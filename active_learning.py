@@ -0,0 +1,187 @@
+import heapq
+import math
+import threading
+from collections import defaultdict
+
+# ==== Penjadwal active learning ====
+# Tweet belum dilabeli diurutkan berdasarkan ketidakpastian model: yang paling
+# membingungkan model dikerjakan lebih dulu, sehingga akurasi target tercapai
+# dengan label yang jauh lebih sedikit dibanding urutan file mentah.
+#
+# Skor dihitung dari prediksi di PredictionCache (diisi PrelabelService):
+#   entropy    entropi distribusi probabilitas sentimen
+#   margin     1 - (p_tertinggi - p_kedua)
+#   committee  vote entropy antar versi model (checkpoint) yang berbeda
+# Thread background menarik prediksi baru secara inkremental (watermark
+# rowid), mengirim tweet yang belum punya skor ke PrelabelService, dan
+# membangun ulang antrian prioritas setiap ada label / prediksi baru.
+
+STRATEGIES = ("entropy", "margin", "committee")
+DEFAULT_STRATEGY = "entropy"
+RESCORE_INTERVAL = 30.0
+SUBMIT_CHUNK = 256
+
+
+def entropy(probs):
+    total = sum(probs)
+    if total <= 0:
+        return 0.0
+    return -sum((p / total) * math.log(p / total) for p in probs if p > 0)
+
+
+def margin(probs):
+    if len(probs) < 2:
+        return 0.0
+    top, second = heapq.nlargest(2, probs)
+    return 1.0 - (top - second)
+
+
+def vote_entropy(votes):
+    counts = defaultdict(int)
+    for vote in votes:
+        counts[vote] += 1
+    return entropy(list(counts.values()))
+
+
+def _probs_or_confidence(prediction):
+    # Model tanpa probabilitas per kelas: pakai confidence kelas terpilih
+    if prediction.get("probs"):
+        return prediction["probs"]
+    confidence = prediction["confidence"]
+    return [confidence, 1.0 - confidence]
+
+
+class ActiveLearningScheduler:
+    def __init__(self, prelabeler, tweet_ids, items, completed_ids, strategy=DEFAULT_STRATEGY,
+                 interval=RESCORE_INTERVAL):
+        # tweet_ids: ID unik dalam urutan file (urutan cadangan untuk yang belum berskor)
+        # items: fungsi tweet_id -> (tweet_id, tweet, [kandidat aspek]) untuk PrelabelService
+        # completed_ids: fungsi tanpa argumen -> ID yang sudah dilabeli
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Strategi tidak dikenal: {strategy}")
+        self.prelabeler = prelabeler
+        self.tweet_ids = list(tweet_ids)
+        self.items = items
+        self.completed_ids = completed_ids
+        self.strategy = strategy
+        self.interval = interval
+
+        self._watermark = 0
+        # tweet_id -> {model_version: {aspek: prediksi}}
+        self._predictions = defaultdict(lambda: defaultdict(dict))
+        self._scores = {}
+        self._order = list(self.tweet_ids)
+        self._rank = {tweet_id: i for i, tweet_id in enumerate(self._order)}
+        self._submitted = set()
+        self.rescored = 0
+        self.last_error = None
+
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._dirty = True
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name="active-learning", daemon=True)
+        self._thread.start()
+
+    # ---- Dipanggil dari script Streamlit ----
+    def ordered_ids(self):
+        # Urutan prioritas terbaru (paling tidak pasti dulu), tanpa menunggu worker
+        with self._lock:
+            return self._order
+
+    def rank(self, tweet_id):
+        # Posisi di antrian prioritas (kecil = dikerjakan lebih dulu)
+        with self._lock:
+            return self._rank.get(tweet_id, len(self._rank))
+
+    def score(self, tweet_id):
+        with self._lock:
+            return self._scores.get(tweet_id)
+
+    def notify(self):
+        # Ada label / prediksi baru: bangun ulang antrian secepatnya
+        with self._lock:
+            self._dirty = True
+            self._wakeup.notify()
+
+    def status(self):
+        with self._lock:
+            return {"strategy": self.strategy, "scored": len(self._scores),
+                    "total": len(self.tweet_ids), "rescored": self.rescored, "last_error": self.last_error}
+
+    def stop(self):
+        with self._lock:
+            self._stopped = True
+            self._wakeup.notify()
+        self._thread.join(timeout=5)
+
+    # ---- Skor ----
+    def _score(self, by_version):
+        version = self.prelabeler.version
+        if self.strategy == "committee":
+            # Satu suara per versi model, per aspek; ambil aspek paling diperdebatkan
+            aspects = {aspek for predictions in by_version.values() for aspek in predictions}
+            if not aspects:
+                return None
+            return max(
+                vote_entropy([p[aspek]["sentimen"] for p in by_version.values() if aspek in p])
+                for aspek in aspects
+            )
+        predictions = by_version.get(version)
+        if not predictions:
+            return None
+        measure = entropy if self.strategy == "entropy" else margin
+        return max(measure(_probs_or_confidence(p)) for p in predictions.values())
+
+    def _rescore(self):
+        new_predictions = self.prelabeler.cache.since(self._watermark)
+        changed = set()
+        for prediction in new_predictions:
+            self._watermark = max(self._watermark, prediction["rowid"])
+            self._predictions[prediction["tweet_id"]][prediction["model_version"]][prediction["aspek"]] = prediction
+            changed.add(prediction["tweet_id"])
+
+        scores = dict(self._scores)
+        for tweet_id in changed:
+            score = self._score(self._predictions[tweet_id])
+            if score is not None:
+                scores[tweet_id] = score
+
+        completed = {str(tweet_id) for tweet_id in self.completed_ids()}
+        position = {tweet_id: i for i, tweet_id in enumerate(self.tweet_ids)}
+        # Priority queue: skor tertinggi dulu, seri -> urutan file
+        heap = [(-score, position.get(tweet_id, 0), tweet_id)
+                for tweet_id, score in scores.items() if tweet_id not in completed]
+        heapq.heapify(heap)
+        ranked = [heapq.heappop(heap)[2] for _ in range(len(heap))]
+        ranked_set = set(ranked)
+        order = ranked + [tweet_id for tweet_id in self.tweet_ids
+                          if tweet_id not in ranked_set and tweet_id not in completed]
+
+        # Tweet yang belum punya skor dikirim ke model sedikit demi sedikit
+        pending = [tweet_id for tweet_id in order if tweet_id not in scores and tweet_id not in self._submitted]
+        chunk = pending[:SUBMIT_CHUNK]
+        self._submitted.update(chunk)
+        self.prelabeler.submit(self.items(tweet_id) for tweet_id in chunk)
+
+        with self._lock:
+            self._scores = scores
+            self._order = order
+            self._rank = {tweet_id: i for i, tweet_id in enumerate(order)}
+            self.rescored += len(changed)
+            self.last_error = None
+
+    def _run(self):
+        while True:
+            with self._lock:
+                if not self._dirty and not self._stopped:
+                    self._wakeup.wait(timeout=self.interval)
+                if self._stopped:
+                    return
+                self._dirty = False
+            try:
+                self._rescore()
+            except Exception as e:
+                # Dicoba lagi di putaran berikutnya
+                with self._lock:
+                    self.last_error = f"{type(e).__name__}: {e}"
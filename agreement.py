@@ -0,0 +1,274 @@
+import argparse
+import threading
+from collections import Counter, defaultdict
+from itertools import islice
+
+import pandas as pd
+
+# ==== Kesepakatan antar anotator (inkremental) ====
+# Item = (tweet_id, aspek). Kalau anotator sudah melabeli sebuah tweet tapi
+# tidak memberi label untuk aspek yang dilabeli anotator lain, nilainya
+# dihitung sebagai ABSENT ("aspek ini tidak ada"). Item baru ikut dihitung
+# setelah dinilai minimal dua anotator.
+#
+# Setiap event (annotator, tweet_id, aspek, sentimen) hanya mengubah item di
+# tweet itu: kontribusi lamanya dikurangi, kontribusi barunya ditambah, jadi
+# biaya per label O(aspek x anotator per tweet), tidak tergantung jumlah data.
+# Yang dijaga per aspek (dan gabungan ALL), semuanya integer supaya
+# pengurangan eksak:
+#   - matriks konfusi per pasangan anotator  -> Cohen's kappa
+#   - jumlah pasangan sepakat per jumlah penilai -> Fleiss' kappa
+#   - matriks koinsidensi per jumlah penilai  -> Krippendorff's alpha (nominal)
+#   - antrian item yang belum sepakat (urut masuk) untuk adjudikasi
+#
+# Event dibaca dari tabel annotation_events (annotation_store.py) mulai dari
+# seq terakhir yang sudah diproses, termasuk label dari proses anotator lain.
+#
+#     engine = AgreementEngine()
+#     engine.sync(store)
+#     engine.summary(); engine.pairwise(); engine.disagreements("Transparansi")
+#
+#     python agreement.py --db annotations.db --queue disagreements.csv
+
+ABSENT = "Tidak Ada"
+ALL = "Semua Aspek"
+SYNC_BATCH = 10_000
+
+
+def _ratio(numerator, denominator):
+    return None if denominator == 0 else numerator / denominator
+
+
+class _AspectStats:
+    def __init__(self):
+        self.items = 0
+        self.agreed = 0
+        # jumlah penilai m -> jumlah item / sum(v^2) - m (pasangan sepakat x2)
+        self.items_by_raters = defaultdict(int)
+        self.agreeing_pairs = defaultdict(int)
+        # kategori -> jumlah rating pada item yang dihitung
+        self.category_totals = defaultdict(int)
+        # (m, c, k) -> sum v_c * (v_k - [c == k]); koinsidensi = nilai / (m - 1)
+        self.coincidence = defaultdict(int)
+        # (anotator_a, anotator_b) -> (label_a, label_b) -> jumlah item
+        self.pairs = defaultdict(lambda: defaultdict(int))
+
+    def add(self, ratings, sign):
+        # ratings: {anotator: kategori}; sign +1 tambah, -1 kurangi
+        m = len(ratings)
+        if m < 2:
+            return
+        counts = Counter(ratings.values())
+        self.items += sign
+        self.agreed += sign * (len(counts) == 1)
+        self.items_by_raters[m] += sign
+        self.agreeing_pairs[m] += sign * (sum(v * v for v in counts.values()) - m)
+        for c, v in counts.items():
+            self.category_totals[c] += sign * v
+            for k, w in counts.items():
+                self.coincidence[m, c, k] += sign * v * (w - (c == k))
+        names = sorted(ratings)
+        for i, a in enumerate(names):
+            for b in names[i + 1:]:
+                self.pairs[a, b][ratings[a], ratings[b]] += sign
+
+    # ---- Koefisien ----
+    def fleiss_kappa(self):
+        # Versi jumlah penilai bervariasi: P_i = (sum v^2 - m) / (m (m - 1))
+        if not self.items:
+            return None
+        observed = sum(self.agreeing_pairs[m] / (m * (m - 1)) for m in self.items_by_raters) / self.items
+        total = sum(self.category_totals.values())
+        expected = sum((n / total) ** 2 for n in self.category_totals.values())
+        return _ratio(observed - expected, 1 - expected)
+
+    def krippendorff_alpha(self):
+        matrix = defaultdict(float)
+        for (m, c, k), value in self.coincidence.items():
+            if value:
+                matrix[c, k] += value / (m - 1)
+        marginals = defaultdict(float)
+        for (c, _), value in matrix.items():
+            marginals[c] += value
+        n = sum(marginals.values())
+        if n <= 1:
+            return None
+        observed = sum(value for (c, k), value in matrix.items() if c != k)
+        expected = (n * n - sum(v * v for v in marginals.values())) / (n - 1)
+        return None if expected == 0 else 1 - observed / expected
+
+    def cohen_kappa(self, pair):
+        table = self.pairs.get(pair, {})
+        n = sum(table.values())
+        if not n:
+            return None
+        rows, cols = defaultdict(int), defaultdict(int)
+        for (a, b), count in table.items():
+            rows[a] += count
+            cols[b] += count
+        observed = sum(count for (a, b), count in table.items() if a == b) / n
+        expected = sum(rows[c] * cols[c] for c in rows) / (n * n)
+        return _ratio(observed - expected, 1 - expected)
+
+
+class AgreementEngine:
+    def __init__(self):
+        self.seq = 0
+        self._lock = threading.RLock()
+        # tweet_id -> {(anotator, aspek): sentimen}
+        self._labels = {}
+        self._texts = {}
+        self._stats = defaultdict(_AspectStats)
+        # aspek / ALL -> {tweet_id: None}, dict dipakai sebagai antrian berurutan
+        self._queues = defaultdict(dict)
+
+    # ---- Event ----
+    def _items(self, tweet_id):
+        # aspek -> {anotator: kategori} untuk satu tweet
+        labels = self._labels.get(tweet_id, {})
+        annotators = {annotator for annotator, _ in labels}
+        aspects = {aspek for _, aspek in labels}
+        return {
+            aspek: {annotator: labels.get((annotator, aspek), ABSENT) for annotator in annotators}
+            for aspek in aspects
+        }
+
+    def apply(self, annotator, tweet_id, aspek, sentimen, tweet=None):
+        # sentimen None = label dihapus
+        with self._lock:
+            before = self._items(tweet_id)
+            labels = self._labels.setdefault(tweet_id, {})
+            if sentimen is None:
+                labels.pop((annotator, aspek), None)
+                if not labels:
+                    del self._labels[tweet_id]
+                    self._texts.pop(tweet_id, None)
+            else:
+                labels[annotator, aspek] = sentimen
+                if tweet:
+                    self._texts[tweet_id] = tweet
+            after = self._items(tweet_id)
+
+            for key in set(before) | set(after):
+                old, new = before.get(key, {}), after.get(key, {})
+                if old == new:
+                    continue
+                for stats in (self._stats[key], self._stats[ALL]):
+                    stats.add(old, -1)
+                    stats.add(new, +1)
+                # Item yang tetap belum sepakat tidak pindah posisi di antrian
+                if len(new) >= 2 and len(set(new.values())) > 1:
+                    self._queues[key].setdefault(tweet_id)
+                    self._queues[ALL].setdefault((tweet_id, key))
+                else:
+                    self._queues[key].pop(tweet_id, None)
+                    self._queues[ALL].pop((tweet_id, key), None)
+
+    def sync(self, store):
+        # Proses event baru dari annotations.db; kembalikan jumlah event yang diproses
+        processed = 0
+        with self._lock:
+            while True:
+                events = store.events_since(self.seq, SYNC_BATCH)
+                for seq, annotator, tweet_id, aspek, sentimen, tweet in events:
+                    self.apply(annotator, tweet_id, aspek, sentimen, tweet)
+                    self.seq = seq
+                processed += len(events)
+                if len(events) < SYNC_BATCH:
+                    return processed
+
+    # ---- Ringkasan ----
+    def aspects(self):
+        with self._lock:
+            return sorted(aspek for aspek, stats in self._stats.items() if aspek != ALL and stats.items)
+
+    def item_count(self, aspek=ALL):
+        with self._lock:
+            return self._stats[aspek].items if aspek in self._stats else 0
+
+    def summary(self):
+        rows = []
+        with self._lock:
+            for aspek in [ALL] + self.aspects():
+                stats = self._stats[aspek]
+                rows.append({
+                    "aspek": aspek,
+                    "item": stats.items,
+                    "sepakat": stats.agreed,
+                    "belum_sepakat": stats.items - stats.agreed,
+                    "fleiss_kappa": stats.fleiss_kappa(),
+                    "krippendorff_alpha": stats.krippendorff_alpha(),
+                })
+        return rows
+
+    def pairwise(self, aspek=ALL):
+        rows = []
+        with self._lock:
+            stats = self._stats[aspek] if aspek in self._stats else _AspectStats()
+            for pair, table in sorted(stats.pairs.items()):
+                n = sum(table.values())
+                if not n:
+                    continue
+                agreed = sum(count for (a, b), count in table.items() if a == b)
+                rows.append({
+                    "anotator_1": pair[0],
+                    "anotator_2": pair[1],
+                    "item": n,
+                    "persen_sepakat": agreed / n,
+                    "cohen_kappa": stats.cohen_kappa(pair),
+                })
+        return rows
+
+    def confusion(self, annotator_a, annotator_b, aspek=ALL):
+        # Baris = label anotator_a, kolom = label anotator_b
+        flipped = annotator_a > annotator_b
+        pair = (annotator_b, annotator_a) if flipped else (annotator_a, annotator_b)
+        with self._lock:
+            stats = self._stats[aspek] if aspek in self._stats else _AspectStats()
+            table = {(b, a) if flipped else (a, b): count
+                     for (a, b), count in stats.pairs.get(pair, {}).items() if count}
+        labels = sorted({c for key in table for c in key})
+        matrix = pd.DataFrame(0, index=labels, columns=labels)
+        for (a, b), count in table.items():
+            matrix.loc[a, b] = count
+        return matrix
+
+    def disagreement_count(self, aspek=ALL):
+        with self._lock:
+            return len(self._queues.get(aspek, ()))
+
+    def disagreements(self, aspek=ALL, limit=50, offset=0):
+        # Antrian adjudikasi: item belum sepakat, yang paling lama lebih dulu
+        rows = []
+        with self._lock:
+            for key in islice(self._queues.get(aspek, {}), offset, offset + limit):
+                tweet_id, item_aspek = key if aspek == ALL else (key, aspek)
+                row = {"tweet_id": tweet_id, "aspek": item_aspek, "tweet": self._texts.get(tweet_id, "")}
+                row.update(sorted(self._items(tweet_id).get(item_aspek, {}).items()))
+                rows.append(row)
+        return rows
+
+
+if __name__ == '__main__':
+    from annotation_store import DB_PATH, AnnotationStore
+
+    parser = argparse.ArgumentParser(description="Kesepakatan antar anotator dari annotations.db")
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--aspect", default=ALL, help="aspek untuk antrian & pairwise (default semua)")
+    parser.add_argument("--queue", default=None, help="tulis antrian item belum sepakat ke CSV ini")
+    args = parser.parse_args()
+
+    store = AnnotationStore(args.db)
+    engine = AgreementEngine()
+    print(f"📥 {engine.sync(store)} event diproses")
+    store.close()
+    with pd.option_context("display.width", 160, "display.max_columns", 20):
+        print(pd.DataFrame(engine.summary()).to_string(index=False))
+        pairs = engine.pairwise(args.aspect)
+        if pairs:
+            print()
+            print(pd.DataFrame(pairs).to_string(index=False))
+    if args.queue:
+        queue = engine.disagreements(args.aspect, limit=engine.disagreement_count(args.aspect))
+        pd.DataFrame(queue).to_csv(args.queue, index=False)
+        print(f"✅ {len(queue)} item belum sepakat ditulis ke '{args.queue}'")
@@ -0,0 +1,217 @@
+import json
+import os
+import threading
+import time
+
+# ==== Journal anotasi (append-only) ====
+# Setiap aksi anotator (label, hapus label, selesai tweet, pindah tweet, hapus
+# semua) ditulis sebagai satu baris JSON di akhir file journal, jadi biaya
+# simpan per klik O(1). fsync dilakukan per beberapa event / per interval.
+# Secara berkala journal dipadatkan jadi snapshot lalu dikosongkan; saat
+# start, snapshot dibaca lalu event sesudahnya di-replay.
+
+JOURNAL_PATH = "annotation_journal.jsonl"
+SNAPSHOT_PATH = "annotation_snapshot.json"
+LEGACY_STATE_PATH = "annotation_state.json"
+
+FSYNC_EVERY = 20
+FSYNC_INTERVAL = 1.0
+COMPACT_EVERY = 1000
+
+
+def empty_state():
+    return {
+        "annotations": [],
+        "current_index": 0,
+        "completed_tweets": set(),
+        "current_aspects": {},
+    }
+
+
+def state_from_dict(data):
+    state = empty_state()
+    state["annotations"] = list(data.get("annotations", []))
+    state["current_index"] = data.get("current_index", 0)
+    state["completed_tweets"] = set(data.get("completed_tweets", []))
+    state["current_aspects"] = dict(data.get("current_aspects", {}))
+    return state
+
+
+def state_to_dict(state):
+    return {
+        "current_index": state["current_index"],
+        "annotations": state["annotations"],
+        "completed_tweets": sorted(state["completed_tweets"]),
+        "current_aspects": state["current_aspects"],
+    }
+
+
+def apply_event(state, event):
+    op = event["op"]
+    if op == "label":
+        state["current_aspects"].setdefault(event["tweet_key"], {})[event["aspek"]] = event["sentimen"]
+    elif op == "unlabel":
+        state["current_aspects"].get(event["tweet_key"], {}).pop(event["aspek"], None)
+    elif op == "complete":
+        annotations = event["annotations"]
+        if event.get("replace"):
+            replaced = {(a["tweet_id"], a["aspek"]) for a in annotations}
+            state["annotations"][:] = [
+                a for a in state["annotations"] if (a["tweet_id"], a["aspek"]) not in replaced
+            ]
+        state["annotations"].extend(annotations)
+        state["completed_tweets"].add(event["index"])
+    elif op == "committed":
+        # Anotasi final sudah dipindah ke AnnotationStore (SQLite)
+        state["annotations"].clear()
+        state["completed_tweets"].clear()
+    elif op == "move":
+        state["current_index"] = event["index"]
+    elif op == "clear":
+        state["annotations"].clear()
+        state["completed_tweets"].clear()
+        state["current_aspects"].clear()
+        state["current_index"] = 0
+    elif op == "import":
+        imported = state_from_dict(event["state"])
+        state["annotations"][:] = imported["annotations"]
+        state["completed_tweets"].clear()
+        state["completed_tweets"].update(imported["completed_tweets"])
+        state["current_aspects"].clear()
+        state["current_aspects"].update(imported["current_aspects"])
+        state["current_index"] = imported["current_index"]
+    else:
+        raise ValueError(f"Event journal tidak dikenal: {op}")
+
+
+class AnnotationJournal:
+    def __init__(self, journal_path=JOURNAL_PATH, snapshot_path=SNAPSHOT_PATH,
+                 legacy_path=LEGACY_STATE_PATH, fsync_every=FSYNC_EVERY,
+                 fsync_interval=FSYNC_INTERVAL, compact_every=COMPACT_EVERY):
+        self.journal_path = journal_path
+        self.snapshot_path = snapshot_path
+        self.legacy_path = legacy_path
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self.compact_every = compact_every
+
+        self._lock = threading.RLock()
+        self.state = empty_state()
+        self.seq = 0
+        self._events_since_snapshot = 0
+        self._unsynced = 0
+        self._last_fsync = time.monotonic()
+        self._file = None
+
+        self._load()
+
+    # ---- Start: snapshot + replay ----
+    def _load(self):
+        snapshot_seq = 0
+        try:
+            with open(self.snapshot_path, "r", encoding="utf-8") as f:
+                snapshot = json.load(f)
+            self.state = state_from_dict(snapshot["state"])
+            snapshot_seq = snapshot.get("seq", 0)
+        except FileNotFoundError:
+            pass
+        self.seq = snapshot_seq
+
+        if os.path.exists(self.journal_path):
+            self._repair_tail()
+            with open(self.journal_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    event = json.loads(line)
+                    # Event yang sudah masuk snapshot dilewati (crash saat compaction)
+                    if event["seq"] <= snapshot_seq:
+                        continue
+                    apply_event(self.state, event)
+                    self.seq = event["seq"]
+                    self._events_since_snapshot += 1
+        elif snapshot_seq == 0 and self.legacy_path and os.path.exists(self.legacy_path):
+            self.import_state_file(self.legacy_path)
+
+        self._file = open(self.journal_path, "a", encoding="utf-8")
+
+    def _repair_tail(self):
+        # Proses mati di tengah penulisan bisa meninggalkan baris terpotong
+        with open(self.journal_path, "rb+") as f:
+            data = f.read()
+            if data and not data.endswith(b"\n"):
+                f.truncate(data.rfind(b"\n") + 1)
+
+    # ---- Tulis event ----
+    def _record(self, event):
+        with self._lock:
+            self.seq += 1
+            event["seq"] = self.seq
+            apply_event(self.state, event)
+            if self._file is None:
+                self._file = open(self.journal_path, "a", encoding="utf-8")
+            self._file.write(json.dumps(event, ensure_ascii=False, default=str) + "\n")
+            self._file.flush()
+            self._unsynced += 1
+            self._events_since_snapshot += 1
+
+            now = time.monotonic()
+            if self._unsynced >= self.fsync_every or now - self._last_fsync >= self.fsync_interval:
+                self.sync()
+            if self._events_since_snapshot >= self.compact_every:
+                self.compact()
+
+    def label(self, tweet_key, aspek, sentimen):
+        self._record({"op": "label", "tweet_key": tweet_key, "aspek": aspek, "sentimen": sentimen})
+
+    def unlabel(self, tweet_key, aspek):
+        self._record({"op": "unlabel", "tweet_key": tweet_key, "aspek": aspek})
+
+    def complete(self, index, annotations, replace=False):
+        self._record({"op": "complete", "index": index, "annotations": list(annotations), "replace": replace})
+
+    def move(self, index):
+        self._record({"op": "move", "index": index})
+
+    def forget_committed(self):
+        self._record({"op": "committed"})
+
+    def clear(self):
+        self._record({"op": "clear"})
+        self.compact()
+
+    def import_state_file(self, path=LEGACY_STATE_PATH):
+        # Impor annotation_state.json format lama sebagai satu event
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        self._record({"op": "import", "state": state_to_dict(state_from_dict(data))})
+
+    # ---- Durabilitas ----
+    def sync(self):
+        with self._lock:
+            if self._file is not None and self._unsynced:
+                self._file.flush()
+                os.fsync(self._file.fileno())
+            self._unsynced = 0
+            self._last_fsync = time.monotonic()
+
+    def compact(self):
+        with self._lock:
+            tmp_path = self.snapshot_path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"seq": self.seq, "state": state_to_dict(self.state)}, f, default=str)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.snapshot_path)
+
+            if self._file is not None:
+                self._file.close()
+            self._file = open(self.journal_path, "w", encoding="utf-8")
+            self._events_since_snapshot = 0
+            self._unsynced = 0
+            self._last_fsync = time.monotonic()
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self.sync()
+                self._file.close()
+                self._file = None
@@ -0,0 +1,420 @@
+import datetime
+import sqlite3
+import threading
+import time
+
+# ==== Penyimpanan anotasi di SQLite ====
+# Satu baris per (annotator, tweet_id, aspek). Label ulang untuk tweet & aspek
+# yang sama cukup di-upsert (O(log n)) tanpa menyaring seluruh list di memori.
+# File database memakai mode WAL sehingga beberapa proses/anotator bisa
+# membaca dan menulis file yang sama secara bersamaan.
+#
+# Tabel leases membagi tweet ke anotator dalam blok kecil (work unit) dengan
+# batas waktu, sehingga N anotator bisa melabeli satu dataset paralel tanpa
+# mengerjakan tweet yang sama.
+
+DB_PATH = "annotations.db"
+
+LEASE_SIZE = 10
+LEASE_TTL = 30 * 60
+# Berapa anotator berbeda yang melabeli satu tweet (1 = tanpa tumpang tindih)
+LABELS_PER_TWEET = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS annotations (
+    annotator  TEXT NOT NULL,
+    tweet_id   NOT NULL,
+    aspek      TEXT NOT NULL,
+    tweet      TEXT,
+    sentimen   TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    UNIQUE (annotator, tweet_id, aspek)
+);
+CREATE INDEX IF NOT EXISTS idx_annotations_tweet ON annotations (tweet_id);
+CREATE INDEX IF NOT EXISTS idx_annotations_aspek ON annotations (aspek, sentimen);
+CREATE INDEX IF NOT EXISTS idx_annotations_annotator ON annotations (annotator, updated_at);
+
+CREATE TABLE IF NOT EXISTS leases (
+    tweet_id   NOT NULL,
+    annotator  TEXT NOT NULL,
+    expires_at REAL NOT NULL,
+    PRIMARY KEY (tweet_id, annotator)
+);
+CREATE INDEX IF NOT EXISTS idx_leases_annotator ON leases (annotator, tweet_id);
+CREATE INDEX IF NOT EXISTS idx_leases_expires ON leases (expires_at);
+
+-- Nomor revisi per anotator, naik di transaksi yang sama dengan setiap
+-- perubahan anotasi; dipakai sebagai cap versi untuk cache turunan
+CREATE TABLE IF NOT EXISTS revisions (
+    annotator TEXT PRIMARY KEY,
+    revision  INTEGER NOT NULL
+);
+"""
+
+# Hitungan label per (anotator, aspek, sentimen), dijaga trigger di setiap
+# insert/update/delete: statistik cukup membaca tabel kecil ini, bukan
+# menghitung ulang seluruh tabel anotasi
+COUNTS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS label_counts (
+    annotator TEXT NOT NULL,
+    aspek     TEXT NOT NULL,
+    sentimen  TEXT NOT NULL,
+    n         INTEGER NOT NULL,
+    PRIMARY KEY (annotator, aspek, sentimen)
+);
+CREATE TRIGGER IF NOT EXISTS label_counts_insert AFTER INSERT ON annotations BEGIN
+    INSERT INTO label_counts (annotator, aspek, sentimen, n) VALUES (NEW.annotator, NEW.aspek, NEW.sentimen, 1)
+    ON CONFLICT (annotator, aspek, sentimen) DO UPDATE SET n = n + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS label_counts_delete AFTER DELETE ON annotations BEGIN
+    UPDATE label_counts SET n = n - 1
+    WHERE annotator = OLD.annotator AND aspek = OLD.aspek AND sentimen = OLD.sentimen;
+END;
+CREATE TRIGGER IF NOT EXISTS label_counts_update AFTER UPDATE OF annotator, aspek, sentimen ON annotations BEGIN
+    UPDATE label_counts SET n = n - 1
+    WHERE annotator = OLD.annotator AND aspek = OLD.aspek AND sentimen = OLD.sentimen;
+    INSERT INTO label_counts (annotator, aspek, sentimen, n) VALUES (NEW.annotator, NEW.aspek, NEW.sentimen, 1)
+    ON CONFLICT (annotator, aspek, sentimen) DO UPDATE SET n = n + 1;
+END;
+"""
+
+# Log perubahan label (append-only), diisi trigger: pembaca turunan seperti
+# agreement.py cukup membaca event setelah nomor seq terakhir yang sudah
+# diproses, termasuk perubahan dari proses anotator lain. sentimen NULL = hapus.
+EVENTS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS annotation_events (
+    seq       INTEGER PRIMARY KEY AUTOINCREMENT,
+    annotator TEXT NOT NULL,
+    tweet_id  NOT NULL,
+    aspek     TEXT NOT NULL,
+    sentimen  TEXT,
+    tweet     TEXT
+);
+CREATE TRIGGER IF NOT EXISTS annotation_events_insert AFTER INSERT ON annotations BEGIN
+    INSERT INTO annotation_events (annotator, tweet_id, aspek, sentimen, tweet)
+    VALUES (NEW.annotator, NEW.tweet_id, NEW.aspek, NEW.sentimen, NEW.tweet);
+END;
+CREATE TRIGGER IF NOT EXISTS annotation_events_delete AFTER DELETE ON annotations BEGIN
+    INSERT INTO annotation_events (annotator, tweet_id, aspek, sentimen, tweet)
+    VALUES (OLD.annotator, OLD.tweet_id, OLD.aspek, NULL, NULL);
+END;
+CREATE TRIGGER IF NOT EXISTS annotation_events_update AFTER UPDATE ON annotations
+WHEN OLD.annotator IS NOT NEW.annotator OR OLD.tweet_id IS NOT NEW.tweet_id
+     OR OLD.aspek IS NOT NEW.aspek OR OLD.sentimen IS NOT NEW.sentimen BEGIN
+    INSERT INTO annotation_events (annotator, tweet_id, aspek, sentimen, tweet)
+    SELECT OLD.annotator, OLD.tweet_id, OLD.aspek, NULL, NULL
+    WHERE OLD.annotator IS NOT NEW.annotator OR OLD.tweet_id IS NOT NEW.tweet_id OR OLD.aspek IS NOT NEW.aspek;
+    INSERT INTO annotation_events (annotator, tweet_id, aspek, sentimen, tweet)
+    VALUES (NEW.annotator, NEW.tweet_id, NEW.aspek, NEW.sentimen, NEW.tweet);
+END;
+"""
+
+COLUMNS = ["tweet_id", "tweet", "aspek", "sentimen"]
+PAGE_COLUMNS = ["annotator", "tweet_id", "tweet", "aspek", "sentimen", "updated_at"]
+
+
+def _now():
+    return datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+class AnnotationStore:
+    def __init__(self, path=DB_PATH, timeout=30.0):
+        self.path = path
+        # Satu koneksi dipakai bersama thread sesi Streamlit, dijaga lock
+        self._conn = sqlite3.connect(path, timeout=timeout, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.RLock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(SCHEMA)
+            self._conn.commit()
+            self._ensure_derived()
+
+    def _ensure_derived(self):
+        # Database lama (sebelum ada label_counts / annotation_events): trigger
+        # dibuat & tabel diisi sekali dalam satu transaksi, supaya tidak ada
+        # label yang terlewat. Aman dijalankan berulang: isi awal hanya kalau
+        # tabelnya masih kosong.
+        self._conn.executescript(
+            "BEGIN IMMEDIATE;"
+            + COUNTS_SCHEMA
+            + EVENTS_SCHEMA
+            + "INSERT INTO label_counts (annotator, aspek, sentimen, n) "
+              "SELECT annotator, aspek, sentimen, COUNT(*) FROM annotations "
+              "WHERE NOT EXISTS (SELECT 1 FROM label_counts) "
+              "GROUP BY annotator, aspek, sentimen;"
+              "INSERT INTO annotation_events (annotator, tweet_id, aspek, sentimen, tweet) "
+              "SELECT annotator, tweet_id, aspek, sentimen, tweet FROM annotations "
+              "WHERE NOT EXISTS (SELECT 1 FROM annotation_events) ORDER BY rowid;"
+              "COMMIT;"
+        )
+
+    # ---- Tulis ----
+    def _bump_revision(self, annotator_name):
+        self._conn.execute(
+            "INSERT INTO revisions (annotator, revision) VALUES (?, 1) "
+            "ON CONFLICT (annotator) DO UPDATE SET revision = revision + 1",
+            (annotator_name,),
+        )
+
+    def upsert_many(self, annotator_name, annotations):
+        now = _now()
+        rows = [
+            (annotator_name, a["tweet_id"], a["aspek"], a.get("tweet", ""), a["sentimen"], now)
+            for a in annotations
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                """
+                INSERT INTO annotations (annotator, tweet_id, aspek, tweet, sentimen, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (annotator, tweet_id, aspek) DO UPDATE SET
+                    tweet = excluded.tweet,
+                    sentimen = excluded.sentimen,
+                    updated_at = excluded.updated_at
+                """,
+                rows,
+            )
+            # Tweet yang sudah dilabeli tidak perlu dipegang lagi
+            self._conn.executemany(
+                "DELETE FROM leases WHERE annotator = ? AND tweet_id = ?",
+                {(annotator_name, a["tweet_id"]) for a in annotations},
+            )
+            self._bump_revision(annotator_name)
+
+    def upsert(self, annotator_name, annotation):
+        self.upsert_many(annotator_name, [annotation])
+
+    def delete(self, annotator_name, tweet_id, aspek):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM annotations WHERE annotator = ? AND tweet_id = ? AND aspek = ?",
+                (annotator_name, tweet_id, aspek),
+            )
+            self._bump_revision(annotator_name)
+
+    def clear(self, annotator_name):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM annotations WHERE annotator = ?", (annotator_name,))
+            self._conn.execute("DELETE FROM leases WHERE annotator = ?", (annotator_name,))
+            self._bump_revision(annotator_name)
+
+    def rename_tweet_ids(self, mapping):
+        # mapping: tweet_id lama -> baru. Kalau (anotator, id baru, aspek) sudah
+        # ada, label yang sudah ada dipertahankan dan yang lama dibuang.
+        with self._lock, self._conn:
+            annotators = [row[0] for row in self._conn.execute(
+                "SELECT DISTINCT annotator FROM annotations WHERE tweet_id IN (%s)" % ",".join("?" * len(mapping)),
+                list(mapping),
+            )]
+            for old_id, new_id in mapping.items():
+                self._conn.execute("UPDATE OR IGNORE annotations SET tweet_id = ? WHERE tweet_id = ?", (new_id, old_id))
+                self._conn.execute("DELETE FROM annotations WHERE tweet_id = ?", (old_id,))
+                self._conn.execute("DELETE FROM leases WHERE tweet_id = ?", (old_id,))
+            for annotator_name in annotators:
+                self._bump_revision(annotator_name)
+
+    # ---- Baca ----
+    def positional_tweet_ids(self):
+        # tweet_id bertipe angka = format lama (posisi baris + 1)
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT DISTINCT tweet_id FROM annotations WHERE typeof(tweet_id) = 'integer'"
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def version(self, annotator_name):
+        # Cap versi O(1); berubah hanya kalau anotasi anotator ini berubah,
+        # termasuk perubahan dari proses lain yang memakai file yang sama
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT revision FROM revisions WHERE annotator = ?", (annotator_name,)
+            ).fetchone()
+        return row[0] if row else 0
+
+    def list_annotations(self, annotator_name=None):
+        query = "SELECT annotator, tweet_id, tweet, aspek, sentimen, updated_at FROM annotations"
+        params = ()
+        if annotator_name is not None:
+            query += " WHERE annotator = ?"
+            params = (annotator_name,)
+        query += " ORDER BY rowid"
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [{key: row[key] for key in COLUMNS} for row in rows]
+
+    def iter_annotations(self, annotator_name, chunksize=10_000):
+        # Baca per blok (fetchmany) lewat koneksi baca terpisah: dengan WAL
+        # pembaca melihat snapshot yang konsisten tanpa menahan lock penulis,
+        # dan ekspor besar tidak memuat semua baris sekaligus
+        conn = sqlite3.connect(self.path)
+        conn.row_factory = sqlite3.Row
+        try:
+            cursor = conn.execute(
+                "SELECT tweet_id, tweet, aspek, sentimen FROM annotations WHERE annotator = ? ORDER BY rowid",
+                (annotator_name,),
+            )
+            while True:
+                rows = cursor.fetchmany(chunksize)
+                if not rows:
+                    break
+                yield [{key: row[key] for key in COLUMNS} for row in rows]
+        finally:
+            conn.close()
+
+    def count(self, annotator_name):
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COALESCE(SUM(n), 0) FROM label_counts WHERE annotator = ?", (annotator_name,)
+            ).fetchone()[0]
+
+    def annotators(self):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT annotator FROM label_counts GROUP BY annotator HAVING SUM(n) > 0 ORDER BY annotator"
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def page(self, annotator_name=None, aspek=None, sentimen=None, date_from=None, date_to=None,
+             offset=0, limit=50):
+        # Satu halaman tabel anotasi (terbaru dulu) + jumlah total baris yang cocok.
+        # date_from / date_to: "YYYY-MM-DD", inklusif, dibandingkan dengan updated_at
+        where, params = [], []
+        for column, value in (("annotator", annotator_name), ("aspek", aspek), ("sentimen", sentimen)):
+            if value is not None:
+                where.append(f"{column} = ?")
+                params.append(value)
+        if date_from is not None:
+            where.append("updated_at >= ?")
+            params.append(str(date_from))
+        if date_to is not None:
+            where.append("updated_at < date(?, '+1 day')")
+            params.append(str(date_to))
+        clause = (" WHERE " + " AND ".join(where)) if where else ""
+        with self._lock:
+            total = self._conn.execute(f"SELECT COUNT(*) FROM annotations{clause}", params).fetchone()[0]
+            rows = self._conn.execute(
+                f"SELECT {', '.join(PAGE_COLUMNS)} FROM annotations{clause} ORDER BY rowid DESC LIMIT ? OFFSET ?",
+                params + [limit, offset],
+            ).fetchall()
+        return [{key: row[key] for key in PAGE_COLUMNS} for row in rows], total
+
+    def events_since(self, seq, limit=10_000):
+        # Event perubahan label setelah nomor seq (urut), paling banyak `limit`
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT seq, annotator, tweet_id, aspek, sentimen, tweet FROM annotation_events "
+                "WHERE seq > ? ORDER BY seq LIMIT ?",
+                (seq, limit),
+            ).fetchall()
+        return [tuple(row) for row in rows]
+
+    def completed_tweet_ids(self, annotator_name):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT DISTINCT tweet_id FROM annotations WHERE annotator = ?", (annotator_name,)
+            ).fetchall()
+        return {row[0] for row in rows}
+
+    def labels_for_tweet(self, annotator_name, tweet_id):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT aspek, sentimen FROM annotations WHERE annotator = ? AND tweet_id = ?",
+                (annotator_name, tweet_id),
+            ).fetchall()
+        return {row["aspek"]: row["sentimen"] for row in rows}
+
+    def _counts(self, column, annotator_name):
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {column}, SUM(n) AS total FROM label_counts WHERE annotator = ? "
+                f"GROUP BY {column} HAVING total > 0 ORDER BY total DESC",
+                (annotator_name,),
+            ).fetchall()
+        return {row[0]: row[1] for row in rows}
+
+    def sentiment_counts(self, annotator_name):
+        return self._counts("sentimen", annotator_name)
+
+    def aspect_counts(self, annotator_name):
+        return self._counts("aspek", annotator_name)
+
+    # ---- Lease (pembagian kerja antar anotator) ----
+    def acquire_leases(self, annotator_name, tweet_ids, size=LEASE_SIZE, ttl=LEASE_TTL,
+                       labels_per_tweet=LABELS_PER_TWEET):
+        # Kembalikan tweet_id yang sedang dipegang anotator ini (urut). Kalau
+        # belum pegang apa-apa, ambil blok baru dari tweet_ids sesuai urutan.
+        now = time.time()
+        with self._lock:
+            # BEGIN IMMEDIATE: kunci tulis diambil di awal supaya dua proses
+            # tidak membagikan tweet yang sama
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute("DELETE FROM leases WHERE expires_at < ?", (now,))
+                self._conn.execute(
+                    "UPDATE leases SET expires_at = ? WHERE annotator = ?", (now + ttl, annotator_name)
+                )
+                held = [row[0] for row in self._conn.execute(
+                    "SELECT tweet_id FROM leases WHERE annotator = ? ORDER BY tweet_id", (annotator_name,)
+                )]
+                if not held:
+                    load = {}
+                    for row in self._conn.execute(
+                        "SELECT tweet_id, COUNT(*) FROM ("
+                        "  SELECT DISTINCT tweet_id, annotator FROM annotations"
+                        "  UNION SELECT tweet_id, annotator FROM leases"
+                        ") GROUP BY tweet_id"
+                    ):
+                        load[row[0]] = row[1]
+                    mine = {row[0] for row in self._conn.execute(
+                        "SELECT DISTINCT tweet_id FROM annotations WHERE annotator = ?", (annotator_name,)
+                    )}
+                    for tweet_id in tweet_ids:
+                        if tweet_id in mine or load.get(tweet_id, 0) >= labels_per_tweet:
+                            continue
+                        held.append(tweet_id)
+                        if len(held) >= size:
+                            break
+                    self._conn.executemany(
+                        "INSERT INTO leases (tweet_id, annotator, expires_at) VALUES (?, ?, ?)",
+                        [(tweet_id, annotator_name, now + ttl) for tweet_id in held],
+                    )
+                self._conn.commit()
+            except Exception:
+                self._conn.rollback()
+                raise
+        return held
+
+    def held_leases(self, annotator_name):
+        # Jatah yang sedang dipegang, tanpa memperpanjang / mengambil blok baru (hanya baca)
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT tweet_id FROM leases WHERE annotator = ? AND expires_at >= ? ORDER BY tweet_id",
+                (annotator_name, time.time()),
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def lease_holders(self, tweet_id):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT annotator FROM leases WHERE tweet_id = ? AND expires_at >= ?",
+                (tweet_id, time.time()),
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def release_leases(self, annotator_name):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM leases WHERE annotator = ?", (annotator_name,))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def migrate_journal(store, journal, annotator_name):
+    # Anotasi yang masih tersimpan di journal / annotation_state.json lama
+    # dipindah sekali ke SQLite; journal selanjutnya hanya menyimpan draft.
+    if journal.state["annotations"]:
+        store.upsert_many(annotator_name, journal.state["annotations"])
+        journal.forget_committed()
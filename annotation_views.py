@@ -0,0 +1,81 @@
+import threading
+
+import pandas as pd
+
+from annotation_store import PAGE_COLUMNS
+from exporters import export_apc_txt, export_atepc, export_bytes, export_csv, export_json
+
+# ==== Cache turunan data anotasi ====
+# DataFrame, hitungan statistik dan isi file ekspor (CSV/JSON/TXT) dibangun
+# sekali per versi data (AnnotationStore.version) lalu dipakai ulang di setiap
+# rerun. Rerun yang hanya pindah tweet tidak membangun ulang apa-apa; isi file
+# ekspor baru dibuat saat tombol download benar-benar diklik. Tabel detail
+# diambil per halaman langsung dari SQLite (LIMIT/OFFSET), bukan seluruh data.
+
+PAGE_SIZE = 50
+
+
+class AnnotationViews:
+    def __init__(self, store, annotator_name):
+        self.store = store
+        self.annotator_name = annotator_name
+        self._lock = threading.RLock()
+        self._version = None
+        self._cache = {}
+
+    def _get(self, name, build):
+        with self._lock:
+            version = self.store.version(self.annotator_name)
+            if version != self._version:
+                self._version = version
+                self._cache = {}
+            if name not in self._cache:
+                self._cache[name] = build()
+            return self._cache[name]
+
+    # ---- Data ----
+    def annotations(self):
+        return self._get("annotations", lambda: self.store.list_annotations(self.annotator_name))
+
+    def dataframe(self):
+        return self._get(
+            "dataframe",
+            lambda: pd.DataFrame(self.annotations(), columns=["tweet_id", "tweet", "aspek", "sentimen"]),
+        )
+
+    def completed_tweet_ids(self):
+        return self._get("completed", lambda: self.store.completed_tweet_ids(self.annotator_name))
+
+    def sentiment_counts(self):
+        return self._get("sentiment_counts", lambda: self.store.sentiment_counts(self.annotator_name))
+
+    def aspect_counts(self):
+        return self._get("aspect_counts", lambda: self.store.aspect_counts(self.annotator_name))
+
+    def label_count(self):
+        return self._get("label_count", lambda: self.store.count(self.annotator_name))
+
+    def page(self, page, page_size=PAGE_SIZE, **filters):
+        # filters: annotator_name, aspek, sentimen, date_from, date_to (lihat AnnotationStore.page)
+        rows, total = self.store.page(offset=(page - 1) * page_size, limit=page_size, **filters)
+        return pd.DataFrame(rows, columns=PAGE_COLUMNS), total
+
+    # ---- Isi file ekspor (dibuat malas) ----
+    def csv_bytes(self):
+        return self._get("csv", lambda: export_bytes(export_csv, self.dataframe()))
+
+    def json_bytes(self):
+        return self._get("json", lambda: export_bytes(export_json, self.dataframe()))
+
+    def txt_bytes(self):
+        return self._get("txt", lambda: export_bytes(export_apc_txt, self.dataframe()))
+
+    def atepc_bytes(self):
+        return self._get("atepc", lambda: export_bytes(export_atepc, self.dataframe()))
+
+    # ---- Tulis langsung ke file (streaming dari SQLite) ----
+    def write_exports(self, paths):
+        # paths: {"csv": ..., "json": ..., "txt": ..., "atepc": ...}
+        exporters = {"csv": export_csv, "json": export_json, "txt": export_apc_txt, "atepc": export_atepc}
+        for fmt, path in paths.items():
+            exporters[fmt](self.store.iter_annotations(self.annotator_name), path)
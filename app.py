@@ -1,49 +1,66 @@
 import streamlit as st
+import time
 import pandas as pd
-import json
-import gspread
-from google.oauth2.service_account import Credentials
 import datetime
+from gsheet_writer import SheetWriter
+from sheet_backend import open_sheet
+from instrumentation import METRICS_PORT, Recorder, is_admin
+from annotation_journal import AnnotationJournal
+from annotation_store import AnnotationStore, migrate_journal
+from annotation_views import PAGE_SIZE, AnnotationViews
+from agreement import ALL, AgreementEngine
+from fast_label import WINDOW_SIZE, fast_label, mark_committed, pending_batch
+from prefetch import TweetPrefetcher
+from workspace import annotator_path
+from corpus_cache import open_corpus
+from tweet_index import TweetIndex, migrate_positional_ids
+from navigator import TweetNavigator
+from search_index import SearchIndex
+from prelabel import PredictionCache, PrelabelService
+from active_learning import ActiveLearningScheduler
+from gsheet_sync import rename_synced_tweet_ids
+
+# Daftar anotator yang muncul di halaman login (nama lain tetap bisa diketik)
+ANNOTATORS = ["Pak Arif", "Pak Abrian"]
+# App_2.py menjalankan script ini dengan DEFAULT_ANNOTATOR sudah terisi
+DEFAULT_ANNOTATOR = globals().get("DEFAULT_ANNOTATOR")
+
+# ==== Instrumentasi ====
+# Durasi tiap bagian script & request Sheet (lihat instrumentation.py);
+# panel profiling hanya tampil untuk ?admin=<ADMIN_TOKEN>
+@st.cache_resource
+def get_recorder():
+    recorder = Recorder()
+    if METRICS_PORT:
+        recorder.serve_metrics(METRICS_PORT)
+    return recorder
 
-ANNOTATOR_NAME = "Pak Arif"
+recorder = get_recorder()
+IS_ADMIN = is_admin(st.query_params)
+trace = recorder.start_rerun(st.session_state, force=IS_ADMIN)
 
 # =============================
 # CONFIGURASI GOOGLE SHEETS
 # =============================
-SCOPE = [
-    "https://www.googleapis.com/auth/spreadsheets",
-    "https://www.googleapis.com/auth/drive"
-]
-SHEET_NAME = "Sentimen_Kabinet_Labeling" 
-
+# Backend dipilih lewat env SHEET_BACKEND (lihat sheet_backend.py):
+# default Google Sheets asli; "fake" / URL HTTP untuk uji offline & uji beban
 @st.cache_resource
 def connect_gsheet():
-    # Ambil kredensial dari secrets Streamlit (bukan file JSON lokal)
-    creds_json = st.secrets["gcp_service_account"]
+    # Kredensial diambil dari secrets Streamlit (bukan file JSON lokal)
+    return get_recorder().wrap_sheet(open_sheet(st.secrets))
 
-    # Buat objek Credentials dari isi secrets
-    creds = Credentials.from_service_account_info(dict(creds_json), scopes=SCOPE)
 
-    # Otorisasi ke Google Sheets
-    client = gspread.authorize(creds)
-
-    # Buka Sheet
-    sheet = client.open(SHEET_NAME).sheet1
-    return sheet
+@st.cache_resource
+def get_sheet_writer():
+    # Satu thread penulis per proses, dipakai bersama oleh semua sesi.
+    # Koneksi ke Sheet dibuka di thread tersebut, bukan di script.
+    return SheetWriter(connect_gsheet)
 
 
 def append_to_gsheet(df_annotations, annotator_name):
-    sheet = connect_gsheet()
-    for _, row in df_annotations.iterrows():
-        sheet.append_row([
-            row.get('tweet_id', ''),
-            row.get('tweet', ''),
-            row.get('aspek', ''),
-            row.get('sentimen', ''),
-            annotator_name,
-            datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        ])
-    st.success("✅ Data berhasil dikirim ke Google Sheet!")
+    # Masuk antrian saja; pengiriman dilakukan thread penulis di background
+    get_sheet_writer().enqueue(annotator_name, df_annotations.to_dict(orient="records"))
+    st.success("✅ Data masuk antrian Google Sheet!")
 
 # ==== Konfigurasi Aspek & Sentimen ====
 ASPECTS = [
@@ -56,6 +73,19 @@ ASPECTS = [
 
 SENTIMENTS = ["Positif", "Negatif", "Netral"]
 
+# Aspek utama (file dataset) -> aspek di form, dipakai sebagai kandidat pre-label model
+PRELABEL_ASPECTS = {
+    "Kebijakan Pemerintah": "Kebijakan Pemerintah",
+    "Kompetensi": "Kompetensi Menteri",
+    "Responsivitas": "Fleksibilitas",
+    "Representasi": "Keterwakilan",
+    "Transparansi": "Transparansi",
+}
+# Berapa tweet belum dilabeli di depan yang diprediksi lebih dulu
+PRELABEL_WINDOW = 32
+# Urutan tweet: paling tidak pasti menurut model dulu ("entropy", "margin", "committee")
+ACTIVE_LEARNING_STRATEGY = "entropy"
+
 # ==== Mapping Aspek ke File Dataset ====
 ASPECT_FILES = {
     "Kebijakan Pemerintah": "filtered_aspek_kebijakan_top100.csv",
@@ -66,84 +96,315 @@ ASPECT_FILES = {
 }
 
 # ==== Load & Combine All Datasets ====
-@st.cache_data
-def load_combined_dataset():
-    all_dfs = []
-    for aspect, filename in ASPECT_FILES.items():
-        try:
-            df_temp = pd.read_csv(f"dataset/{filename}")  # Add dataset/ prefix
-            df_temp['aspek_utama'] = aspect  # Tambahkan kolom aspek utama
-            all_dfs.append(df_temp)
-        except FileNotFoundError:
-            st.warning(f"File dataset/{filename} tidak ditemukan!")
-    
-    if all_dfs:
-        combined = pd.concat(all_dfs, ignore_index=True)
-        # Rename column to match our code
-        combined = combined.rename(columns={'Cleaned_Tweet': 'tweet'})
-        return combined
-    else:
-        st.error("Tidak ada dataset yang berhasil dimuat!")
-        return pd.DataFrame()
+# CSV per aspek dikonversi sekali ke cache kolumnar (dataset/.cache/) lalu
+# dibuka dengan mmap; setiap rerun cukup mengambil satu tweet per indeks.
+@st.cache_resource
+def load_corpus():
+    sources = [(f"dataset/{filename}", aspect) for aspect, filename in ASPECT_FILES.items()]
+    return open_corpus(sources, "aspek_top100")
+
+trace.section("data_load")
+corpus = load_corpus()
+for path in corpus.missing_sources:
+    st.warning(f"File {path} tidak ditemukan!")
+if len(corpus) == 0:
+    st.error("Tidak ada dataset yang berhasil dimuat!")
+    trace.finish()
+    st.stop()
+
+# ID tweet stabil (hash isi) + kelompok duplikat; satu label berlaku untuk
+# semua tweet yang sama/hampir sama, di file aspek mana pun
+@st.cache_resource
+def load_tweet_index():
+    return TweetIndex(corpus)
+
+tweet_index = load_tweet_index()
 
-df = load_combined_dataset()
+@st.cache_resource
+def load_search_index():
+    # Inverted index + BM25 untuk antrian labeling berbasis kata kunci
+    return SearchIndex(corpus)
+
+# ==== Identitas Anotator ====
+# Nama anotator diambil dari URL (?annotator=...) atau dari form login,
+# jadi satu deployment bisa dipakai banyak anotator sekaligus.
+ANNOTATOR_NAME = st.query_params.get("annotator") or DEFAULT_ANNOTATOR
+
+if not ANNOTATOR_NAME:
+    st.title("🏛️ Anotator Sentimen Kabinet Merah Putih")
+    st.write("### 👤 Masuk sebagai Anotator")
+    with st.form("login_form"):
+        selected_name = st.selectbox("Pilih Nama:", ANNOTATORS)
+        typed_name = st.text_input("Atau ketik nama baru:")
+        if st.form_submit_button("Masuk", type="primary"):
+            st.query_params["annotator"] = typed_name.strip() or selected_name
+            st.rerun()
+    trace.finish()
+    st.stop()
 
 # ==== Session State Initialization ====
-# Try to load saved state
-try:
-    with open('annotation_state.json', 'r') as f:
-        saved_state = json.load(f)
-        
-    if "annotations" not in st.session_state:
-        st.session_state.annotations = saved_state.get('annotations', [])
-    
-    if "current_index" not in st.session_state:
-        st.session_state.current_index = saved_state.get('current_index', 0)
-    
-    if "current_aspects" not in st.session_state:
-        st.session_state.current_aspects = saved_state.get('current_aspects', {})
-    
-    if "completed_tweets" not in st.session_state:
-        st.session_state.completed_tweets = set(saved_state.get('completed_tweets', []))
-        
-except FileNotFoundError:
-    # Initialize fresh state if no saved state exists
-    if "annotations" not in st.session_state:
-        st.session_state.annotations = []
-    
-    if "current_index" not in st.session_state:
-        st.session_state.current_index = 0
-    
-    if "current_aspects" not in st.session_state:
-        st.session_state.current_aspects = {}
-    
-    if "completed_tweets" not in st.session_state:
-        st.session_state.completed_tweets = set()
+@st.cache_resource
+def get_journal(annotator_name):
+    # Journal append-only untuk draft label & posisi tweet, terpisah per anotator
+    return AnnotationJournal(
+        journal_path=annotator_path(annotator_name, "annotation_journal.jsonl"),
+        snapshot_path=annotator_path(annotator_name, "annotation_snapshot.json"),
+        legacy_path=None,
+    )
+
+@st.cache_resource
+def get_store():
+    # Anotasi final + lease tweet disimpan di SQLite (annotations.db), dipakai bersama semua anotator
+    return AnnotationStore()
+
+@st.cache_resource
+def get_views(annotator_name):
+    # DataFrame, statistik & isi ekspor di-cache per versi data anotator
+    return AnnotationViews(get_store(), annotator_name)
+
+trace.section("state_load")
+journal = get_journal(ANNOTATOR_NAME)
+store = get_store()
+views = get_views(ANNOTATOR_NAME)
+migrate_journal(store, journal, ANNOTATOR_NAME)
+
+
+@st.cache_resource
+def migrate_tweet_ids():
+    # Sekali per proses: label lama ber-ID posisi dipindah ke ID stabil
+    mapping = migrate_positional_ids(store, tweet_index)
+    if mapping:
+        rename_synced_tweet_ids(mapping)
+    return len(mapping)
+
+migrate_tweet_ids()
+
+
+@st.cache_resource
+def get_navigator(annotator_name):
+    # Bitmap tweet selesai + index navigasi, dibangun ulang per versi data
+    return TweetNavigator(tweet_index)
+
+# Tweet yang sudah selesai = tweet yang punya minimal satu label di database,
+# termasuk duplikatnya (label ikut berlaku untuk seluruh kelompok)
+navigator = get_navigator(ANNOTATOR_NAME)
+navigator.refresh(store.version(ANNOTATOR_NAME), views.completed_tweet_ids)
+completed_count = navigator.completed_count
+
+
+@st.cache_resource
+def get_prelabeler():
+    # Model APC di thread background; saran di-cache di predictions.db
+    return PrelabelService(PredictionCache())
+
+prelabeler = get_prelabeler()
+
+
+def prelabel_item(row):
+    aspek = corpus.column("aspek_utama", row)
+    candidates = [PRELABEL_ASPECTS[aspek]] if aspek in PRELABEL_ASPECTS else ASPECTS
+    return tweet_index.tweet_id(row), corpus.text(row), candidates
+
+@st.cache_resource
+def get_scheduler(annotator_name):
+    # Antrian prioritas active learning, diperbarui thread background
+    return ActiveLearningScheduler(
+        prelabeler,
+        tweet_index.unique_ids(),
+        items=lambda tweet_id: prelabel_item(tweet_index.row_of(tweet_id)),
+        completed_ids=views.completed_tweet_ids,
+        strategy=ACTIVE_LEARNING_STRATEGY,
+    )
+
+scheduler = get_scheduler(ANNOTATOR_NAME)
+
+
+def next_leased_index():
+    # Tweet berikutnya dari jatah (lease) anotator ini, urut prioritas active
+    # learning; jatah baru diambil otomatis kalau yang lama sudah habis dilabeli
+    leased = store.acquire_leases(ANNOTATOR_NAME, scheduler.ordered_ids())
+    leased = sorted(leased, key=scheduler.rank)
+    rows = [row for row in map(tweet_index.row_of, leased) if row is not None]
+    if not rows:
+        return None
+    others = [row for row in rows if row != st.session_state.get("current_index")]
+    return (others or rows)[0]
+
+
+if "current_index" not in st.session_state:
+    if journal.seq == 0:
+        # Anotator baru: mulai dari tweet pertama jatahnya
+        st.session_state.current_index = next_leased_index() or 0
+    else:
+        st.session_state.current_index = journal.state["current_index"]
+
+if "current_aspects" not in st.session_state:
+    st.session_state.current_aspects = journal.state["current_aspects"]
+
+# Tweet saat ini + beberapa tweet belum dilabeli berikutnya masuk antrian prediksi
+prelabeler.submit(prelabel_item(row) for row in
+                  [st.session_state.current_index] + navigator.upcoming_unlabeled(st.session_state.current_index, PRELABEL_WINDOW))
+
+
+def prepare_tweet(row):
+    # Semua yang dibutuhkan render satu tweet; dipanggil thread prefetch untuk
+    # tweet berikutnya, atau langsung kalau tweet ini belum disiapkan
+    tweet_id = tweet_index.tweet_id(row)
+    return {
+        "row": row,
+        "tweet_id": tweet_id,
+        "text": corpus.text(row),
+        "aspek_utama": corpus.column("aspek_utama", row),
+        "duplicates": len(tweet_index.group(row)) - 1,
+        "holders": [name for name in store.lease_holders(tweet_id) if name != ANNOTATOR_NAME],
+        "suggestions": prelabeler.suggestions(tweet_id),
+        "labels": store.labels_for_tweet(ANNOTATOR_NAME, tweet_id),
+    }
+
+
+def upcoming_rows(after, count):
+    # Urutan "Tweet Selanjutnya": jatah anotator urut prioritas active learning,
+    # mulai setelah tweet `after` lalu memutar. Hanya baca; jatah baru tetap
+    # diambil next_leased_index
+    leased = sorted(store.held_leases(ANNOTATOR_NAME), key=scheduler.rank)
+    rows = [row for row in map(tweet_index.row_of, leased)
+            if row is not None and (row == after or not navigator.is_completed(row))]
+    if after in rows:
+        position = rows.index(after)
+        rows = rows[position + 1:] + rows[:position]
+    return rows[:count]
+
+
+# Ring buffer tweet berikutnya per sesi, diisi thread background
+if "prefetcher" not in st.session_state:
+    st.session_state.prefetcher = TweetPrefetcher(upcoming_rows, prepare_tweet)
+prefetcher = st.session_state.prefetcher
+
+
+def next_index_after(row):
+    # Pop dari buffer prefetch; kalau kosong baru ambil langsung dari jatah
+    prefetched = prefetcher.advance(row, skip=navigator.is_completed)
+    return prefetched["row"] if prefetched else next_leased_index()
+
+
+def go_to(row):
+    st.session_state.current_index = row
+    journal.move(row)
+    st.rerun()
 
 # ==== Main App ====
 st.title("🏛️ Anotator Sentimen Kabinet Merah Putih")
 
+# Status anotator, jatah tweet & antrian Google Sheet
+trace.section("render_sidebar")
+# Mode cepat memegang jatah lebih besar: satu jendela tweet untuk komponen keyboard
+fast_mode = st.session_state.get("fast_mode", False)
+if fast_mode:
+    my_leases = store.acquire_leases(ANNOTATOR_NAME, scheduler.ordered_ids(), size=WINDOW_SIZE)
+else:
+    my_leases = store.acquire_leases(ANNOTATOR_NAME, scheduler.ordered_ids())
+writer_status = get_sheet_writer().status()
+with st.sidebar:
+    st.write(f"👤 **{ANNOTATOR_NAME}**")
+    st.caption(f"🎫 Jatah tweet aktif: {len(my_leases)}")
+    if st.button("🔄 Ganti Anotator"):
+        st.query_params.clear()
+        for key in list(st.session_state.keys()):
+            del st.session_state[key]
+        st.rerun()
+    st.toggle("⚡ Mode cepat (keyboard)", key="fast_mode",
+              help="Satu tombol per tweet, label dikirim per batch tanpa rerun per tweet")
+    st.metric("📤 Antrian Google Sheet", f"{writer_status['depth']} baris")
+    prelabel_status = prelabeler.status()
+    if prelabel_status["enabled"]:
+        st.caption(f"🤖 Pre-label {prelabel_status['version']}: {prelabel_status['predicted']} tweet diprediksi, "
+                   f"{prelabel_status['queued']} menunggu")
+        if prelabel_status["last_error"]:
+            st.warning(f"⚠️ Pre-label gagal: {prelabel_status['last_error']}")
+    scheduler_status = scheduler.status()
+    st.caption(f"🎯 Urutan active learning ({scheduler_status['strategy']}): "
+               f"{scheduler_status['scored']}/{scheduler_status['total']} tweet berskor")
+    if writer_status["last_error"]:
+        retry_in = writer_status["retry_in"] or 0
+        st.warning(f"⚠️ Gagal kirim, dicoba lagi dalam {retry_in:.0f} detik: {writer_status['last_error']}")
+    elif writer_status["last_flush"]:
+        last_flush = datetime.datetime.fromtimestamp(writer_status["last_flush"]).strftime("%H:%M:%S")
+        st.caption(f"✅ Terakhir terkirim {last_flush}")
+
+# ==== Mode Cepat (keyboard) ====
+# Batch label dari browser disimpan dulu, baru jendela tweet berikutnya
+# dikirim ke komponen; bagian form biasa di bawah tidak dirender.
+if fast_mode:
+    trace.section("render_fast_label")
+    batch = pending_batch()
+    if batch:
+        new_annotations = []
+        for label in batch["labels"]:
+            row = tweet_index.row_of(str(label["tweet_id"]))
+            if row is None or label["aspek"] not in ASPECTS or label["sentimen"] not in SENTIMENTS:
+                continue
+            new_annotations.append({"tweet_id": tweet_index.tweet_id(row), "tweet": corpus.text(row),
+                                    "aspek": label["aspek"], "sentimen": label["sentimen"]})
+        if new_annotations:
+            with trace.span("save_labels"):
+                store.upsert_many(ANNOTATOR_NAME, new_annotations)
+                scheduler.notify()
+                get_sheet_writer().enqueue(ANNOTATOR_NAME, new_annotations)
+            journal.move(tweet_index.row_of(new_annotations[-1]["tweet_id"]))
+        mark_committed(batch)
+        navigator.refresh(store.version(ANNOTATOR_NAME), views.completed_tweet_ids)
+        my_leases = store.acquire_leases(ANNOTATOR_NAME, scheduler.ordered_ids(), size=WINDOW_SIZE)
+
+    window = [row for row in map(tweet_index.row_of, sorted(my_leases, key=scheduler.rank))
+              if row is not None and not navigator.is_completed(row)]
+    prelabeler.submit(prelabel_item(row) for row in window)
+    items = []
+    for row in window:
+        window_id = tweet_index.tweet_id(row)
+        suggestions = [s for s in prelabeler.suggestions(window_id)
+                       if s["aspek"] in ASPECTS and s["sentimen"] in SENTIMENTS]
+        items.append({
+            "tweet_id": window_id,
+            "text": corpus.text(row),
+            "aspek_utama": PRELABEL_ASPECTS.get(corpus.column("aspek_utama", row)),
+            "suggestion": {"aspek": suggestions[0]["aspek"], "sentimen": suggestions[0]["sentimen"]}
+            if suggestions else None,
+        })
+
+    st.write("### ⚡ Mode Cepat")
+    st.progress(navigator.completed_count / len(corpus))
+    st.caption(f"{navigator.completed_count} dari {len(corpus)} tweet sudah dilabeli · "
+               f"{len(items)} tweet di jendela ini")
+    fast_label(items, ASPECTS, SENTIMENTS, storage_key=ANNOTATOR_NAME)
+    trace.finish()
+    st.stop()
+
 # Progress indicator
-progress = len(st.session_state.completed_tweets) / len(df)
+trace.section("render_tweet")
+progress = completed_count / len(corpus)
 st.progress(progress)
 
 # Info dataset
 col_info1, col_info2, col_info3 = st.columns(3)
 with col_info1:
-    st.metric("Total Dataset", f"{len(df)} tweet")
+    st.metric("Total Dataset", f"{len(corpus)} tweet")
+    st.caption(f"{tweet_index.unique_count} tweet unik setelah deduplikasi")
 with col_info2:
-    st.metric("Sudah Dilabeli", f"{len(st.session_state.completed_tweets)} tweet")
+    st.metric("Sudah Dilabeli", f"{completed_count} tweet")
 with col_info3:
-    remaining = len(df) - len(st.session_state.completed_tweets)
+    remaining = len(corpus) - completed_count
     st.metric("Tersisa", f"{remaining} tweet")
 
 st.divider()
 
-# Current tweet display
-current_tweet = df.iloc[st.session_state.current_index]["tweet"]
-aspek_utama = df.iloc[st.session_state.current_index]["aspek_utama"]
+# Current tweet display (dari buffer prefetch kalau sudah disiapkan)
+prefetcher.follow(st.session_state.current_index)
+current_view = prefetcher.entry(st.session_state.current_index) or prepare_tweet(st.session_state.current_index)
+current_tweet = current_view["text"]
+aspek_utama = current_view["aspek_utama"]
+tweet_id = current_view["tweet_id"]
 
-st.write(f"### 📝 Tweet ke-{st.session_state.current_index+1} dari {len(df)}")
+st.write(f"### 📝 Tweet ke-{st.session_state.current_index+1} dari {len(corpus)}")
 
 # Tampilkan badge aspek utama
 aspek_colors = {
@@ -157,36 +418,115 @@ badge = aspek_colors.get(aspek_utama, "⚪")
 
 st.info(f" **Tweet:** {current_tweet}")
 
+duplicate_count = current_view["duplicates"]
+if duplicate_count:
+    st.caption(f"🔁 Label tweet ini juga berlaku untuk {duplicate_count} tweet duplikat/hampir sama")
+
+other_holders = current_view["holders"]
+if other_holders:
+    st.warning(f"👥 Tweet ini sedang dikerjakan oleh {', '.join(other_holders)}")
+
 # Navigation buttons
 col1, col2, col3 = st.columns([1,1,1])
 with col1:
     if st.button("⬅️ Tweet Sebelumnya"):
         if st.session_state.current_index > 0:
             st.session_state.current_index -= 1
+            journal.move(st.session_state.current_index)
             st.rerun()
 
 with col2:
-    tweet_selector = st.selectbox("Pilih Tweet:", 
-                                 range(1, len(df)+1), 
-                                 index=st.session_state.current_index,
-                                 format_func=lambda x: f"Tweet {x}")
-    if tweet_selector - 1 != st.session_state.current_index:
-        st.session_state.current_index = tweet_selector - 1
-        st.rerun()
+    tweet_number = st.number_input("Nomor Tweet:", min_value=1, max_value=len(corpus),
+                                   value=st.session_state.current_index + 1, step=1)
+    if tweet_number - 1 != st.session_state.current_index:
+        go_to(tweet_number - 1)
 
 with col3:
     if st.button("Tweet Selanjutnya ➡️"):
-        if st.session_state.current_index < len(df) - 1:
-            st.session_state.current_index += 1
+        next_index = next_index_after(st.session_state.current_index)
+        if next_index is not None:
+            st.session_state.current_index = next_index
+            journal.move(st.session_state.current_index)
             st.rerun()
+        else:
+            st.info("🎉 Tidak ada tweet tersisa untuk dibagikan")
+
+trace.section("render_navigation")
+with st.expander("🧭 Navigasi Cepat"):
+    col_jump, col_next = st.columns(2)
+    with col_jump:
+        jump_target = st.text_input("Lompat ke nomor / ID tweet:", key="jump_target").strip()
+        if st.button("🔎 Lompat") and jump_target:
+            if jump_target.isdigit():
+                row = navigator.row_for_number(int(jump_target))
+            else:
+                row = navigator.row_for_id(jump_target)
+            if row is None:
+                st.error(f"❌ Tweet '{jump_target}' tidak ditemukan")
+            else:
+                go_to(row)
+    with col_next:
+        aspect_filter = st.selectbox("Aspek utama:", ["Semua Aspek"] + navigator.aspects(), key="nav_aspect")
+        aspect_filter = None if aspect_filter == "Semua Aspek" else aspect_filter
+        st.caption(f"{navigator.unlabeled_count(aspect_filter)} tweet belum dilabeli")
+        if st.button("⏭️ Belum Dilabeli Berikutnya"):
+            row = navigator.next_unlabeled(st.session_state.current_index, aspect_filter)
+            if row is None:
+                st.info("🎉 Semua tweet sudah dilabeli")
+            else:
+                go_to(row)
+
+    # Daftar tweet per halaman (ukuran halaman tetap)
+    page = st.number_input("Halaman:", min_value=1, max_value=navigator.page_count(),
+                           value=navigator.page_of(st.session_state.current_index), step=1)
+    for entry in navigator.page(page):
+        col_status, col_text, col_open = st.columns([1, 8, 1])
+        with col_status:
+            st.write(f"{'✅' if entry['completed'] else '⬜'} {entry['number']}")
+        with col_text:
+            st.caption(entry["snippet"])
+        with col_open:
+            if st.button("Buka", key=f"open_{entry['row']}"):
+                go_to(entry["row"])
+
+with st.expander("🔍 Antrian Kata Kunci"):
+    st.caption('Contoh: `responsif OR tanggap`, `"makan bergizi gratis"`, `menteri -korupsi`')
+    col_query, col_top = st.columns([3, 1])
+    with col_query:
+        keyword_query = st.text_input("Query:", key="keyword_query")
+    with col_top:
+        keyword_top = st.number_input("Jumlah:", min_value=1, max_value=len(corpus), value=min(100, len(corpus)), step=10)
+    only_unlabeled = st.checkbox("Hanya yang belum dilabeli", value=True)
+    if st.button("⚡ Buat Antrian") and keyword_query.strip():
+        started = time.perf_counter()
+        # Duplikat dilewati: cukup baris kanonik tiap kelompok
+        exclude = ~navigator.canonical_mask | (navigator.completed if only_unlabeled else False)
+        results = load_search_index().search(keyword_query, limit=keyword_top, exclude=exclude)
+        st.session_state.keyword_queue = [row for row, _ in results]
+        st.session_state.keyword_queue_ms = (time.perf_counter() - started) * 1000
+
+    keyword_queue = st.session_state.get("keyword_queue", [])
+    if keyword_queue:
+        open_queue = [row for row in keyword_queue if not navigator.is_completed(row)]
+        st.write(f"📋 {len(open_queue)} dari {len(keyword_queue)} tweet di antrian belum dilabeli "
+                 f"(dibuat dalam {st.session_state.keyword_queue_ms:.1f} ms)")
+        if st.button("⏭️ Berikutnya di Antrian"):
+            after = [row for row in open_queue if row != st.session_state.current_index]
+            if after:
+                go_to(after[0])
+            else:
+                st.info("🎉 Antrian sudah habis")
+        for row in open_queue[:5]:
+            st.caption(f"{row + 1}. {corpus.text(row)[:100]}")
 
 st.divider()
 
 # ==== Multi-Aspect Annotation Section ====
+trace.section("render_labeling")
 st.write("### 🎯 Label Aspek & Sentimen")
 
 # Display current aspects for this tweet
-tweet_key = f"tweet_{st.session_state.current_index}"
+tweet_key = f"tweet_{tweet_id}"
 if tweet_key not in st.session_state.current_aspects:
     st.session_state.current_aspects[tweet_key] = {}
 
@@ -204,8 +544,22 @@ if current_tweet_aspects:
             st.write(f"{color} {sentiment}")
         with col_c:
             if st.button(f"🗑️", key=f"del_{aspect}"):
-                del st.session_state.current_aspects[tweet_key][aspect]
+                journal.unlabel(tweet_key, aspect)
                 st.rerun()
+elif current_view["labels"]:
+    # Label yang sudah tersimpan di database (tweet ini pernah diselesaikan)
+    st.caption("💾 Tersimpan: " + ", ".join(f"{a} → {s}" for a, s in current_view["labels"].items()))
+
+# Saran model mengisi form lebih dulu; anotator tinggal konfirmasi / ubah
+suggestions = current_view["suggestions"]
+if suggestions:
+    best = suggestions[0]
+    if (st.session_state.get("prefilled_tweet") != tweet_id and not current_tweet_aspects
+            and best["aspek"] in ASPECTS and best["sentimen"] in SENTIMENTS):
+        st.session_state.aspect_selector = best["aspek"]
+        st.session_state.sentiment_selector = best["sentimen"]
+    st.session_state.prefilled_tweet = tweet_id
+    st.caption(f"🤖 Saran model: **{best['aspek']}** → **{best['sentimen']}** ({best['confidence']:.0%})")
 
 # Add new aspect-sentiment pair
 st.write("**Tambah Label Baru:**")
@@ -224,7 +578,7 @@ with col_sentiment:
 # Add aspect button
 if st.button("➕ Tambah Label", type="primary"):
     if selected_aspect != "-- Pilih Aspek --":
-        st.session_state.current_aspects[tweet_key][selected_aspect] = selected_sentiment
+        journal.label(tweet_key, selected_aspect, selected_sentiment)
         st.success(f"✅ Label **{selected_aspect}** → **{selected_sentiment}** berhasil ditambahkan!")
         st.rerun()
     else:
@@ -244,24 +598,32 @@ with col_complete:
         if has_aspects or has_new_selection:
             # Add the currently selected aspect if not already added
             if has_new_selection and selected_aspect not in current_tweet_aspects:
-                st.session_state.current_aspects[tweet_key][selected_aspect] = selected_sentiment
+                journal.label(tweet_key, selected_aspect, selected_sentiment)
             
             # Save all aspects to final annotations
+            new_annotations = []
             for aspect, sentiment in st.session_state.current_aspects[tweet_key].items():
-                st.session_state.annotations.append({
-                    "tweet_id": st.session_state.current_index + 1,
+                new_annotations.append({
+                    "tweet_id": tweet_id,
                     "tweet": current_tweet,
                     "aspek": aspect,
                     "sentimen": sentiment
                 })
+            with trace.span("save_labels"):
+                store.upsert_many(ANNOTATOR_NAME, new_annotations)
+                scheduler.notify()
+
+                # Kirim ke Google Sheet lewat antrian background (tidak menunggu jaringan)
+                get_sheet_writer().enqueue(ANNOTATOR_NAME, new_annotations)
             
-            st.session_state.completed_tweets.add(st.session_state.current_index)
             total_aspects = len(st.session_state.current_aspects[tweet_key])
             st.success(f"🎉 Tweet {st.session_state.current_index + 1} berhasil diselesaikan dengan {total_aspects} aspek!")
             
-            # Move to next tweet
-            if st.session_state.current_index < len(df) - 1:
-                st.session_state.current_index += 1
+            # Move to next tweet (dari jatah anotator ini)
+            next_index = next_index_after(st.session_state.current_index)
+            if next_index is not None:
+                st.session_state.current_index = next_index
+                journal.move(st.session_state.current_index)
                 st.rerun()
         else:
             st.error("❌ Pilih aspek dan sentimen sebelum menyelesaikan tweet!")
@@ -283,71 +645,68 @@ with col_info:
 st.divider()
 
 # ==== Results Summary ====
+trace.section("render_summary")
 st.write("### 📊 Ringkasan Hasil Anotasi")
 
-if st.session_state.annotations:
-    df_annotations = pd.DataFrame(st.session_state.annotations)
+# Hitungan dari tabel label_counts (diperbarui per label), bukan dari seluruh data
+label_total = views.label_count()
 
+if label_total:
     # Summary statistics
     col1, col2, col3 = st.columns(3)
     with col1:
-        st.metric("Total Label", len(df_annotations))
+        st.metric("Total Label", label_total)
     with col2:
-        st.metric("Tweet Selesai", len(st.session_state.completed_tweets))
+        st.metric("Tweet Selesai", completed_count)
     with col3:
-        aspects_count = df_annotations['aspek'].nunique()
-        st.metric("Aspek Unik", aspects_count)
+        st.metric("Aspek Unik", len(views.aspect_counts()))
 
-    # Show annotations table
+    # Tabel detail: hanya satu halaman yang diambil dari database & dikirim ke browser
     with st.expander("🔍 Lihat Detail Anotasi"):
-        st.dataframe(df_annotations)
+        col_annotator, col_aspect_filter, col_sentiment_filter, col_date = st.columns(4)
+        annotator_options = ["Semua Anotator"] + store.annotators()
+        with col_annotator:
+            annotator_filter = st.selectbox(
+                "Anotator:", annotator_options, key="table_annotator",
+                index=annotator_options.index(ANNOTATOR_NAME) if ANNOTATOR_NAME in annotator_options else 0,
+            )
+        with col_aspect_filter:
+            aspect_filter = st.selectbox("Aspek:", ["Semua Aspek"] + ASPECTS, key="table_aspect")
+        with col_sentiment_filter:
+            sentiment_filter = st.selectbox("Sentimen:", ["Semua Sentimen"] + SENTIMENTS, key="table_sentiment")
+        with col_date:
+            date_range = st.date_input("Tanggal:", value=(), key="table_dates")
+        table_page = st.number_input("Halaman:", min_value=1, value=1, step=1, key="table_page")
+        page_df, matching = views.page(
+            table_page,
+            annotator_name=None if annotator_filter == "Semua Anotator" else annotator_filter,
+            aspek=None if aspect_filter == "Semua Aspek" else aspect_filter,
+            sentimen=None if sentiment_filter == "Semua Sentimen" else sentiment_filter,
+            date_from=date_range[0] if len(date_range) > 0 else None,
+            date_to=date_range[-1] if len(date_range) > 0 else None,
+        )
+        st.dataframe(page_df, hide_index=True)
+        st.caption(f"{matching} label cocok · halaman {table_page} dari {max(1, -(-matching // PAGE_SIZE))}")
 
     # === Simpan dan ekspor hasil ===
     def save_annotations():
-        df_annotations = pd.DataFrame(st.session_state.annotations)
-
-        # 1️⃣ Simpan ke file lokal (backup)
-        csv_filename = "annotations.csv"
-        df_annotations.to_csv(csv_filename, index=False)
-
-        json_filename = "annotations.json"
-        df_annotations.to_json(json_filename, orient='records', indent=2)
-
-        txt_filename = "annotations.txt"
-        with open(txt_filename, 'w', encoding='utf-8') as f:
-            for _, row in df_annotations.iterrows():
-                f.write(f"$T$ {row['tweet']}\n")
-                f.write(f"{row['aspek']}\n")
-                f.write(f"{row['sentimen']}\n")
+        # 1️⃣ Simpan ke file lokal (backup), ditulis streaming per blok dari database
+        csv_filename = annotator_path(ANNOTATOR_NAME, "annotations.csv")
+        json_filename = annotator_path(ANNOTATOR_NAME, "annotations.json")
+        txt_filename = annotator_path(ANNOTATOR_NAME, "annotations.txt")
+        with trace.span("export"):
+            views.write_exports({"csv": csv_filename, "json": json_filename, "txt": txt_filename})
 
         # 2️⃣ Simpan ke Google Sheet (dengan nama anotator otomatis)
-        try:
-            sheet = connect_gsheet()
-            rows = []
-            for _, row in df_annotations.iterrows():
-                rows.append([
-                    row.get('tweet_id', ''),
-                    row.get('tweet', ''),
-                    row.get('aspek', ''),
-                    row.get('sentimen', ''),
-                    ANNOTATOR_NAME,
-                    datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                ])
-
-            sheet.append_rows(rows)  # HANYA 1 REQUEST
-            st.success(f"✅ Data berhasil dikirim ke Google Sheet oleh {ANNOTATOR_NAME}!")
-        except Exception as e:
-            st.error(f"⚠️ Gagal menyimpan ke Google Sheet: {e}")
-
-        # 3️⃣ Simpan progress state
-        state = {
-            'current_index': st.session_state.current_index,
-            'annotations': st.session_state.annotations,
-            'completed_tweets': list(st.session_state.completed_tweets),
-            'current_aspects': st.session_state.current_aspects
-        }
-        with open('annotation_state.json', 'w') as f:
-            json.dump(state, f)
+        #    Masuk antrian background; hanya baris baru/berubah yang dikirim
+        writer = get_sheet_writer()
+        with trace.span("sync"):
+            writer.enqueue(ANNOTATOR_NAME, views.annotations())
+            writer.flush_now()
+        st.success(f"✅ Data masuk antrian Google Sheet oleh {ANNOTATOR_NAME} ({writer.depth()} baris menunggu)")
+
+        # 3️⃣ Progress state sudah tercatat per aksi di journal; pastikan masuk disk
+        journal.sync()
 
         return csv_filename, json_filename, txt_filename
 
@@ -356,51 +715,50 @@ if st.session_state.annotations:
         save_annotations()
         st.success("✅ Progress berhasil disimpan!")
 
-    # Tombol download
-    col1, col2, col3 = st.columns(3)
+    # Tombol download: isi file baru dibuat (lalu di-cache) saat tombol diklik
+    col1, col2, col3, col4 = st.columns(4)
     with col1:
-        csv_data = df_annotations.to_csv(index=False)
         st.download_button(
             label="⬇️ Download CSV",
-            data=csv_data,
+            data=views.csv_bytes,
             file_name="annotations.csv",
             mime="text/csv"
         )
 
     with col2:
-        json_data = df_annotations.to_json(orient='records', indent=2)
         st.download_button(
             label="⬇️ Download JSON",
-            data=json_data,
+            data=views.json_bytes,
             file_name="annotations.json",
             mime="application/json"
         )
 
     with col3:
-        txt_data = ""
-        for _, row in df_annotations.iterrows():
-            txt_data += f"$T$ {row['tweet']}\n"
-            txt_data += f"{row['aspek']}\n"
-            txt_data += f"{row['sentimen']}\n"
-
         st.download_button(
             label="⬇️ Download TXT",
-            data=txt_data,
+            data=views.txt_bytes,
             file_name="annotations.txt",
             mime="text/plain"
         )
 
+    with col4:
+        st.download_button(
+            label="⬇️ Download ATEPC",
+            data=views.atepc_bytes,
+            file_name="annotations.txt.atepc",
+            mime="text/plain"
+        )
+
 else:
     st.info("👆 Mulai labeling untuk melihat ringkasan hasil")
 
 
 # ==== Statistics ====
-if st.session_state.annotations:
+trace.section("render_statistics")
+if label_total:
     with st.expander("📈 Statistik Sentimen"):
-        df_stats = pd.DataFrame(st.session_state.annotations)
-        
-        # Sentiment distribution
-        sentiment_counts = df_stats['sentimen'].value_counts()
+        # Sentiment distribution (GROUP BY di SQLite, di-cache per versi data)
+        sentiment_counts = views.sentiment_counts()
         st.write("**Distribusi Sentimen:**")
         for sentiment, count in sentiment_counts.items():
             color = "🟢" if sentiment == "Positif" else "🔴" if sentiment == "Negatif" else "🟡"
@@ -408,12 +766,49 @@ if st.session_state.annotations:
         
         # Aspect distribution  
         st.write("**Distribusi Aspek:**")
-        aspect_counts = df_stats['aspek'].value_counts()
-        for aspect, count in aspect_counts.head(5).items():
+        aspect_counts = views.aspect_counts()
+        for aspect, count in list(aspect_counts.items())[:5]:
             st.write(f"• {aspect}: {count}")
 
+
+@st.cache_resource
+def get_agreement():
+    # Satu engine per proses; tiap rerun hanya memproses event label baru
+    # dari annotations.db (semua anotator), bukan menggabung ulang seluruh data
+    return AgreementEngine()
+
+agreement = get_agreement()
+agreement.sync(store)
+
+# Hanya tampil kalau ada tweet yang dilabeli >= 2 anotator (lihat LABELS_PER_TWEET)
+if agreement.item_count():
+    with st.expander("🤝 Kesepakatan Antar Anotator"):
+        st.dataframe(pd.DataFrame(agreement.summary()), hide_index=True)
+        agreement_aspect = st.selectbox("Aspek:", [ALL] + agreement.aspects(), key="agreement_aspect")
+        pairs = agreement.pairwise(agreement_aspect)
+        if pairs:
+            st.write("**Cohen's kappa per pasangan anotator:**")
+            st.dataframe(pd.DataFrame(pairs), hide_index=True)
+
+        # Antrian adjudikasi: item yang labelnya belum sepakat, paling lama dulu
+        queue_total = agreement.disagreement_count(agreement_aspect)
+        st.write(f"**Belum sepakat:** {queue_total} item")
+        if queue_total:
+            queue = agreement.disagreements(agreement_aspect, limit=PAGE_SIZE)
+            st.dataframe(pd.DataFrame(queue), hide_index=True)
+            review = st.selectbox(
+                "Tinjau tweet:", range(len(queue)), key="agreement_review",
+                format_func=lambda i: f"{queue[i]['aspek']} · {str(queue[i]['tweet'])[:80]}",
+            )
+            if st.button("🔍 Buka untuk ditinjau", key="agreement_open"):
+                review_row = tweet_index.row_of(str(queue[review]["tweet_id"]))
+                if review_row is None:
+                    st.warning("Tweet tidak ditemukan di dataset saat ini.")
+                else:
+                    go_to(review_row)
+
 # ==== Clear Annotations Button ====
-if st.session_state.annotations:
+if label_total:
     st.markdown("---")
     st.markdown("### 🗑️ **Hapus Semua Anotasi**")
     
@@ -437,16 +832,20 @@ if st.session_state.annotations:
         with col_yes:
             if st.button("✅ Ya, Hapus Semua", type="primary", use_container_width=True):
                 # Clear all annotations and state
-                st.session_state.annotations = []
-                st.session_state.completed_tweets = set()
-                st.session_state.current_aspects = {}
+                store.clear(ANNOTATOR_NAME)
+                journal.clear()
+                prefetcher.invalidate()
+                st.session_state.current_aspects = journal.state["current_aspects"]
                 st.session_state.current_index = 0
                 st.session_state.confirm_clear = False
                 
                 # Remove saved files
                 try:
                     import os
-                    files_to_remove = ['annotation_state.json', 'annotations.csv', 'annotations.json', 'annotations.txt']
+                    files_to_remove = [
+                        annotator_path(ANNOTATOR_NAME, name)
+                        for name in ['annotations.csv', 'annotations.json', 'annotations.txt']
+                    ]
                     for file in files_to_remove:
                         if os.path.exists(file):
                             os.remove(file)
@@ -460,3 +859,30 @@ if st.session_state.annotations:
             if st.button("❌ Batal", use_container_width=True):
                 st.session_state.confirm_clear = False
                 st.rerun()
+
+# ==== Panel Profiling (admin) ====
+if IS_ADMIN:
+    trace.section("render_profiling")
+    with st.sidebar.expander("🛠️ Profiling"):
+        st.caption(f"{recorder.sampled} dari {recorder.reruns} rerun diukur "
+                   f"(sampling {recorder.sample_rate:.0%}, sesi admin selalu diukur)")
+        prefetch_status = prefetcher.status()
+        st.caption(f"⏩ Prefetch: {prefetch_status['buffered']}/{prefetch_status['ahead']} tweet siap, "
+                   f"{prefetch_status['hits']} hit / {prefetch_status['misses']} miss")
+        spans = recorder.span_summary()
+        if spans:
+            st.dataframe(pd.DataFrame(spans), hide_index=True)
+        recent = recorder.recent()
+        if recent:
+            last = recent[-1]
+            st.write(f"**Rerun terakhir:** {last['total'] * 1000:.0f} ms")
+            for name, seconds in last["spans"]:
+                st.write(f"• {name}: {seconds * 1000:.1f} ms")
+        sheet_requests = recorder.request_summary()
+        if sheet_requests:
+            st.write("**Request Google Sheet:**")
+            st.dataframe(pd.DataFrame(sheet_requests), hide_index=True)
+        st.download_button("⬇️ Metrics (Prometheus)", recorder.prometheus_text(), file_name="metrics.txt",
+                           mime="text/plain")
+
+trace.finish()
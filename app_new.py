@@ -1,7 +1,17 @@
 import streamlit as st
+import time
 import pandas as pd
-import json
-import os
+from annotation_journal import AnnotationJournal
+from annotation_store import AnnotationStore, migrate_journal
+from annotation_views import PAGE_SIZE, AnnotationViews
+from corpus_cache import open_corpus
+from tweet_index import TweetIndex, migrate_positional_ids
+from navigator import TweetNavigator
+from search_index import SearchIndex
+
+ANNOTATOR_NAME = "Anotator"
+# Dataset gabungan_dataset.csv punya urutan tweet_id sendiri, jadi databasenya dipisah dari app.py
+DB_PATH = "annotations_gabungan.db"
 
 # ==== Konfigurasi Aspek & Sentimen ====
 ASPECTS = [
@@ -13,47 +23,92 @@ ASPECTS = [
 
 SENTIMENTS = ["Positif", "Negatif", "Netral"]
 
+# ==== Load Dataset ====
+# Dibaca lewat cache mmap (dataset/.cache/), bukan read_csv di setiap rerun
+@st.cache_resource
+def load_corpus():
+    return open_corpus([("dataset/gabungan_dataset.csv", None)], "gabungan")
+
+corpus = load_corpus()
+
+@st.cache_resource
+def load_tweet_index():
+    # ID tweet stabil (hash isi) + kelompok duplikat / hampir duplikat
+    return TweetIndex(corpus)
+
+tweet_index = load_tweet_index()
+
+@st.cache_resource
+def load_search_index():
+    # Inverted index + BM25 atas gabungan_dataset.csv untuk antrian kata kunci
+    return SearchIndex(corpus)
+
 # ==== Session State Initialization ====
-if 'annotations' not in st.session_state:
-    st.session_state.annotations = []
+# State dibaca dari journal (snapshot + replay); annotation_state.json lama diimpor otomatis
+# Anotasi final disimpan di SQLite (upsert per tweet_id + aspek)
+@st.cache_resource
+def get_journal():
+    return AnnotationJournal()
+
+@st.cache_resource
+def get_store():
+    return AnnotationStore(DB_PATH)
+
+@st.cache_resource
+def get_views():
+    return AnnotationViews(get_store(), ANNOTATOR_NAME)
+
+journal = get_journal()
+store = get_store()
+views = get_views()
+migrate_journal(store, journal, ANNOTATOR_NAME)
+
 if 'current_index' not in st.session_state:
-    st.session_state.current_index = 0
+    st.session_state.current_index = journal.state["current_index"]
 if 'current_aspects' not in st.session_state:
-    st.session_state.current_aspects = {}
-if 'completed_tweets' not in st.session_state:
-    st.session_state.completed_tweets = set()
-
-# Try to load saved state
-try:
-    with open('annotation_state.json', 'r') as f:
-        saved_state = json.load(f)
-        st.session_state.annotations = saved_state.get('annotations', [])
-        st.session_state.current_index = saved_state.get('current_index', 0)
-        st.session_state.current_aspects = saved_state.get('current_aspects', {})
-        st.session_state.completed_tweets = set(saved_state.get('completed_tweets', []))
-except FileNotFoundError:
-    pass
+    st.session_state.current_aspects = journal.state["current_aspects"]
+
+@st.cache_resource
+def migrate_tweet_ids():
+    # Sekali per proses: label lama ber-ID posisi dipindah ke ID stabil
+    return len(migrate_positional_ids(store, tweet_index))
+
+migrate_tweet_ids()
+
+@st.cache_resource
+def get_navigator():
+    # Bitmap tweet selesai + index navigasi, dibangun ulang per versi data
+    return TweetNavigator(tweet_index)
+
+# Label satu tweet berlaku juga untuk duplikatnya
+navigator = get_navigator()
+navigator.refresh(store.version(ANNOTATOR_NAME), views.completed_tweet_ids)
+completed_count = navigator.completed_count
+
+
+def go_to(row):
+    st.session_state.current_index = row
+    journal.move(row)
+    st.rerun()
 
-# ==== Load Dataset ====
-df = pd.read_csv("dataset/gabungan_dataset.csv")
-df = df.rename(columns={'Cleaned_Tweet': 'tweet'})
 
 # ==== Main App ====
 st.title("🏛️ Anotator Sentimen Kabinet Merah Putih")
 st.subheader("Analisis Sentimen Berbasis Aspek Tweet Politik")
 
 # Progress indicator
-progress = len(st.session_state.completed_tweets) / len(df)
+progress = completed_count / len(corpus)
 st.progress(progress)
-st.write(f"Progress: {len(st.session_state.completed_tweets)}/{len(df)} tweet selesai dilabeli")
+st.write(f"Progress: {completed_count}/{len(corpus)} tweet selesai dilabeli")
 
 # Current tweet display
-current_tweet = df.iloc[st.session_state.current_index]["tweet"]
-st.write(f"### Tweet ke-{st.session_state.current_index+1} dari {len(df)}")
+current_tweet = corpus.text(st.session_state.current_index)
+tweet_id = tweet_index.tweet_id(st.session_state.current_index)
+st.write(f"### Tweet ke-{st.session_state.current_index+1} dari {len(corpus)}")
 st.info(f"📝 **Tweet:** {current_tweet}")
 
 # Get current tweet's key
-tweet_key = f"tweet_{st.session_state.current_index}"
+tweet_key = f"tweet_{tweet_id}"
 if tweet_key not in st.session_state.current_aspects:
     st.session_state.current_aspects[tweet_key] = {}
 
@@ -64,23 +119,85 @@ with col1:
     if st.button("⬅️ Tweet Sebelumnya"):
         if st.session_state.current_index > 0:
             st.session_state.current_index -= 1
+            journal.move(st.session_state.current_index)
             st.rerun()
 
 with col2:
-    tweet_selector = st.selectbox("Pilih Tweet:", 
-                                 range(1, len(df)+1), 
-                                 index=st.session_state.current_index,
-                                 format_func=lambda x: f"Tweet {x}")
-    if tweet_selector - 1 != st.session_state.current_index:
-        st.session_state.current_index = tweet_selector - 1
-        st.rerun()
+    tweet_number = st.number_input("Nomor Tweet:", min_value=1, max_value=len(corpus),
+                                   value=st.session_state.current_index + 1, step=1)
+    if tweet_number - 1 != st.session_state.current_index:
+        go_to(tweet_number - 1)
 
 with col3:
     if st.button("Tweet Selanjutnya ➡️"):
-        if st.session_state.current_index < len(df) - 1:
-            st.session_state.current_index += 1
+        next_index = tweet_index.next_unique_row(st.session_state.current_index)
+        if next_index is not None:
+            st.session_state.current_index = next_index
+            journal.move(st.session_state.current_index)
             st.rerun()
 
+with st.expander("🧭 Navigasi Cepat"):
+    col_jump, col_next = st.columns(2)
+    with col_jump:
+        jump_target = st.text_input("Lompat ke nomor / ID tweet:", key="jump_target").strip()
+        if st.button("🔎 Lompat") and jump_target:
+            row = navigator.row_for_number(int(jump_target)) if jump_target.isdigit() else navigator.row_for_id(jump_target)
+            if row is None:
+                st.error(f"❌ Tweet '{jump_target}' tidak ditemukan")
+            else:
+                go_to(row)
+    with col_next:
+        st.caption(f"{navigator.unlabeled_count()} tweet belum dilabeli")
+        if st.button("⏭️ Belum Dilabeli Berikutnya"):
+            row = navigator.next_unlabeled(st.session_state.current_index)
+            if row is None:
+                st.info("🎉 Semua tweet sudah dilabeli")
+            else:
+                go_to(row)
+
+    # Daftar tweet per halaman (ukuran halaman tetap)
+    page = st.number_input("Halaman:", min_value=1, max_value=navigator.page_count(),
+                           value=navigator.page_of(st.session_state.current_index), step=1)
+    for entry in navigator.page(page):
+        col_status, col_text, col_open = st.columns([1, 8, 1])
+        with col_status:
+            st.write(f"{'✅' if entry['completed'] else '⬜'} {entry['number']}")
+        with col_text:
+            st.caption(entry["snippet"])
+        with col_open:
+            if st.button("Buka", key=f"open_{entry['row']}"):
+                go_to(entry["row"])
+
+with st.expander("🔍 Antrian Kata Kunci"):
+    st.caption('Contoh: `responsif OR tanggap`, `"makan bergizi gratis"`, `menteri -korupsi`')
+    col_query, col_top = st.columns([3, 1])
+    with col_query:
+        keyword_query = st.text_input("Query:", key="keyword_query")
+    with col_top:
+        keyword_top = st.number_input("Jumlah:", min_value=1, max_value=len(corpus), value=min(100, len(corpus)), step=10)
+    only_unlabeled = st.checkbox("Hanya yang belum dilabeli", value=True)
+    if st.button("⚡ Buat Antrian") and keyword_query.strip():
+        started = time.perf_counter()
+        # Duplikat dilewati: cukup baris kanonik tiap kelompok
+        exclude = ~navigator.canonical_mask | (navigator.completed if only_unlabeled else False)
+        results = load_search_index().search(keyword_query, limit=keyword_top, exclude=exclude)
+        st.session_state.keyword_queue = [row for row, _ in results]
+        st.session_state.keyword_queue_ms = (time.perf_counter() - started) * 1000
+
+    keyword_queue = st.session_state.get("keyword_queue", [])
+    if keyword_queue:
+        open_queue = [row for row in keyword_queue if not navigator.is_completed(row)]
+        st.write(f"📋 {len(open_queue)} dari {len(keyword_queue)} tweet di antrian belum dilabeli "
+                 f"(dibuat dalam {st.session_state.keyword_queue_ms:.1f} ms)")
+        if st.button("⏭️ Berikutnya di Antrian"):
+            after = [row for row in open_queue if row != st.session_state.current_index]
+            if after:
+                go_to(after[0])
+            else:
+                st.info("🎉 Antrian sudah habis")
+        for row in open_queue[:5]:
+            st.caption(f"{row + 1}. {corpus.text(row)[:100]}")
+
 st.divider()
 
 # ==== Multi-Aspect Annotation Section ====
@@ -98,7 +215,7 @@ if st.session_state.current_aspects[tweet_key]:
             st.write(f"{color} {sentiment}")
         with col_c:
             if st.button(f"🗑️", key=f"del_{aspect}_{tweet_key}"):
-                del st.session_state.current_aspects[tweet_key][aspect]
+                journal.unlabel(tweet_key, aspect)
                 st.rerun()
 
 # Add new aspect-sentiment pair
@@ -118,7 +235,7 @@ with col_sentiment:
 # Add aspect button
 if st.button("➕ Tambah Label", type="primary", key=f"add_label_{tweet_key}"):
     if selected_aspect != "-- Pilih Aspek --":
-        st.session_state.current_aspects[tweet_key][selected_aspect] = selected_sentiment
+        journal.label(tweet_key, selected_aspect, selected_sentiment)
         st.success(f"✅ Label **{selected_aspect}** → **{selected_sentiment}** berhasil ditambahkan!")
         st.rerun()
     else:
@@ -136,39 +253,24 @@ if st.button("✅ Selesai Label Tweet Ini", type="primary", use_container_width=
     
     if len(current_aspects) > 0:
         # Add to final annotations
+        new_annotations = []
         for aspect, sentiment in current_aspects.items():
-            annotation = {
-                "tweet_id": st.session_state.current_index + 1,
+            new_annotations.append({
+                "tweet_id": tweet_id,
                 "tweet": current_tweet.strip(),
                 "aspek": aspect.strip(),
                 "sentimen": sentiment.strip()
-            }
-            
-            # Remove any existing annotation for this tweet and aspect
-            st.session_state.annotations = [
-                a for a in st.session_state.annotations 
-                if not (a["tweet_id"] == annotation["tweet_id"] and a["aspek"] == annotation["aspek"])
-            ]
-            
-            # Add the new annotation
-            st.session_state.annotations.append(annotation)
+            })
         
-        st.session_state.completed_tweets.add(st.session_state.current_index)
+        # Anotasi lama untuk tweet & aspek yang sama diganti (upsert)
+        store.upsert_many(ANNOTATOR_NAME, new_annotations)
         st.success(f"🎉 Tweet {st.session_state.current_index + 1} berhasil diselesaikan dengan {len(current_aspects)} aspek!")
         
-        # Save state
-        state = {
-            'current_index': st.session_state.current_index,
-            'annotations': st.session_state.annotations,
-            'completed_tweets': list(st.session_state.completed_tweets),
-            'current_aspects': st.session_state.current_aspects
-        }
-        with open('annotation_state.json', 'w') as f:
-            json.dump(state, f)
-        
         # Move to next tweet
-        if st.session_state.current_index < len(df) - 1:
-            st.session_state.current_index += 1
+        next_index = tweet_index.next_unique_row(st.session_state.current_index)
+        if next_index is not None:
+            st.session_state.current_index = next_index
+            journal.move(st.session_state.current_index)
             st.rerun()
     else:
         st.error("❌ Tambahkan minimal 1 aspek sebelum menyelesaikan tweet!")
@@ -178,60 +280,78 @@ st.divider()
 # ==== Results Summary ====
 st.write("### 📊 Ringkasan Hasil Anotasi")
 
-if st.session_state.annotations:
-    df_annotations = pd.DataFrame(st.session_state.annotations)
-    
+# Hitungan dari tabel label_counts (diperbarui per label), bukan dari seluruh data
+label_total = views.label_count()
+
+if label_total:
     # Summary statistics
     col1, col2, col3 = st.columns(3)
     with col1:
-        st.metric("Total Label", len(df_annotations))
+        st.metric("Total Label", label_total)
     with col2:
-        st.metric("Tweet Selesai", len(st.session_state.completed_tweets))
+        st.metric("Tweet Selesai", completed_count)
     with col3:
-        aspects_count = df_annotations['aspek'].nunique()
-        st.metric("Aspek Unik", aspects_count)
+        st.metric("Aspek Unik", len(views.aspect_counts()))
     
-    # Show annotations table
+    # Tabel detail per halaman, difilter di database
     with st.expander("🔍 Lihat Detail Anotasi"):
-        st.dataframe(df_annotations)
+        col_aspect_filter, col_sentiment_filter, col_date = st.columns(3)
+        with col_aspect_filter:
+            aspect_filter = st.selectbox("Aspek:", ["Semua Aspek"] + ASPECTS, key="table_aspect")
+        with col_sentiment_filter:
+            sentiment_filter = st.selectbox("Sentimen:", ["Semua Sentimen"] + SENTIMENTS, key="table_sentiment")
+        with col_date:
+            date_range = st.date_input("Tanggal:", value=(), key="table_dates")
+        table_page = st.number_input("Halaman:", min_value=1, value=1, step=1, key="table_page")
+        page_df, matching = views.page(
+            table_page,
+            annotator_name=ANNOTATOR_NAME,
+            aspek=None if aspect_filter == "Semua Aspek" else aspect_filter,
+            sentimen=None if sentiment_filter == "Semua Sentimen" else sentiment_filter,
+            date_from=date_range[0] if len(date_range) > 0 else None,
+            date_to=date_range[-1] if len(date_range) > 0 else None,
+        )
+        st.dataframe(page_df, hide_index=True)
+        st.caption(f"{matching} label cocok · halaman {table_page} dari {max(1, -(-matching // PAGE_SIZE))}")
     
-    # Download buttons
-    col1, col2, col3 = st.columns(3)
+    # Download buttons (isi file dibuat saat tombol diklik, lewat modul exporters)
+    col1, col2, col3, col4 = st.columns(4)
     with col1:
-        csv_data = df_annotations.to_csv(index=False)
         st.download_button(
             label="⬇️ Download CSV",
-            data=csv_data,
+            data=views.csv_bytes,
             file_name="annotations.csv",
             mime="text/csv"
         )
     
     with col2:
-        json_data = df_annotations.to_json(orient='records', indent=2)
         st.download_button(
             label="⬇️ Download JSON",
-            data=json_data,
+            data=views.json_bytes,
             file_name="annotations.json",
             mime="application/json"
         )
         
     with col3:
-        txt_data = ""
-        df_unique = df_annotations.drop_duplicates(subset=['tweet', 'aspek'], keep='first')
-        for _, row in df_unique.iterrows():
-            txt_data += f"$T$ {row['tweet'].strip()}\n{row['aspek'].strip()}\n{row['sentimen'].strip()}\n"
-        
         st.download_button(
             label="⬇️ Download TXT",
-            data=txt_data,
+            data=views.txt_bytes,
             file_name="annotations.txt",
             mime="text/plain"
         )
+
+    with col4:
+        st.download_button(
+            label="⬇️ Download ATEPC",
+            data=views.atepc_bytes,
+            file_name="annotations.txt.atepc",
+            mime="text/plain"
+        )
     
     # Statistics
     with st.expander("📈 Statistik Sentimen"):
         # Sentiment distribution
-        sentiment_counts = df_annotations['sentimen'].value_counts()
+        sentiment_counts = views.sentiment_counts()
         st.write("**Distribusi Sentimen:**")
         for sentiment, count in sentiment_counts.items():
             color = "🟢" if sentiment == "Positif" else "🔴" if sentiment == "Negatif" else "🟡"
@@ -239,7 +359,7 @@ if st.session_state.annotations:
         
         # Aspect distribution  
         st.write("**Distribusi Aspek:**")
-        aspect_counts = df_annotations['aspek'].value_counts()
+        aspect_counts = views.aspect_counts()
         for aspect, count in aspect_counts.items():
             st.write(f"• {aspect}: {count}")
     
@@ -256,12 +376,10 @@ if st.session_state.annotations:
                 st.rerun()
         else:
             if st.button("⚠️ Konfirmasi Clear Semua Label", type="primary", use_container_width=True):
-                st.session_state.annotations = []
-                st.session_state.completed_tweets = set()
-                st.session_state.current_aspects = {}
+                store.clear(ANNOTATOR_NAME)
+                journal.clear()
+                st.session_state.current_aspects = journal.state["current_aspects"]
                 st.session_state.current_index = 0
                 st.session_state.show_clear_confirmation = False
-                if os.path.exists('annotation_state.json'):
-                    os.remove('annotation_state.json')
                 st.success("✅ Semua label berhasil dihapus!")
                 st.rerun()
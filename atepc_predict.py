@@ -0,0 +1,143 @@
+import argparse
+import json
+import os
+import time
+
+import pandas as pd
+
+from corpus_cache import TEXT_COLUMN
+
+# ==== Prediksi ATEPC per batch ====
+# Pengganti predict_aspects() di Aspect_Term_Extraction.ipynb yang memanggil
+# aspect_extractor.predict() satu tweet per panggilan (eval_batch_size tidak
+# pernah terpakai). Di sini tweet dibaca streaming, dikumpulkan per buffer,
+# diurutkan menurut panjang (length bucketing) lalu dikirim ke model sebagai
+# batch sungguhan di bawah torch.inference_mode. Hasil ditulis per buffer ke
+# JSONL (satu baris per tweet, urutan input tetap), sehingga job yang
+# terhenti bisa dilanjutkan dari baris terakhir yang sudah tertulis.
+#
+#     python atepc_predict.py --checkpoint checkpoints/atepc_fast_lcf \
+#         --input dataset/dataset_labeling_bersih.csv --output dataset/atepc_predictions.jsonl \
+#         --threads 4 --quantize
+
+ATEPC_CHECKPOINT = os.environ.get("ATEPC_CHECKPOINT", os.path.join("checkpoints", "atepc_fast_lcf"))
+BATCH_SIZE = 32
+# Jumlah tweet yang dikumpulkan sebelum diurutkan per panjang & diprediksi
+BUFFER_BATCHES = 8
+RESULT_KEYS = ("aspect", "position", "sentiment", "confidence")
+
+
+def load_extractor(checkpoint=ATEPC_CHECKPOINT, threads=None, quantize=False):
+    import torch
+    from pyabsa import AspectTermExtraction as ATEPC
+
+    if threads:
+        torch.set_num_threads(threads)
+    extractor = ATEPC.AspectExtractor(checkpoint=checkpoint, auto_device=False)
+    if quantize and hasattr(extractor, "model"):
+        # Bobot Linear jadi int8 (dynamic quantization): lebih cepat di CPU
+        extractor.model = torch.quantization.quantize_dynamic(extractor.model, {torch.nn.Linear}, dtype=torch.qint8)
+    return extractor
+
+
+def iter_texts(source, chunksize=10_000):
+    # source: path CSV (kolom Cleaned_Tweet) atau iterable string
+    if isinstance(source, (str, os.PathLike)):
+        for chunk in pd.read_csv(source, usecols=[TEXT_COLUMN], chunksize=chunksize):
+            yield from chunk[TEXT_COLUMN].fillna("").astype(str)
+        return
+    yield from source
+
+
+def _to_record(row, text, result):
+    record = {"row": row, "text": text}
+    for key in RESULT_KEYS:
+        value = (result or {}).get(key, [])
+        record[key] = [v.tolist() if hasattr(v, "tolist") else v for v in value]
+    return record
+
+
+def predict_buffer(extractor, rows, texts, batch_size=BATCH_SIZE):
+    import torch
+
+    order = sorted(range(len(texts)), key=lambda i: len(texts[i].split()))
+    results = [None] * len(texts)
+    with torch.inference_mode():
+        for start in range(0, len(order), batch_size):
+            indices = [i for i in order[start:start + batch_size] if texts[i].strip()]
+            if not indices:
+                continue
+            outputs = extractor.predict(
+                text=[texts[i] for i in indices],
+                print_result=False,
+                save_result=False,
+                ignore_error=True,
+                eval_batch_size=batch_size,
+            )
+            if isinstance(outputs, dict):
+                outputs = [outputs]
+            for i, output in zip(indices, outputs):
+                results[i] = output
+    return [_to_record(row, text, result) for row, text, result in zip(rows, texts, results)]
+
+
+def _done_rows(output_path):
+    # (jumlah baris lengkap, posisi byte akhirnya) yang sudah tertulis: checkpoint untuk resume
+    if not os.path.exists(output_path):
+        return 0, 0
+    count = end = 0
+    with open(output_path, "rb") as f:
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            count += 1
+            end += len(line)
+    return count, end
+
+
+def predict_to_file(extractor, source, output_path, batch_size=BATCH_SIZE, buffer_batches=BUFFER_BATCHES):
+    skip, end = _done_rows(output_path)
+    if os.path.exists(output_path):
+        # Buang baris terakhir yang mungkin setengah tertulis
+        with open(output_path, "rb+") as f:
+            f.truncate(end)
+
+    started = time.perf_counter()
+    written = 0
+    buffer_rows, buffer_texts = [], []
+    with open(output_path, "a", encoding="utf-8") as out:
+        def flush():
+            nonlocal written
+            for record in predict_buffer(extractor, buffer_rows, buffer_texts, batch_size):
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            out.flush()
+            written += len(buffer_rows)
+            buffer_rows.clear()
+            buffer_texts.clear()
+
+        for row, text in enumerate(iter_texts(source)):
+            if row < skip:
+                continue
+            buffer_rows.append(row)
+            buffer_texts.append(text)
+            if len(buffer_texts) >= batch_size * buffer_batches:
+                flush()
+                rate = written / max(time.perf_counter() - started, 1e-9)
+                print(f"{skip + written} tweet selesai ({rate:.1f} tweet/detik)")
+        if buffer_texts:
+            flush()
+    return skip + written
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Prediksi ATEPC per batch ke JSONL")
+    parser.add_argument("--checkpoint", default=ATEPC_CHECKPOINT)
+    parser.add_argument("--input", default="dataset/dataset_labeling_bersih.csv")
+    parser.add_argument("--output", default="dataset/atepc_predictions.jsonl")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--threads", type=int, default=None)
+    parser.add_argument("--quantize", action="store_true", help="dynamic int8 quantization untuk CPU")
+    args = parser.parse_args()
+    extractor = load_extractor(args.checkpoint, args.threads, args.quantize)
+    total = predict_to_file(extractor, args.input, args.output, args.batch_size)
+    print(f"✅ {total} prediksi tersimpan di '{args.output}'")
@@ -0,0 +1,252 @@
+import argparse
+import ast
+import datetime
+import glob
+import json
+import os
+import random
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+# ==== Benchmark jalur rerun app.py ====
+# app.py dijalankan headless dengan streamlit.testing AppTest di folder kerja
+# sementara berisi korpus sintetis dan `size` anotasi yang sudah ada. Google
+# Sheets diganti sheet palsu di memori (SHEET_BACKEND=fake). Sesi berskrip
+# (label, selesai, next, lompat, simpan) diulang, lalu dicatat per aksi:
+#   - latensi rerun p50 / p95 (ms)
+#   - byte yang ditulis proses (/proc/self/io wchar) per aksi
+#   - peak RSS proses
+# Tiap ukuran dijalankan di subprocess sendiri supaya peak RSS tidak
+# tercampur. Hasil ditambahkan ke file JSON (satu entri per run, dengan
+# commit git) sehingga regresi antar perubahan kelihatan.
+#
+#     python benchmark_app.py --sizes 1000 10000 --steps 20
+
+SIZES = (1_000, 10_000)
+STEPS = 20
+RESULTS_PATH = "benchmark_results.json"
+ANNOTATOR = "Bench Annotator"
+ACTIONS = ("label", "complete", "next", "jump", "save")
+SOURCE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+# ---- Data sintetis ----
+def _vocabulary():
+    words = set()
+    for path in glob.glob(os.path.join(SOURCE_DIR, "dataset", "filtered_aspek_*.csv")):
+        for text in pd.read_csv(path)["Cleaned_Tweet"].dropna():
+            words.update(text.split())
+    return sorted(words) or [f"kata{i}" for i in range(2000)]
+
+
+def _aspect_files(app="app.py"):
+    # ASPECT_FILES dibaca dari source app.py (script Streamlit tidak bisa di-import)
+    with open(os.path.join(SOURCE_DIR, app), "r", encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and any(getattr(t, "id", None) == "ASPECT_FILES" for t in node.targets):
+            return ast.literal_eval(node.value)
+    raise ValueError(f"ASPECT_FILES tidak ditemukan di {app}")
+
+
+def make_workspace(size, corpus_size, seed=0):
+    # Folder kerja: salinan modul app (+ frontend komponen) + CSV aspek sintetis + annotations.db berisi `size` label
+    from annotation_store import AnnotationStore
+    from corpus_cache import text_id
+
+    work = tempfile.mkdtemp(prefix=f"bench_{size}_")
+    for path in glob.glob(os.path.join(SOURCE_DIR, "*.py")):
+        shutil.copy(path, work)
+    shutil.copytree(os.path.join(SOURCE_DIR, "fast_label_frontend"), os.path.join(work, "fast_label_frontend"))
+    os.makedirs(os.path.join(work, "dataset"))
+
+    rng = random.Random(seed)
+    vocabulary = _vocabulary()
+    files = list(_aspect_files().values())
+    texts = []
+    per_file = -(-corpus_size // len(files))
+    for name in files:
+        chunk = [" ".join(rng.choice(vocabulary) for _ in range(rng.randint(12, 30))) for _ in range(per_file)]
+        pd.DataFrame({"Cleaned_Tweet": chunk}).to_csv(os.path.join(work, "dataset", name), index=False)
+        texts.extend(chunk)
+
+    store = AnnotationStore(os.path.join(work, "annotations.db"))
+    aspects = ["Kebijakan Pemerintah", "Kompetensi Menteri", "Fleksibilitas", "Keterwakilan", "Transparansi"]
+    sentiments = ["Positif", "Negatif", "Netral"]
+    for start in range(0, size, 10_000):
+        store.upsert_many(ANNOTATOR, [
+            {"tweet_id": text_id(text), "tweet": text, "aspek": rng.choice(aspects), "sentimen": rng.choice(sentiments)}
+            for text in texts[start:min(size, start + 10_000)]
+        ])
+    store.close()
+    return work
+
+
+# ---- Sesi berskrip ----
+def _written_bytes():
+    # Byte yang ditulis lewat syscall write oleh proses ini (Linux)
+    try:
+        with open("/proc/self/io", "r") as f:
+            for line in f:
+                if line.startswith("wchar:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+
+def _button(at, text):
+    return next(b for b in at.button if text in b.label)
+
+
+def _perform(at, action, rng, corpus_size):
+    if action == "label":
+        at.selectbox(key="aspect_selector").select_index(rng.randint(1, 5))
+        at.selectbox(key="sentiment_selector").select_index(rng.randint(0, 2))
+        _button(at, "Tambah Label").click().run()
+    elif action == "complete":
+        _button(at, "SELESAI LABEL").click().run()
+    elif action == "next":
+        _button(at, "Tweet Selanjutnya").click().run()
+    elif action == "jump":
+        at.text_input(key="jump_target").input(str(rng.randint(1, corpus_size)))
+        _button(at, "Lompat").click().run()
+    elif action == "save":
+        _button(at, "Simpan Progress").click().run()
+    if at.exception:
+        raise RuntimeError(f"{action}: {at.exception[0].value}")
+
+
+def run_session(work, app, steps, corpus_size, seed=0, timeout=600, sheet_latency=0.0):
+    from streamlit.testing.v1 import AppTest
+
+    os.chdir(work)
+    sys.path.insert(0, work)
+    # Sheet palsu di memori proses ini (sheet_backend.py), tanpa jaringan
+    os.environ["SHEET_BACKEND"] = "fake"
+    from sheet_backend import fake_sheet
+
+    sheet = fake_sheet(latency=sheet_latency)
+    rng = random.Random(seed)
+
+    at = AppTest.from_file(os.path.join(work, app), default_timeout=timeout)
+    at.query_params["annotator"] = ANNOTATOR
+    started = time.perf_counter()
+    at.run()
+    cold_start = time.perf_counter() - started
+    if at.exception:
+        raise RuntimeError(f"cold start: {at.exception[0].value}")
+
+    latencies = {action: [] for action in ACTIONS}
+    written = {action: [] for action in ACTIONS}
+    for _ in range(steps):
+        for action in ACTIONS:
+            before = _written_bytes()
+            started = time.perf_counter()
+            _perform(at, action, rng, corpus_size)
+            latencies[action].append(time.perf_counter() - started)
+            written[action].append(_written_bytes() - before)
+
+    summary = {}
+    for action in ACTIONS:
+        values = np.array(latencies[action]) * 1000
+        summary[action] = {
+            "runs": len(values),
+            "p50_ms": round(float(np.percentile(values, 50)), 2),
+            "p95_ms": round(float(np.percentile(values, 95)), 2),
+            "bytes_written_mean": int(np.mean(written[action])),
+        }
+    return {
+        "cold_start_s": round(cold_start, 3),
+        "actions": summary,
+        # ru_maxrss dalam KB di Linux
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "sheet": sheet.snapshot(),
+    }
+
+
+# ---- Runner ----
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=SOURCE_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def benchmark(sizes=SIZES, steps=STEPS, app="app.py", corpus_factor=1.2, output=RESULTS_PATH, keep=False,
+              sheet_latency=0.0):
+    run = {
+        "timestamp": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "commit": _git_commit(),
+        "app": app,
+        "steps": steps,
+        "sheet_latency": sheet_latency,
+        "results": {},
+    }
+    for size in sizes:
+        corpus_size = max(500, int(size * corpus_factor))
+        print(f"⏱️  {size} anotasi, korpus {corpus_size} tweet ...")
+        # Subprocess per ukuran: peak RSS & cache Streamlit tidak tercampur
+        completed = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--worker", "--sizes", str(size),
+             "--steps", str(steps), "--app", app, "--corpus-size", str(corpus_size),
+             "--sheet-latency", str(sheet_latency)] + (["--keep"] if keep else []),
+            capture_output=True, text=True,
+        )
+        if completed.returncode != 0:
+            run["results"][str(size)] = {"error": completed.stderr.strip().splitlines()[-1:]}
+            print(completed.stderr)
+            continue
+        result = json.loads(completed.stdout.strip().splitlines()[-1])
+        run["results"][str(size)] = result
+        for action, stats in result["actions"].items():
+            print(f"   {action:<9} p50 {stats['p50_ms']:>8.1f} ms  p95 {stats['p95_ms']:>8.1f} ms  "
+                  f"{stats['bytes_written_mean']:>10} B")
+        print(f"   peak RSS {result['peak_rss_mb']} MB, cold start {result['cold_start_s']} s")
+
+    runs = []
+    if os.path.exists(output):
+        with open(output, "r", encoding="utf-8") as f:
+            runs = json.load(f)
+    runs.append(run)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(runs, f, indent=2)
+    print(f"✅ Hasil ditambahkan ke '{output}'")
+    return run
+
+
+def _worker(args):
+    work = make_workspace(args.sizes[0], args.corpus_size)
+    try:
+        result = run_session(work, args.app, args.steps, args.corpus_size, sheet_latency=args.sheet_latency)
+        result["workspace"] = work if args.keep else None
+        print(json.dumps(result))
+    finally:
+        if not args.keep:
+            shutil.rmtree(work, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark rerun app.py (AppTest + sheet palsu)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES), help="jumlah anotasi yang sudah ada")
+    parser.add_argument("--steps", type=int, default=STEPS, help="jumlah putaran label/selesai/next/lompat/simpan")
+    parser.add_argument("--app", default="app.py")
+    parser.add_argument("--corpus-factor", type=float, default=1.2, help="ukuran korpus = faktor x jumlah anotasi")
+    parser.add_argument("--output", default=RESULTS_PATH)
+    parser.add_argument("--sheet-latency", type=float, default=0.0, help="latensi per request sheet palsu (detik)")
+    parser.add_argument("--keep", action="store_true", help="jangan hapus folder kerja sementara")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--corpus-size", type=int, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.worker:
+        _worker(args)
+    else:
+        benchmark(args.sizes, args.steps, args.app, args.corpus_factor, args.output, args.keep, args.sheet_latency)
@@ -0,0 +1,181 @@
+import hashlib
+import json
+import mmap
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+# ==== Cache korpus tweet (kolumnar, memory-mapped) ====
+# CSV korpus dikonversi sekali menjadi:
+#   text.bin        semua teks UTF-8 disambung
+#   offsets.npy     int64, posisi awal/akhir teks ke-i di text.bin (n + 1)
+#   ids.npy         ID tweet (hash teks yang dinormalisasi, 16 hex) per baris
+#   id_order.npy    urutan ids.npy yang sudah disortir, untuk cari ID -> baris
+#   <kolom>.npy     kolom kategori kecil (mis. aspek_utama) sebagai kode int16
+#   meta.json       jumlah baris, kategori, dan sidik file sumber
+# App cukup membuka file-file itu dengan mmap; mengambil satu tweet = O(1)
+# tanpa memuat seluruh tabel. Cache dibangun ulang otomatis bila CSV berubah.
+
+CACHE_DIR = os.path.join("dataset", ".cache")
+# Naikkan kalau isi/format cache berubah supaya cache lama dibangun ulang
+CACHE_FORMAT = 2
+TEXT_COLUMN = "Cleaned_Tweet"
+CHUNK_SIZE = 50_000
+
+
+_NON_WORD_RE = re.compile(r"[\W_]+")
+
+
+def normalize_text(text):
+    # Huruf kecil, tanda baca & spasi berlebih dibuang: beda format = tweet yang sama
+    return _NON_WORD_RE.sub(" ", text.lower()).strip()
+
+
+def normalize_series(texts):
+    # normalize_text versi vektor (Series.str) untuk pemrosesan per chunk
+    return texts.fillna("").astype(str).str.lower().str.replace(_NON_WORD_RE, " ", regex=True).str.strip()
+
+
+def text_id(text):
+    # ID stabil: tidak bergantung urutan file/baris, jadi label tetap cocok
+    # walaupun dataset dibangun ulang
+    return hashlib.sha1(normalize_text(text).encode("utf-8")).hexdigest()[:16]
+
+
+def save_array(path, array):
+    # Tulis ke file sementara lalu ganti: file lama yang sedang di-mmap
+    # proses lain tidak terpotong di tengah jalan
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        np.save(f, array)
+    os.replace(tmp_path, path)
+
+
+def _fingerprint(sources):
+    entries = []
+    for path, label in sources:
+        if os.path.exists(path):
+            stat = os.stat(path)
+            entries.append([path, label, stat.st_size, int(stat.st_mtime)])
+        else:
+            entries.append([path, label, None, None])
+    return entries
+
+
+def build_corpus_cache(sources, out_dir, text_column=TEXT_COLUMN, chunksize=CHUNK_SIZE):
+    # sources: list (path_csv, label); label disimpan di kolom aspek_utama
+    os.makedirs(out_dir, exist_ok=True)
+    offsets = [0]
+    ids = []
+    labels = []
+    categories = []
+    missing = []
+
+    with open(os.path.join(out_dir, "text.bin.tmp"), "wb") as text_file:
+        position = 0
+        for path, label in sources:
+            if not os.path.exists(path):
+                missing.append(path)
+                continue
+            if label not in categories:
+                categories.append(label)
+            code = categories.index(label)
+            for chunk in pd.read_csv(path, usecols=[text_column], chunksize=chunksize):
+                texts = chunk[text_column].fillna("").astype(str)
+                for text in texts:
+                    encoded = text.encode("utf-8")
+                    text_file.write(encoded)
+                    position += len(encoded)
+                    offsets.append(position)
+                    ids.append(text_id(text))
+                labels.extend([code] * len(texts))
+
+    id_array = np.array(ids, dtype="S16")
+    save_array(os.path.join(out_dir, "offsets.npy"), np.array(offsets, dtype=np.int64))
+    save_array(os.path.join(out_dir, "ids.npy"), id_array)
+    save_array(os.path.join(out_dir, "id_order.npy"), np.argsort(id_array, kind="stable").astype(np.int64))
+    save_array(os.path.join(out_dir, "aspek_utama.npy"), np.array(labels, dtype=np.int16))
+    os.replace(os.path.join(out_dir, "text.bin.tmp"), os.path.join(out_dir, "text.bin"))
+
+    meta = {
+        "format": CACHE_FORMAT,
+        "rows": len(ids),
+        "columns": {"aspek_utama": categories},
+        "sources": _fingerprint(sources),
+        "missing": missing,
+    }
+    # meta.json ditulis terakhir: tanda cache sudah lengkap
+    with open(os.path.join(out_dir, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False)
+    return meta
+
+
+class MappedCorpus:
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        with open(os.path.join(cache_dir, "meta.json"), "r", encoding="utf-8") as f:
+            self.meta = json.load(f)
+        self.offsets = np.load(os.path.join(cache_dir, "offsets.npy"), mmap_mode="r")
+        self.ids = np.load(os.path.join(cache_dir, "ids.npy"), mmap_mode="r")
+        self.id_order = np.load(os.path.join(cache_dir, "id_order.npy"), mmap_mode="r")
+        self.categories = self.meta["columns"]
+        self.codes = {
+            name: np.load(os.path.join(cache_dir, f"{name}.npy"), mmap_mode="r")
+            for name in self.categories
+        }
+        self._text_file = open(os.path.join(cache_dir, "text.bin"), "rb")
+        size = os.fstat(self._text_file.fileno()).st_size
+        # mmap tidak bisa untuk file kosong
+        self._text = mmap.mmap(self._text_file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+
+    def __len__(self):
+        return self.meta["rows"]
+
+    @property
+    def missing_sources(self):
+        return self.meta.get("missing", [])
+
+    def text(self, index):
+        start, end = int(self.offsets[index]), int(self.offsets[index + 1])
+        return self._text[start:end].decode("utf-8")
+
+    def tweet_id(self, index):
+        return self.ids[index].decode("ascii")
+
+    def column(self, name, index):
+        return self.categories[name][int(self.codes[name][index])]
+
+    def row(self, index):
+        row = {"tweet_id": self.tweet_id(index), "tweet": self.text(index)}
+        for name in self.categories:
+            row[name] = self.column(name, index)
+        return row
+
+    def index_of(self, tweet_id):
+        # Cari baris pertama dengan ID ini lewat binary search (O(log n))
+        key = tweet_id.encode("ascii") if isinstance(tweet_id, str) else tweet_id
+        position = np.searchsorted(self.ids, key, sorter=self.id_order)
+        if position < len(self.id_order) and self.ids[self.id_order[position]] == key:
+            return int(self.id_order[position])
+        return None
+
+    def close(self):
+        if isinstance(self._text, mmap.mmap):
+            self._text.close()
+        self._text_file.close()
+
+
+def open_corpus(sources, name, cache_root=CACHE_DIR):
+    # Buka cache korpus; bangun (ulang) kalau belum ada atau CSV sumber berubah
+    cache_dir = os.path.join(cache_root, name)
+    meta_path = os.path.join(cache_dir, "meta.json")
+    stale = True
+    if os.path.exists(meta_path):
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        stale = meta.get("format") != CACHE_FORMAT or meta.get("sources") != _fingerprint(sources)
+    if stale:
+        build_corpus_cache(sources, cache_dir)
+    return MappedCorpus(cache_dir)
@@ -0,0 +1,135 @@
+import hashlib
+import os
+
+import numpy as np
+import pandas as pd
+
+from corpus_cache import normalize_series
+
+# ==== Pembagian train/valid/test yang deterministik (streaming) ====
+# Split tiap baris ditentukan dari hash teks yang dinormalisasi, bukan dari
+# posisinya di file:
+#   - tidak perlu shuffle global di memori; CSV dibaca per chunk dan ketiga
+#     file output ditulis dalam satu kali jalan;
+#   - hasilnya stabil saat korpus bertambah: baris lama tetap di split yang
+#     sama, baris baru tersebar mengikuti rasio;
+#   - tweet duplikat (beda format) selalu jatuh ke split yang sama, jadi
+#     tidak bocor dari train ke test.
+#
+# Dengan `stratify` (mis. ["aspek", "sentimen"]) pembacaan dilakukan dua kali:
+# putaran pertama mengisi histogram hash per strata (ukuran tetap, tidak
+# bergantung jumlah baris), lalu batas split tiap strata dipilih dari
+# histogram itu sehingga proporsi per kombinasi label mengikuti rasio, juga
+# untuk strata kecil.
+
+SPLITS = ("train", "valid", "test")
+DEFAULT_RATIOS = (0.8, 0.1, 0.1)
+# Ganti salt = pembagian baru (mis. untuk eksperimen ulang dengan split lain)
+DEFAULT_SALT = "absa-split-v1"
+CHUNK_SIZE = 50_000
+HISTOGRAM_BINS = 4096
+
+
+def _hash_key(salt):
+    # hash_pandas_object butuh key 16 karakter
+    return hashlib.md5(salt.encode("utf-8")).hexdigest()[:16]
+
+
+def split_position(texts, salt=DEFAULT_SALT):
+    # Posisi pseudo-acak di [0, 1) per teks, deterministik untuk (teks, salt)
+    hashes = pd.util.hash_pandas_object(normalize_series(texts), index=False, hash_key=_hash_key(salt))
+    return hashes.to_numpy(dtype=np.uint64) / np.float64(2 ** 64)
+
+
+def stratum_keys(chunk, stratify):
+    # Satu kunci string per kombinasi label; label kosong = strata sendiri
+    keys = chunk[stratify[0]].fillna("").astype(str)
+    for column in stratify[1:]:
+        keys = keys + "\x1f" + chunk[column].fillna("").astype(str)
+    return keys
+
+
+def _check_ratios(ratios):
+    ratios = tuple(float(r) for r in ratios)
+    if len(ratios) != len(SPLITS) or min(ratios) < 0 or not np.isclose(sum(ratios), 1.0):
+        raise ValueError(f"Rasio harus {len(SPLITS)} angka >= 0 yang jumlahnya 1: {ratios}")
+    return ratios
+
+
+def stratified_cutoffs(histograms, ratios):
+    # histograms: strata -> jumlah baris per bin posisi. Batas dipilih di tepi bin
+    # terdekat yang membuat jumlah kumulatif mencapai target strata itu.
+    cutoffs = {}
+    for key, histogram in histograms.items():
+        cumulative = np.cumsum(histogram)
+        total = cumulative[-1]
+        bounds = []
+        for target in np.rint(np.cumsum(ratios)[:-1] * total):
+            if target <= 0:
+                bounds.append(0.0)
+            else:
+                bounds.append((np.searchsorted(cumulative, target) + 1) / len(histogram))
+        cutoffs[key] = bounds
+    return cutoffs
+
+
+def _histograms(input_file, text_column, stratify, salt, chunksize):
+    histograms = {}
+    for chunk in pd.read_csv(input_file, usecols=[text_column] + list(stratify), chunksize=chunksize):
+        bins = np.minimum((split_position(chunk[text_column], salt) * HISTOGRAM_BINS).astype(np.int64),
+                          HISTOGRAM_BINS - 1)
+        keys = stratum_keys(chunk, stratify).to_numpy()
+        for key in np.unique(keys):
+            histogram = histograms.setdefault(key, np.zeros(HISTOGRAM_BINS, dtype=np.int64))
+            histogram += np.bincount(bins[keys == key], minlength=HISTOGRAM_BINS)
+    return histograms
+
+
+def assign_splits(chunk, text_column, ratios=DEFAULT_RATIOS, salt=DEFAULT_SALT, stratify=None, cutoffs=None):
+    # Indeks split (0=train, 1=valid, 2=test) per baris chunk: posisi hash
+    # dibandingkan dengan batas kumulatif rasio (global atau per strata)
+    position = split_position(chunk[text_column], salt)
+    if stratify:
+        unique, inverse = np.unique(stratum_keys(chunk, stratify).to_numpy(), return_inverse=True)
+        table = np.array([cutoffs[key] for key in unique], dtype=np.float64).reshape(len(unique), -1)
+        bounds = table[inverse]
+    else:
+        bounds = np.broadcast_to(np.cumsum(ratios)[:-1], (len(position), len(ratios) - 1))
+    return (position[:, None] >= bounds).sum(axis=1)
+
+
+def blank_absa_lines(chunk, text_column="Segmented_Text", separator="########"):
+    # Baris "teks####..." tanpa label, siap dianotasi di 2_ABSADatasetPrepareTool.html
+    return chunk[text_column].fillna("").astype(str) + separator + "\n"
+
+
+def build_splits(input_file, output_dir, formatter=blank_absa_lines, text_column="Segmented_Text",
+                 ratios=DEFAULT_RATIOS, stratify=None, salt=DEFAULT_SALT, chunksize=CHUNK_SIZE,
+                 extension=".txt"):
+    # Tulis <output_dir>/{train,valid,test}.txt dalam satu kali baca input.
+    # formatter: chunk DataFrame -> Series string (sudah termasuk newline).
+    # Split dengan rasio 0 tidak dibuat filenya.
+    ratios = _check_ratios(ratios)
+    stratify = list(stratify or [])
+    cutoffs = None
+    if stratify:
+        cutoffs = stratified_cutoffs(_histograms(input_file, text_column, stratify, salt, chunksize), ratios)
+
+    os.makedirs(output_dir, exist_ok=True)
+    paths = {split: os.path.join(output_dir, split + extension) for split, ratio in zip(SPLITS, ratios) if ratio > 0}
+    counts = dict.fromkeys(paths, 0)
+    files = {split: open(path, "w", encoding="utf-8") for split, path in paths.items()}
+    try:
+        for chunk in pd.read_csv(input_file, chunksize=chunksize):
+            lines = formatter(chunk)
+            assigned = assign_splits(chunk, text_column, ratios, salt, stratify, cutoffs)
+            for index, split in enumerate(SPLITS):
+                if split not in files:
+                    continue
+                selected = lines[assigned == index]
+                files[split].write("".join(selected))
+                counts[split] += len(selected)
+    finally:
+        for f in files.values():
+            f.close()
+    return paths, counts
@@ -0,0 +1,162 @@
+import io
+import os
+
+import pandas as pd
+
+# ==== Ekspor anotasi (CSV / JSON / APC-TXT / ATEPC) ====
+# Semua format dibangun per potongan (chunk) DataFrame dengan operasi string
+# vektor pandas, lalu langsung ditulis ke file atau BytesIO. Memori yang
+# dipakai sebanding dengan ukuran chunk, bukan jumlah total label.
+#
+# Format APC (PyABSA, lihat dataset/labeled_tweets.txt), 3 baris per label:
+#     $T$ <tweet>
+#     <aspek>
+#     <sentimen>
+# Format ATEPC (seperti hasil 3_convert_apc_dataset_to_atepc_dataset.py),
+# satu token per baris "<token> <tag> <polaritas>", kalimat dipisah baris kosong:
+#     kebijakan B-ASP Positif
+#     pemerintah I-ASP Positif
+#     menteri O -100
+
+CHUNK_SIZE = 10_000
+COLUMNS = ["tweet_id", "tweet", "aspek", "sentimen"]
+ASPECT_PLACEHOLDER = "$T$"
+SENTIMENT_PADDING = "-100"
+
+
+# ---- Sumber data ----
+def iter_chunks(source, chunksize=CHUNK_SIZE):
+    # source: DataFrame, path CSV, atau iterable berisi dict / list dict / DataFrame
+    if isinstance(source, pd.DataFrame):
+        for start in range(0, len(source), chunksize):
+            yield source.iloc[start:start + chunksize]
+        return
+    if isinstance(source, (str, os.PathLike)):
+        yield from pd.read_csv(source, chunksize=chunksize)
+        return
+    batch = []
+    for item in source:
+        if isinstance(item, pd.DataFrame):
+            yield item
+            continue
+        if isinstance(item, list):
+            # Blok dict (mis. dari AnnotationStore.iter_annotations)
+            yield pd.DataFrame(item, columns=COLUMNS)
+            continue
+        batch.append(item)
+        if len(batch) >= chunksize:
+            yield pd.DataFrame(batch, columns=COLUMNS)
+            batch = []
+    if batch:
+        yield pd.DataFrame(batch, columns=COLUMNS)
+
+
+class _Output:
+    # Terima path atau file-like biner; path dibuka & ditutup di sini
+    def __init__(self, out):
+        self.out = out
+        self._file = None
+
+    def __enter__(self):
+        if isinstance(self.out, (str, os.PathLike)):
+            self._file = open(self.out, "wb")
+            return self._file
+        return self.out
+
+    def __exit__(self, *exc):
+        if self._file is not None:
+            self._file.close()
+
+
+# ---- Pemformat per chunk ----
+def _clean(series, strip):
+    series = series.fillna("").astype(str)
+    return series.str.strip() if strip else series
+
+
+def format_apc_chunk(chunk, strip=True):
+    tweet = _clean(chunk["tweet"], strip)
+    # Tweet tanpa $T$ berarti aspek (kategori) diletakkan di depan kalimat
+    tweet = tweet.where(tweet.str.contains(ASPECT_PLACEHOLDER, regex=False), ASPECT_PLACEHOLDER + " " + tweet)
+    return tweet + "\n" + _clean(chunk["aspek"], strip) + "\n" + _clean(chunk["sentimen"], strip) + "\n"
+
+
+def format_atepc_chunk(chunk):
+    tweet = _clean(chunk["tweet"], True)
+    aspek = _clean(chunk["aspek"], True)
+    sentimen = _clean(chunk["sentimen"], True)
+    has_placeholder = tweet.str.contains(ASPECT_PLACEHOLDER, regex=False)
+    tweet = tweet.where(has_placeholder, ASPECT_PLACEHOLDER + " " + tweet)
+
+    parts = tweet.str.partition(ASPECT_PLACEHOLDER)
+    left, right = parts[0], parts[2]
+    tokens = (left + " " + aspek + " " + right).str.split()
+    aspect_start = left.str.split().str.len()
+    aspect_end = aspect_start + aspek.str.split().str.len()
+
+    frame = pd.DataFrame({"token": tokens, "start": aspect_start, "end": aspect_end, "polarity": sentimen})
+    frame = frame.reset_index(drop=True).explode("token").dropna(subset=["token"])
+    position = frame.groupby(level=0).cumcount()
+    in_aspect = (position >= frame["start"]) & (position < frame["end"])
+
+    tag = pd.Series("O", index=frame.index)
+    tag = tag.mask(in_aspect, "I-ASP").mask(in_aspect & (position == frame["start"]), "B-ASP")
+    polarity = frame["polarity"].where(in_aspect, SENTIMENT_PADDING)
+    lines = frame["token"] + " " + tag + " " + polarity + "\n"
+
+    # Baris kosong setelah token terakhir tiap kalimat
+    last_token = ~frame.index.duplicated(keep="last")
+    return lines.where(~last_token, lines + "\n")
+
+
+# ---- Penulis ----
+def export_csv(source, out, chunksize=CHUNK_SIZE):
+    with _Output(out) as f:
+        text = io.TextIOWrapper(f, encoding="utf-8", newline="", write_through=True)
+        header = True
+        for chunk in iter_chunks(source, chunksize):
+            chunk.to_csv(text, index=False, header=header)
+            header = False
+        if header:
+            pd.DataFrame(columns=COLUMNS).to_csv(text, index=False)
+        text.detach()
+
+
+def export_json(source, out, chunksize=CHUNK_SIZE):
+    # Array JSON dengan indent=2 (sama dengan DataFrame.to_json lama), ditulis per chunk
+    with _Output(out) as f:
+        first = True
+        for chunk in iter_chunks(source, chunksize):
+            if chunk.empty:
+                continue
+            body = chunk.to_json(orient="records", indent=2)[2:-2]
+            f.write((b"[\n" if first else b",\n") + body.encode("utf-8"))
+            first = False
+        f.write(b"[]" if first else b"\n]")
+
+
+def export_apc_txt(source, out, chunksize=CHUNK_SIZE, strip=True, dedup=True):
+    with _Output(out) as f:
+        seen = set()
+        for chunk in iter_chunks(source, chunksize):
+            if dedup:
+                # Satu blok per pasangan (tweet, aspek), termasuk antar chunk
+                keys = pd.util.hash_pandas_object(chunk[["tweet", "aspek"]], index=False)
+                fresh = ~keys.duplicated() & ~keys.isin(seen)
+                seen.update(keys[fresh].tolist())
+                chunk = chunk[fresh.to_numpy()]
+            if not chunk.empty:
+                f.write(format_apc_chunk(chunk, strip=strip).str.cat().encode("utf-8"))
+
+
+def export_atepc(source, out, chunksize=CHUNK_SIZE):
+    with _Output(out) as f:
+        for chunk in iter_chunks(source, chunksize):
+            if not chunk.empty:
+                f.write(format_atepc_chunk(chunk).str.cat().encode("utf-8"))
+
+
+def export_bytes(exporter, source, **kwargs):
+    buffer = io.BytesIO()
+    exporter(source, buffer, **kwargs)
+    return buffer.getvalue()
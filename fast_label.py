@@ -0,0 +1,68 @@
+import os
+
+import streamlit as st
+import streamlit.components.v1 as components
+
+# ==== Mode labeling cepat (keyboard) ====
+# Komponen Streamlit kustom (HTML/JS statis di fast_label_frontend/, tanpa
+# build npm) yang menampilkan satu jendela berisi beberapa tweet sekaligus.
+# Label dipilih dengan satu tombol keyboard per tweet dan disimpan di browser
+# (juga di localStorage supaya tidak hilang saat tab tertutup); tidak ada
+# rerun Streamlit per tweet. Label baru dikirim ke server per batch:
+#
+#     browser --(batch: {"id", "labels": [...]})--> rerun --> upsert_many
+#     browser <--(jendela tweet baru, committed = id batch)-- rerun
+#
+# Jadi satu rerun untuk setiap BATCH_SIZE tweet, bukan beberapa rerun per
+# tweet. Batch yang sama tidak diproses dua kali (id terakhir disimpan di
+# session_state); kalau batch terkirim ulang, upsert tetap idempoten.
+#
+# Tombol: baris keyboard per aspek, kolom per sentimen (lihat hotkey_grid);
+# Shift+tombol = tambah label tanpa pindah tweet (multi-aspek), Enter =
+# selesai / terima saran model, Backspace = hapus label tweet ini,
+# ←/→ = pindah tweet di jendela, Ctrl+S = kirim sekarang.
+
+FRONTEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fast_label_frontend")
+COMPONENT_KEY = "fast_label"
+WINDOW_SIZE = 20
+BATCH_SIZE = 10
+# Satu baris keyboard per aspek, urut sesuai daftar sentimen
+GRID_KEYS = ("qwe", "asd", "zxc", "rty", "fgh", "vbn", "uio", "jkl")
+
+_component = components.declare_component("fast_label", path=FRONTEND_DIR)
+
+
+def hotkey_grid(aspects, sentiments):
+    # [{"aspek", "keys": [tombol per sentimen]}]; di luar GRID_KEYS tanpa tombol (None)
+    grid = []
+    for i, aspect in enumerate(aspects):
+        row = GRID_KEYS[i] if i < len(GRID_KEYS) else ""
+        grid.append({"aspek": aspect, "keys": [row[j] if j < len(row) else None for j in range(len(sentiments))]})
+    return grid
+
+
+def pending_batch(key=COMPONENT_KEY):
+    # Batch dari browser yang belum diproses server; dibaca sebelum komponen
+    # dirender supaya jendela berikutnya sudah tanpa tweet yang baru disimpan
+    batch = st.session_state.get(key)
+    if not batch or batch.get("id") == st.session_state.get(f"{key}_committed"):
+        return None
+    return batch
+
+
+def mark_committed(batch, key=COMPONENT_KEY):
+    st.session_state[f"{key}_committed"] = batch["id"]
+
+
+def fast_label(items, aspects, sentiments, storage_key, batch_size=BATCH_SIZE, key=COMPONENT_KEY):
+    # items: [{"tweet_id", "text", "aspek_utama", "suggestion": {"aspek", "sentimen"} | None}]
+    return _component(
+        items=items,
+        grid=hotkey_grid(aspects, sentiments),
+        sentiments=list(sentiments),
+        committed=st.session_state.get(f"{key}_committed"),
+        storage_key=f"fast_label:{storage_key}",
+        batch_size=batch_size,
+        key=key,
+        default=None,
+    )
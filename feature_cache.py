@@ -0,0 +1,192 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from corpus_cache import CACHE_DIR, save_array
+
+# ==== Cache fitur tokenisasi (memory-mapped) ====
+# Hasil tokenizer (input_ids, attention_mask) disimpan sebagai array NumPy di
+#     dataset/.cache/features/<tokenizer>-<max_seq_len>-<digest>/
+#         shard-XXXXX.ids.npy / .mask.npy / .keys.npy
+#         meta.json
+# Kunci tiap contoh = sha1 dari (teks, aspek) sehingga run berikutnya (sweep
+# hyperparameter, rerun notebook) tidak perlu tokenisasi ulang: contoh yang
+# sudah ada diambil dari shard lewat mmap, hanya label baru yang ditokenisasi
+# dan ditulis sebagai shard baru. Shard digabung kalau jumlahnya sudah banyak.
+#
+#     cache = FeatureCache("indobenchmark/indobert-base-p1", max_seq_len=128)
+#     examples = list(iter_apc_examples("dataset/labeled_tweets.txt"))
+#     features = cache.encode([e["text"] for e in examples], [e["aspect"] for e in examples])
+
+FEATURES_DIR = os.path.join(CACHE_DIR, "features")
+# Naikkan kalau cara tokenisasi berubah supaya cache lama tidak dipakai
+FEATURE_FORMAT = 1
+TOKENIZE_BATCH = 1024
+MAX_SHARDS = 16
+ASPECT_PLACEHOLDER = "$T$"
+
+
+def iter_apc_examples(path):
+    # Baca format APC (3 baris: "$T$ tweet", aspek, sentimen) secara streaming,
+    # tanpa readlines() seluruh file
+    with open(path, "r", encoding="utf-8") as f:
+        while True:
+            lines = [f.readline() for _ in range(3)]
+            if not lines[2]:
+                return
+            text, aspect, sentiment = (line.strip() for line in lines)
+            yield {
+                "text": text.replace(ASPECT_PLACEHOLDER, f"[B-ASP]{aspect}[E-ASP]"),
+                "aspect": aspect,
+                "sentiment": sentiment,
+            }
+
+
+def example_key(text, pair=None):
+    content = text if pair is None else f"{text}\x1f{pair}"
+    return hashlib.sha1(content.encode("utf-8")).hexdigest()[:32].encode("ascii")
+
+
+class FeatureCache:
+    def __init__(self, tokenizer_name, max_seq_len=128, cache_root=FEATURES_DIR, tokenizer=None):
+        self.tokenizer_name = tokenizer_name
+        self.max_seq_len = max_seq_len
+        self._tokenizer = tokenizer
+        digest = hashlib.sha1(f"{tokenizer_name}|{max_seq_len}|{FEATURE_FORMAT}".encode("utf-8")).hexdigest()[:8]
+        safe_name = tokenizer_name.replace("/", "_").replace("\\", "_")
+        self.cache_dir = os.path.join(cache_root, f"{safe_name}-{max_seq_len}-{digest}")
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._load()
+
+    # ---- Penyimpanan ----
+    def _meta_path(self):
+        return os.path.join(self.cache_dir, "meta.json")
+
+    def _shard_path(self, shard, kind):
+        return os.path.join(self.cache_dir, f"shard-{shard:05d}.{kind}.npy")
+
+    def _load(self):
+        self.meta = {"tokenizer": self.tokenizer_name, "max_seq_len": self.max_seq_len,
+                     "format": FEATURE_FORMAT, "shards": []}
+        if os.path.exists(self._meta_path()):
+            with open(self._meta_path(), "r", encoding="utf-8") as f:
+                self.meta = json.load(f)
+        self._ids = [np.load(self._shard_path(s, "ids"), mmap_mode="r") for s in self.meta["shards"]]
+        self._masks = [np.load(self._shard_path(s, "mask"), mmap_mode="r") for s in self.meta["shards"]]
+        keys = [np.load(self._shard_path(s, "keys")) for s in self.meta["shards"]]
+        # Indeks kunci -> (shard, baris), disortir untuk searchsorted
+        self._keys = np.concatenate(keys) if keys else np.empty(0, dtype="S32")
+        self._shard_of = np.concatenate([np.full(len(k), i, dtype=np.int32) for i, k in enumerate(keys)]) \
+            if keys else np.empty(0, dtype=np.int32)
+        self._row_of = np.concatenate([np.arange(len(k), dtype=np.int64) for k in keys]) \
+            if keys else np.empty(0, dtype=np.int64)
+        self._order = np.argsort(self._keys, kind="stable")
+
+    def _write_meta(self):
+        tmp_path = self._meta_path() + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.meta, f)
+        os.replace(tmp_path, self._meta_path())
+
+    def _append_shard(self, keys, input_ids, attention_mask):
+        shard = max(self.meta["shards"], default=-1) + 1
+        save_array(self._shard_path(shard, "ids"), input_ids)
+        save_array(self._shard_path(shard, "mask"), attention_mask)
+        save_array(self._shard_path(shard, "keys"), keys)
+        # meta.json ditulis terakhir: shard yang belum tercatat diabaikan
+        self.meta["shards"].append(shard)
+        self._write_meta()
+
+    def compact(self):
+        # Gabungkan semua shard jadi satu (dipanggil otomatis saat shard > MAX_SHARDS)
+        if len(self.meta["shards"]) <= 1:
+            return
+        old = list(self.meta["shards"])
+        shard = max(old) + 1
+        save_array(self._shard_path(shard, "ids"), np.concatenate(self._ids))
+        save_array(self._shard_path(shard, "mask"), np.concatenate(self._masks))
+        save_array(self._shard_path(shard, "keys"), self._keys)
+        self.meta["shards"] = [shard]
+        self._write_meta()
+        self._ids = self._masks = []
+        for s in old:
+            for kind in ("ids", "mask", "keys"):
+                try:
+                    os.remove(self._shard_path(s, kind))
+                except OSError:
+                    # Masih di-mmap proses lain (Windows): dibiarkan, tidak tercatat di meta
+                    pass
+        self._load()
+
+    # ---- Tokenisasi ----
+    @property
+    def tokenizer(self):
+        if self._tokenizer is None:
+            from transformers import AutoTokenizer
+
+            self._tokenizer = AutoTokenizer.from_pretrained(self.tokenizer_name)
+        return self._tokenizer
+
+    def _tokenize(self, texts, pairs):
+        input_ids = np.zeros((len(texts), self.max_seq_len), dtype=np.int32)
+        attention_mask = np.zeros((len(texts), self.max_seq_len), dtype=np.int8)
+        for start in range(0, len(texts), TOKENIZE_BATCH):
+            stop = start + TOKENIZE_BATCH
+            encoded = self.tokenizer(
+                texts[start:stop],
+                pairs[start:stop] if pairs is not None else None,
+                max_length=self.max_seq_len,
+                padding="max_length",
+                truncation=True,
+                return_tensors="np",
+            )
+            input_ids[start:stop] = encoded["input_ids"]
+            attention_mask[start:stop] = encoded["attention_mask"]
+        return input_ids, attention_mask
+
+    def lookup(self, keys):
+        # (shard, baris) per kunci; shard -1 = belum ada di cache
+        keys = np.asarray(keys, dtype="S32")
+        if not len(self._keys):
+            return np.full(len(keys), -1, dtype=np.int32), np.zeros(len(keys), dtype=np.int64)
+        positions = np.minimum(np.searchsorted(self._keys, keys, sorter=self._order), len(self._keys) - 1)
+        found = self._order[positions]
+        hit = self._keys[found] == keys
+        return np.where(hit, self._shard_of[found], -1), np.where(hit, self._row_of[found], 0)
+
+    def encode(self, texts, pairs=None):
+        # -> {"input_ids": int32 [n, max_seq_len], "attention_mask": int8 [n, max_seq_len], "keys", "new"}
+        texts = list(texts)
+        pairs = list(pairs) if pairs is not None else None
+        keys = np.array([example_key(t, pairs[i] if pairs is not None else None) for i, t in enumerate(texts)],
+                        dtype="S32")
+        shards, rows = self.lookup(keys)
+
+        missing = np.flatnonzero(shards < 0)
+        new = 0
+        if len(missing):
+            # Kunci duplikat dalam satu panggilan cukup ditokenisasi sekali
+            _, first = np.unique(keys[missing], return_index=True)
+            fresh = missing[np.sort(first)]
+            new = len(fresh)
+            input_ids, attention_mask = self._tokenize(
+                [texts[i] for i in fresh], [pairs[i] for i in fresh] if pairs is not None else None
+            )
+            self._append_shard(keys[fresh], input_ids, attention_mask)
+            self._load()
+            if len(self.meta["shards"]) > MAX_SHARDS:
+                self.compact()
+            shards, rows = self.lookup(keys)
+
+        input_ids = np.empty((len(texts), self.max_seq_len), dtype=np.int32)
+        attention_mask = np.empty((len(texts), self.max_seq_len), dtype=np.int8)
+        for shard in np.unique(shards):
+            selected = np.flatnonzero(shards == shard)
+            input_ids[selected] = self._ids[shard][rows[selected]]
+            attention_mask[selected] = self._masks[shard][rows[selected]]
+        return {"input_ids": input_ids, "attention_mask": attention_mask, "keys": keys, "new": new}
+
+    def __len__(self):
+        return len(self._keys)
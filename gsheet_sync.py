@@ -0,0 +1,196 @@
+import datetime
+import hashlib
+import json
+import os
+import re
+
+from workspace import annotator_slug
+
+# ==== Sinkronisasi inkremental ke Google Sheets ====
+# Hanya baris baru / berubah yang dikirim. Baris baru di-append per batch,
+# baris yang berubah di-update di tempat lewat satu request batch_update.
+# Posisi baris + hash isi disimpan per anotator di file state lokal, sehingga
+# klik "Simpan Progress" berulang kali tidak menggandakan baris di Sheet.
+
+SHEET_COLUMNS = ["tweet_id", "tweet", "aspek", "sentimen", "annotator", "timestamp"]
+DEFAULT_BATCH_SIZE = 500
+SYNC_STATE_DIR = ".gsheet_sync"
+
+_ROW_RE = re.compile(r"![A-Z]+(\d+)")
+
+
+def annotation_key(tweet_id, aspek):
+    return f"{tweet_id}|{aspek}"
+
+
+def content_hash(annotation):
+    payload = json.dumps(
+        [str(annotation.get("tweet_id", "")), annotation.get("tweet", ""),
+         annotation.get("aspek", ""), annotation.get("sentimen", "")],
+        ensure_ascii=False,
+    )
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def default_state_path(annotator_name):
+    return os.path.join(SYNC_STATE_DIR, f"{annotator_slug(annotator_name)}.json")
+
+
+def _now():
+    return datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+class SheetSync:
+    def __init__(self, sheet, annotator_name, state_path=None, batch_size=DEFAULT_BATCH_SIZE):
+        self.sheet = sheet
+        self.annotator_name = annotator_name
+        self.state_path = state_path or default_state_path(annotator_name)
+        self.batch_size = batch_size
+        # key -> {"hash": ..., "row": nomor baris di Sheet}
+        self.synced = self._load_state()
+
+    # ---- State lokal (high-water mark per anotator) ----
+    def _load_state(self):
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                return json.load(f).get("rows", {})
+        except FileNotFoundError:
+            return None
+
+    def _save_state(self):
+        os.makedirs(os.path.dirname(self.state_path) or ".", exist_ok=True)
+        tmp_path = self.state_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"annotator": self.annotator_name, "rows": self.synced}, f)
+        os.replace(tmp_path, self.state_path)
+
+    def _forget_state(self):
+        self.synced = None
+        try:
+            os.remove(self.state_path)
+        except FileNotFoundError:
+            pass
+
+    def _bootstrap_from_sheet(self):
+        # Pertama kali jalan tanpa state lokal: index baris milik anotator ini
+        # yang sudah ada di Sheet (hasil upload versi lama) agar tidak dobel.
+        synced = {}
+        values = self.sheet.get_all_values()
+        for row_number, row in enumerate(values, start=1):
+            row = (row + [""] * len(SHEET_COLUMNS))[:len(SHEET_COLUMNS)]
+            if row[4] != self.annotator_name:
+                continue
+            annotation = dict(zip(SHEET_COLUMNS, row))
+            key = annotation_key(annotation["tweet_id"], annotation["aspek"])
+            synced[key] = {"hash": content_hash(annotation), "row": row_number}
+        self.synced = synced
+        self._save_state()
+
+    # ---- Delta ----
+    def pending(self, annotations):
+        # Entri terakhir untuk (tweet_id, aspek) yang sama yang dipakai
+        latest = {}
+        for annotation in annotations:
+            latest[annotation_key(annotation.get("tweet_id", ""), annotation.get("aspek", ""))] = annotation
+
+        synced = self.synced or {}
+        new_rows, changed_rows = [], []
+        for key, annotation in latest.items():
+            digest = content_hash(annotation)
+            known = synced.get(key)
+            if known is None:
+                new_rows.append((key, digest, annotation))
+            elif known["hash"] != digest:
+                changed_rows.append((key, digest, annotation))
+        return new_rows, changed_rows
+
+    def _to_row(self, annotation, timestamp):
+        return [
+            annotation.get("tweet_id", ""),
+            annotation.get("tweet", ""),
+            annotation.get("aspek", ""),
+            annotation.get("sentimen", ""),
+            self.annotator_name,
+            timestamp,
+        ]
+
+    # ---- Kirim ----
+    def sync(self, annotations):
+        if self.synced is None:
+            self._bootstrap_from_sheet()
+
+        new_rows, changed_rows = self.pending(annotations)
+        timestamp = _now()
+        last_col = chr(ord("A") + len(SHEET_COLUMNS) - 1)
+
+        # Update di tempat: satu request batch_update per batch
+        for batch in _chunks(changed_rows, self.batch_size):
+            data = []
+            for key, digest, annotation in batch:
+                row_number = self.synced[key]["row"]
+                data.append({
+                    "range": f"A{row_number}:{last_col}{row_number}",
+                    "values": [self._to_row(annotation, timestamp)],
+                })
+            self.sheet.batch_update(data)
+            for key, digest, _ in batch:
+                self.synced[key]["hash"] = digest
+            self._save_state()
+
+        # Baris baru: append_rows per batch, catat nomor barisnya
+        rows_unknown = False
+        for batch in _chunks(new_rows, self.batch_size):
+            try:
+                response = self.sheet.append_rows([self._to_row(a, timestamp) for _, _, a in batch])
+            except Exception:
+                # Sebagian baris bisa sudah masuk walau request gagal: state
+                # dibuang supaya sync berikutnya index ulang dari Sheet, bukan
+                # meng-append baris yang sama dua kali
+                self._forget_state()
+                raise
+            updated_range = ((response or {}).get("updates") or {}).get("updatedRange", "")
+            match = _ROW_RE.search(updated_range)
+            start_row = int(match.group(1)) if match else None
+            rows_unknown = rows_unknown or start_row is None
+            for offset, (key, digest, _) in enumerate(batch):
+                self.synced[key] = {
+                    "hash": digest,
+                    "row": start_row + offset if start_row is not None else None,
+                }
+            self._save_state()
+
+        # Respons tanpa updatedRange: index ulang dari Sheet supaya update
+        # berikutnya tetap tahu posisi barisnya
+        if rows_unknown:
+            self._bootstrap_from_sheet()
+
+        return {"appended": len(new_rows), "updated": len(changed_rows)}
+
+
+def rename_synced_tweet_ids(mapping, state_dir=SYNC_STATE_DIR):
+    # Setelah tweet_id diganti (mis. posisi -> ID stabil), pindahkan key di
+    # state lokal supaya baris lama di Sheet di-update, bukan di-append ulang
+    if not os.path.isdir(state_dir):
+        return
+    renamed = {str(old_id): str(new_id) for old_id, new_id in mapping.items()}
+    for filename in os.listdir(state_dir):
+        if not filename.endswith(".json"):
+            continue
+        path = os.path.join(state_dir, filename)
+        with open(path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+        rows = {}
+        for key, entry in state.get("rows", {}).items():
+            tweet_id, _, aspek = key.partition("|")
+            new_key = annotation_key(renamed.get(tweet_id, tweet_id), aspek)
+            rows.setdefault(new_key, entry)
+        state["rows"] = rows
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, path)
@@ -0,0 +1,212 @@
+import json
+import os
+import random
+import threading
+import time
+
+from gsheet_sync import SheetSync, annotation_key
+
+# ==== Antrian tulis ke Google Sheets di background ====
+# Script Streamlit hanya memasukkan baris ke outbox (file lokal + memori)
+# lalu langsung lanjut. Satu thread per proses mengirim isi outbox ke Sheet
+# lewat SheetSync, baik per interval waktu maupun saat antrian sudah penuh,
+# dengan retry exponential backoff bila kena kuota (429) / error 5xx.
+
+OUTBOX_PATH = os.path.join(".gsheet_sync", "outbox.jsonl")
+FLUSH_INTERVAL = 5.0
+FLUSH_SIZE = 200
+BASE_BACKOFF = 2.0
+MAX_BACKOFF = 300.0
+
+TRANSIENT_STATUS = {408, 429, 500, 502, 503, 504}
+
+
+def is_transient_error(exc):
+    response = getattr(exc, "response", None)
+    status = getattr(response, "status_code", None)
+    if status is not None:
+        return status in TRANSIENT_STATUS
+    # Timeout / koneksi putus (requests & socket) selalu layak dicoba lagi
+    return isinstance(exc, (OSError, TimeoutError)) or type(exc).__name__ in {
+        "ConnectionError", "Timeout", "ReadTimeout", "ConnectTimeout",
+    }
+
+
+class SheetWriter:
+    def __init__(self, sheet_factory, outbox_path=OUTBOX_PATH, flush_interval=FLUSH_INTERVAL,
+                 flush_size=FLUSH_SIZE, base_backoff=BASE_BACKOFF, max_backoff=MAX_BACKOFF):
+        self.sheet_factory = sheet_factory
+        self.outbox_path = outbox_path
+        self.flush_interval = flush_interval
+        self.flush_size = flush_size
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+
+        # (annotator, key) -> annotation; entri baru menimpa entri lama
+        self._pending = {}
+        self._oldest = None
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._flush_requested = False
+        self._stopped = False
+
+        self._syncers = {}
+        self.failures = 0
+        self.retry_at = None
+        self.last_error = None
+        self.last_flush = None
+        self.sent_rows = 0
+
+        self._load_outbox()
+        self._thread = threading.Thread(target=self._run, name="gsheet-writer", daemon=True)
+        self._thread.start()
+
+    # ---- Outbox di disk ----
+    def _load_outbox(self):
+        try:
+            with open(self.outbox_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        # Baris terakhir bisa terpotong kalau proses mati saat menulis
+                        continue
+                    annotation = entry["annotation"]
+                    key = annotation_key(annotation.get("tweet_id", ""), annotation.get("aspek", ""))
+                    self._pending[(entry["annotator"], key)] = annotation
+        except FileNotFoundError:
+            return
+        if self._pending:
+            self._oldest = time.monotonic()
+
+    def _append_outbox(self, entries):
+        os.makedirs(os.path.dirname(self.outbox_path) or ".", exist_ok=True)
+        with open(self.outbox_path, "a", encoding="utf-8") as f:
+            for annotator_name, annotation in entries:
+                f.write(json.dumps({"annotator": annotator_name, "annotation": annotation},
+                                   ensure_ascii=False, default=str) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _rewrite_outbox(self):
+        # Dipanggil dengan lock terpegang, setelah flush berhasil
+        os.makedirs(os.path.dirname(self.outbox_path) or ".", exist_ok=True)
+        tmp_path = self.outbox_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for (annotator_name, _), annotation in self._pending.items():
+                f.write(json.dumps({"annotator": annotator_name, "annotation": annotation},
+                                   ensure_ascii=False, default=str) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.outbox_path)
+
+    # ---- API untuk script Streamlit ----
+    def enqueue(self, annotator_name, annotations):
+        entries = [(annotator_name, dict(a)) for a in annotations]
+        if not entries:
+            return
+        with self._lock:
+            self._append_outbox(entries)
+            for name, annotation in entries:
+                key = annotation_key(annotation.get("tweet_id", ""), annotation.get("aspek", ""))
+                self._pending[(name, key)] = annotation
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+            # Bangunkan thread agar timer flush / ambang ukuran dihitung ulang
+            self._wakeup.notify()
+
+    def flush_now(self):
+        with self._lock:
+            self._flush_requested = True
+            self.retry_at = None
+            self._wakeup.notify()
+
+    def depth(self):
+        with self._lock:
+            return len(self._pending)
+
+    def status(self):
+        with self._lock:
+            retry_in = None
+            if self.retry_at is not None:
+                retry_in = max(0.0, self.retry_at - time.monotonic())
+            return {
+                "depth": len(self._pending),
+                "sent_rows": self.sent_rows,
+                "failures": self.failures,
+                "retry_in": retry_in,
+                "last_error": self.last_error,
+                "last_flush": self.last_flush,
+            }
+
+    def stop(self, timeout=None):
+        with self._lock:
+            self._stopped = True
+            self._wakeup.notify()
+        self._thread.join(timeout)
+
+    # ---- Thread penulis ----
+    def _due(self, now):
+        if not self._pending:
+            return False
+        if self.retry_at is not None and now < self.retry_at:
+            return False
+        if self._flush_requested or len(self._pending) >= self.flush_size:
+            return True
+        return self._oldest is not None and now - self._oldest >= self.flush_interval
+
+    def _wait_time(self, now):
+        if self.retry_at is not None:
+            return max(0.0, self.retry_at - now)
+        if self._oldest is None:
+            return None
+        return max(0.0, self._oldest + self.flush_interval - now)
+
+    def _run(self):
+        while True:
+            with self._lock:
+                while not self._stopped and not self._due(time.monotonic()):
+                    self._wakeup.wait(self._wait_time(time.monotonic()))
+                if self._stopped:
+                    return
+                self._flush_requested = False
+                batch = dict(self._pending)
+
+            try:
+                self._send(batch)
+            except Exception as e:
+                with self._lock:
+                    self.failures += 1
+                    self.last_error = f"{type(e).__name__}: {e}"
+                    if is_transient_error(e):
+                        delay = min(self.max_backoff, self.base_backoff * 2 ** (self.failures - 1))
+                        delay *= random.uniform(0.5, 1.0)
+                    else:
+                        delay = self.max_backoff
+                    self.retry_at = time.monotonic() + delay
+                continue
+
+            with self._lock:
+                # Hapus hanya entri yang tidak berubah selama pengiriman
+                for item_key, annotation in batch.items():
+                    if self._pending.get(item_key) is annotation:
+                        del self._pending[item_key]
+                self._oldest = time.monotonic() if self._pending else None
+                self._rewrite_outbox()
+                self.failures = 0
+                self.retry_at = None
+                self.last_error = None
+                self.last_flush = time.time()
+                self.sent_rows += len(batch)
+
+    def _send(self, batch):
+        sheet = self.sheet_factory()
+        by_annotator = {}
+        for (annotator_name, _), annotation in batch.items():
+            by_annotator.setdefault(annotator_name, []).append(annotation)
+        for annotator_name, annotations in by_annotator.items():
+            syncer = self._syncers.get(annotator_name)
+            if syncer is None or syncer.sheet is not sheet:
+                syncer = SheetSync(sheet, annotator_name)
+                self._syncers[annotator_name] = syncer
+            syncer.sync(annotations)
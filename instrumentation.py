@@ -0,0 +1,248 @@
+import json
+import os
+import random
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# ==== Instrumentasi jalur rerun ====
+# Satu Recorder per proses (st.cache_resource) mengumpulkan:
+#   - durasi tiap bagian script per rerun (trace.section("data_load") menutup
+#     bagian sebelumnya dan membuka yang baru; trace.span() untuk blok di
+#     dalamnya, mis. export & sync);
+#   - jumlah, latensi, dan status request ke Google Sheet (InstrumentedSheet).
+# Hanya sebagian rerun yang diukur (PROFILE_SAMPLE_RATE, default 5%); rerun
+# yang tidak terpilih cukup satu pemanggilan random() per rerun. Sesi admin
+# (?admin=<ADMIN_TOKEN>) selalu diukur dan melihat panel profiling.
+#
+# Rerun yang berhenti di tengah karena st.rerun() ditutup di awal rerun
+# berikutnya (jedanya hanya beberapa milidetik), ditandai "interrupted".
+#
+# Keluaran opsional:
+#   PROFILE_LOG=profile.jsonl   satu baris JSON per rerun yang diukur
+#   METRICS_PORT=9108           teks Prometheus di http://host:9108/metrics
+
+SAMPLE_RATE = float(os.environ.get("PROFILE_SAMPLE_RATE", "0.05"))
+LOG_PATH = os.environ.get("PROFILE_LOG")
+METRICS_PORT = os.environ.get("METRICS_PORT")
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN")
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+RECENT_RERUNS = 50
+SAMPLES_PER_SPAN = 512
+TRACE_KEY = "_profile_trace"
+METRIC_PREFIX = "labeling"
+
+
+class _Timing:
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * len(BUCKETS)
+        self.samples = deque(maxlen=SAMPLES_PER_SPAN)
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.samples.append(seconds)
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                self.buckets[i] += 1
+
+    def percentile(self, q):
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class Trace:
+    def __init__(self, recorder, sampled):
+        self.recorder = recorder
+        self.sampled = sampled
+        self.finished = not sampled
+        self.started = time.perf_counter()
+        self.spans = []
+        self._section = None
+
+    def _close_section(self, now):
+        if self._section is not None:
+            name, started = self._section
+            self.spans.append((name, now - started))
+            self._section = None
+
+    def section(self, name):
+        # Tutup bagian sebelumnya, mulai bagian baru
+        if self.finished:
+            return
+        now = time.perf_counter()
+        self._close_section(now)
+        self._section = (name, now)
+
+    @contextmanager
+    def span(self, name):
+        if self.finished:
+            yield
+            return
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.spans.append((name, time.perf_counter() - started))
+
+    def finish(self, interrupted=False):
+        if self.finished:
+            return
+        now = time.perf_counter()
+        self._close_section(now)
+        self.finished = True
+        self.recorder.record_rerun(self.spans, now - self.started, interrupted)
+
+
+class InstrumentedSheet:
+    # Bungkus objek sheet: setiap request dicatat (method, latensi, status)
+    METHODS = ("append_row", "append_rows", "get_all_values", "batch_update")
+
+    def __init__(self, sheet, recorder):
+        self._sheet = sheet
+        self._recorder = recorder
+
+    def __getattr__(self, name):
+        attribute = getattr(self._sheet, name)
+        if name not in self.METHODS:
+            return attribute
+
+        def call(*args, **kwargs):
+            started = time.perf_counter()
+            status = "ok"
+            try:
+                return attribute(*args, **kwargs)
+            except Exception as e:
+                status = str(getattr(getattr(e, "response", None), "status_code", None) or type(e).__name__)
+                raise
+            finally:
+                self._recorder.record_request(name, time.perf_counter() - started, status)
+        return call
+
+
+class Recorder:
+    def __init__(self, sample_rate=SAMPLE_RATE, log_path=LOG_PATH):
+        self.sample_rate = sample_rate
+        self.log_path = log_path
+        self.reruns = 0
+        self.sampled = 0
+        self._spans = defaultdict(_Timing)
+        self._requests = defaultdict(_Timing)
+        self._request_status = defaultdict(int)
+        self._recent = deque(maxlen=RECENT_RERUNS)
+        self._lock = threading.Lock()
+        self._server = None
+
+    # ---- Dipanggil dari script Streamlit ----
+    def start_rerun(self, session_state, force=False):
+        previous = session_state.get(TRACE_KEY)
+        if previous is not None:
+            previous.finish(interrupted=True)
+        with self._lock:
+            self.reruns += 1
+        trace = Trace(self, force or random.random() < self.sample_rate)
+        session_state[TRACE_KEY] = trace
+        return trace
+
+    def wrap_sheet(self, sheet):
+        return InstrumentedSheet(sheet, self)
+
+    # ---- Pencatatan ----
+    def record_rerun(self, spans, total, interrupted):
+        with self._lock:
+            self.sampled += 1
+            for name, seconds in spans:
+                self._spans[name].add(seconds)
+            self._spans["rerun_total"].add(total)
+            self._recent.append({"at": time.time(), "total": total, "spans": spans, "interrupted": interrupted})
+        if self.log_path:
+            entry = {"ts": time.strftime("%Y-%m-%d %H:%M:%S"), "total_ms": round(total * 1000, 2),
+                     "interrupted": interrupted, "spans_ms": {name: round(s * 1000, 2) for name, s in spans}}
+            with open(self.log_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+
+    def record_request(self, method, seconds, status):
+        with self._lock:
+            self._requests[method].add(seconds)
+            self._request_status[(method, status)] += 1
+
+    # ---- Ringkasan ----
+    def span_summary(self):
+        with self._lock:
+            return [
+                {"span": name, "count": t.count, "mean_ms": round(t.total / t.count * 1000, 2),
+                 "p95_ms": round(t.percentile(0.95) * 1000, 2), "max_ms": round(t.max * 1000, 2)}
+                for name, t in sorted(self._spans.items(), key=lambda item: -item[1].total)
+            ]
+
+    def request_summary(self):
+        with self._lock:
+            summary = []
+            for method, t in sorted(self._requests.items()):
+                statuses = {status: n for (m, status), n in self._request_status.items() if m == method}
+                summary.append({"method": method, "count": t.count, "mean_ms": round(t.total / t.count * 1000, 2),
+                                "p95_ms": round(t.percentile(0.95) * 1000, 2), "status": statuses})
+            return summary
+
+    def recent(self):
+        with self._lock:
+            return list(self._recent)
+
+    def prometheus_text(self):
+        lines = []
+        with self._lock:
+            lines += [f"# TYPE {METRIC_PREFIX}_reruns_total counter",
+                      f"{METRIC_PREFIX}_reruns_total {self.reruns}",
+                      f"# TYPE {METRIC_PREFIX}_sampled_reruns_total counter",
+                      f"{METRIC_PREFIX}_sampled_reruns_total {self.sampled}"]
+            for metric, label, timings in (("span_seconds", "span", self._spans),
+                                           ("sheet_request_seconds", "method", self._requests)):
+                lines.append(f"# TYPE {METRIC_PREFIX}_{metric} histogram")
+                for name, t in sorted(timings.items()):
+                    for bound, count in zip(BUCKETS, t.buckets):
+                        lines.append(f'{METRIC_PREFIX}_{metric}_bucket{{{label}="{name}",le="{bound}"}} {count}')
+                    lines.append(f'{METRIC_PREFIX}_{metric}_bucket{{{label}="{name}",le="+Inf"}} {t.count}')
+                    lines.append(f'{METRIC_PREFIX}_{metric}_sum{{{label}="{name}"}} {t.total:.6f}')
+                    lines.append(f'{METRIC_PREFIX}_{metric}_count{{{label}="{name}"}} {t.count}')
+            lines.append(f"# TYPE {METRIC_PREFIX}_sheet_requests_total counter")
+            for (method, status), count in sorted(self._request_status.items()):
+                lines.append(f'{METRIC_PREFIX}_sheet_requests_total{{method="{method}",status="{status}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+    def serve_metrics(self, port, host="0.0.0.0"):
+        # Endpoint /metrics di thread background (sekali per proses)
+        if self._server is not None:
+            return self._server
+        recorder = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path != "/metrics":
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+                payload = recorder.prometheus_text().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, int(port)), Handler)
+        threading.Thread(target=self._server.serve_forever, name="metrics", daemon=True).start()
+        return self._server
+
+
+def is_admin(query_params):
+    return bool(ADMIN_TOKEN) and query_params.get("admin") == ADMIN_TOKEN
@@ -0,0 +1,109 @@
+import threading
+
+import numpy as np
+
+# ==== Navigasi tweet berbasis index ====
+# Status "sudah dilabeli" disimpan sebagai bitmap numpy (satu bool per baris
+# korpus) yang dibangun ulang hanya saat versi data anotator berubah. Dari
+# bitmap itu dibuat daftar baris yang masih terbuka (terurut), sehingga:
+#   - lompat ke nomor tweet       O(1)
+#   - lompat ke ID tweet          O(log n)
+#   - tweet belum dilabeli berikutnya (opsional per aspek utama)  O(log n)
+#   - satu halaman daftar tweet   O(ukuran halaman)
+# Halaman yang dikirim ke browser selalu berukuran tetap, berapa pun
+# besar dataset-nya.
+
+PAGE_SIZE = 20
+SNIPPET_LENGTH = 80
+ASPECT_COLUMN = "aspek_utama"
+
+
+class TweetNavigator:
+    def __init__(self, tweet_index):
+        self.index = tweet_index
+        self.corpus = tweet_index.corpus
+        self._lock = threading.Lock()
+        self._version = None
+        self.completed = np.zeros(len(self.corpus), dtype=bool)
+        self.canonical_mask = np.zeros(len(self.corpus), dtype=bool)
+        self.canonical_mask[tweet_index.unique_rows] = True
+        self._open_rows = {}
+
+    def refresh(self, version, completed_ids):
+        # completed_ids dibaca hanya kalau versi berubah (callable)
+        with self._lock:
+            if version == self._version:
+                return
+            rows = [row for row in map(self.index.row_of, map(str, completed_ids())) if row is not None]
+            # Label berlaku untuk seluruh kelompok duplikat
+            self.completed = np.isin(self.index.canonical, np.array(rows, dtype=np.int64))
+            self._open_rows = {}
+            self._version = version
+
+    # ---- Hitungan ----
+    @property
+    def completed_count(self):
+        return int(self.completed.sum())
+
+    def is_completed(self, row):
+        return bool(self.completed[row])
+
+    def aspects(self):
+        return [name for name in self.corpus.categories.get(ASPECT_COLUMN, []) if name is not None]
+
+    # ---- Lompat ----
+    def row_for_number(self, number):
+        # Nomor tweet yang tampil di layar = baris + 1
+        return number - 1 if 1 <= number <= len(self.corpus) else None
+
+    def row_for_id(self, tweet_id):
+        return self.index.row_of(tweet_id.strip())
+
+    def _open(self, aspect):
+        # Baris kanonik yang belum dilabeli (terurut), di-cache per aspek & versi
+        with self._lock:
+            if aspect not in self._open_rows:
+                mask = ~self.completed & self.canonical_mask
+                if aspect is not None:
+                    code = self.corpus.categories[ASPECT_COLUMN].index(aspect)
+                    mask &= self.corpus.codes[ASPECT_COLUMN] == code
+                self._open_rows[aspect] = np.flatnonzero(mask)
+            return self._open_rows[aspect]
+
+    def next_unlabeled(self, after, aspect=None):
+        # Baris belum dilabeli pertama setelah `after`; kembali ke awal kalau habis
+        rows = self._open(aspect)
+        if not len(rows):
+            return None
+        position = np.searchsorted(rows, after, side="right")
+        return int(rows[position % len(rows)])
+
+    def upcoming_unlabeled(self, after, count, aspect=None):
+        # `count` baris belum dilabeli berikutnya setelah `after` (untuk prefetch)
+        rows = self._open(aspect)
+        position = np.searchsorted(rows, after, side="right")
+        return [int(row) for row in np.concatenate([rows[position:], rows[:position]])[:count]]
+
+    def unlabeled_count(self, aspect=None):
+        return len(self._open(aspect))
+
+    # ---- Halaman ----
+    def page_count(self, page_size=PAGE_SIZE):
+        return max(1, -(-len(self.corpus) // page_size))
+
+    def page_of(self, row, page_size=PAGE_SIZE):
+        return row // page_size + 1
+
+    def page(self, page_number, page_size=PAGE_SIZE):
+        start = (page_number - 1) * page_size
+        entries = []
+        for row in range(max(start, 0), min(start + page_size, len(self.corpus))):
+            text = self.corpus.text(row)
+            entries.append({
+                "row": row,
+                "number": row + 1,
+                "tweet_id": self.index.tweet_id(row),
+                "snippet": text if len(text) <= SNIPPET_LENGTH else text[:SNIPPET_LENGTH] + "…",
+                "completed": self.is_completed(row),
+            })
+        return entries
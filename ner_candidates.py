@@ -0,0 +1,163 @@
+import argparse
+import json
+import os
+from concurrent.futures import ALL_COMPLETED, FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import pandas as pd
+
+from corpus_cache import TEXT_COLUMN
+
+# ==== Ekstraksi calon aspek dengan NER (batch + multiprocess) ====
+# Pengganti loop `ner_pipeline(text)` per tweet di pyABSA.ipynb:
+#   - korpus dibaca streaming per shard (read_csv chunksize);
+#   - tiap shard diproses satu worker (process pool, model dimuat sekali per
+#     worker), teks diurutkan menurut panjang lalu di-batch sehingga padding
+#     dinamis per batch tetap kecil (length bucketing);
+#   - hasil tiap shard langsung ditulis ke <work_dir>/part-XXXXX.csv; shard
+#     yang sudah ada dilewati, jadi rerun melanjutkan dari checkpoint;
+#   - file akhir (CSV / Parquet) digabung per part, bukan satu Excel besar.
+#
+#     python ner_candidates.py --input dataset/dataset_labeling_bersih.csv \
+#         --output dataset/calon_aspek.parquet --workers 4
+
+NER_MODEL = "cahya/bert-base-indonesian-NER"
+SHARD_SIZE = 512
+BATCH_SIZE = 32
+
+_pipeline = None
+
+
+def _init_worker(model_name, threads):
+    # Dipanggil sekali per proses worker
+    global _pipeline
+    import torch
+    from transformers import pipeline
+
+    torch.set_num_threads(threads)
+    _pipeline = pipeline("ner", model=model_name, tokenizer=model_name, aggregation_strategy="simple", device=-1)
+
+
+def extract_batch(texts, batch_size=BATCH_SIZE):
+    # Urutkan menurut panjang -> batch berisi teks sepanjang mirip -> padding minimal
+    import torch
+
+    order = sorted(range(len(texts)), key=lambda i: len(texts[i].split()))
+    results = [None] * len(texts)
+    with torch.inference_mode():
+        for start in range(0, len(order), batch_size):
+            indices = order[start:start + batch_size]
+            outputs = _pipeline([texts[i] for i in indices], batch_size=len(indices))
+            for i, entities in zip(indices, outputs):
+                results[i] = [entity["word"] for entity in entities] if entities else []
+    return results
+
+
+def _part_path(work_dir, shard):
+    return os.path.join(work_dir, f"part-{shard:05d}.csv")
+
+
+def _process_shard(shard, rows, texts, work_dir, batch_size):
+    candidates = extract_batch(texts, batch_size)
+    frame = pd.DataFrame({
+        "row": rows,
+        "text": texts,
+        "candidate_aspects": [json.dumps(c, ensure_ascii=False) for c in candidates],
+    })
+    path = _part_path(work_dir, shard)
+    frame.to_csv(path + ".tmp", index=False)
+    # Rename atomik: part yang ada di disk selalu lengkap (checkpoint)
+    os.replace(path + ".tmp", path)
+    return shard, len(frame)
+
+
+def iter_shards(input_path, shard_size=SHARD_SIZE):
+    # (nomor shard, nomor baris, teks) dibaca streaming dari CSV
+    offset = 0
+    for shard, chunk in enumerate(pd.read_csv(input_path, usecols=[TEXT_COLUMN], chunksize=shard_size)):
+        texts = chunk[TEXT_COLUMN]
+        mask = texts.notna()
+        rows = (offset + pd.RangeIndex(len(chunk)))[mask.to_numpy()]
+        yield shard, list(rows), texts[mask].astype(str).tolist()
+        offset += len(chunk)
+
+
+def merge_parts(work_dir, output_path):
+    parts = sorted(name for name in os.listdir(work_dir) if name.startswith("part-") and name.endswith(".csv"))
+    if output_path.endswith(".parquet"):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        writer = None
+        for name in parts:
+            table = pa.Table.from_pandas(pd.read_csv(os.path.join(work_dir, name)), preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(output_path, table.schema)
+            writer.write_table(table)
+        if writer is not None:
+            writer.close()
+        return len(parts)
+    with open(output_path, "w", encoding="utf-8-sig", newline="") as f:
+        header = True
+        for name in parts:
+            pd.read_csv(os.path.join(work_dir, name)).to_csv(f, index=False, header=header)
+            header = False
+    return len(parts)
+
+
+def run(input_path, output_path, work_dir=None, model_name=NER_MODEL, workers=None,
+        shard_size=SHARD_SIZE, batch_size=BATCH_SIZE):
+    work_dir = work_dir or os.path.splitext(output_path)[0] + "_parts"
+    os.makedirs(work_dir, exist_ok=True)
+    workers = workers or max(1, (os.cpu_count() or 2) // 2)
+    # Thread torch dibagi rata supaya worker tidak saling berebut core
+    threads = max(1, (os.cpu_count() or 1) // workers)
+
+    # Nomor shard bergantung ukuran shard: checkpoint lama hanya valid untuk ukuran yang sama
+    meta_path = os.path.join(work_dir, "meta.json")
+    meta = {"input": os.path.abspath(input_path), "shard_size": shard_size, "model": model_name}
+    if os.path.exists(meta_path):
+        with open(meta_path, "r", encoding="utf-8") as f:
+            if json.load(f) != meta:
+                raise ValueError(f"Checkpoint di {work_dir} dibuat dengan pengaturan lain; hapus foldernya dulu")
+    with open(meta_path, "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+
+    done = skipped = 0
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(model_name, threads)) as pool:
+        pending = set()
+
+        def collect(return_when):
+            nonlocal pending, done
+            finished, pending = wait(pending, return_when=return_when)
+            for future in finished:
+                shard, count = future.result()
+                done += 1
+                print(f"Shard {shard}: {count} tweet selesai")
+
+        for shard, rows, texts in iter_shards(input_path, shard_size):
+            if os.path.exists(_part_path(work_dir, shard)):
+                skipped += 1
+                continue
+            # Batasi shard yang antre supaya korpus tidak dimuat semua ke memori
+            if len(pending) >= workers * 2:
+                collect(FIRST_COMPLETED)
+            pending.add(pool.submit(_process_shard, shard, rows, texts, work_dir, batch_size))
+        if pending:
+            collect(ALL_COMPLETED)
+
+    parts = merge_parts(work_dir, output_path)
+    print(f"✅ {parts} shard ({skipped} dari checkpoint) digabung ke '{output_path}'")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Ekstraksi calon aspek (NER) per batch")
+    parser.add_argument("--input", default="dataset/dataset_labeling_bersih.csv")
+    parser.add_argument("--output", default="dataset/calon_aspek.csv")
+    parser.add_argument("--work-dir", default=None)
+    parser.add_argument("--model", default=NER_MODEL)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--shard-size", type=int, default=SHARD_SIZE)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    args = parser.parse_args()
+    run(args.input, args.output, args.work_dir, args.model, args.workers, args.shard_size, args.batch_size)
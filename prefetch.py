@@ -0,0 +1,153 @@
+import threading
+import time
+from collections import deque
+
+# ==== Prefetch tweet berikutnya ====
+# Satu TweetPrefetcher per sesi (st.session_state) menyiapkan K tweet
+# berikutnya di ring buffer: teks, aspek utama, jumlah duplikat, pemegang
+# lease lain, saran model, dan label yang sudah tersimpan. Buffer diisi
+# thread background, jadi "Tweet Selanjutnya" cukup pop dari memori dan
+# render tidak perlu membaca mmap / SQLite lagi untuk tweet itu.
+#
+# Thread berhenti sendiri kalau sesi tidak dipakai IDLE_TIMEOUT detik dan
+# dijalankan lagi saat dibutuhkan. Entri yang lebih tua dari MAX_AGE detik
+# (saran model / pemegang lease bisa berubah) disiapkan ulang oleh thread dan
+# tidak dipakai render.
+#
+#     prefetcher = TweetPrefetcher(upcoming=lambda after, n: [...], prepare=lambda row: {...})
+#     view = prefetcher.entry(row) or prepare(row)
+#     next_view = prefetcher.advance(current_row, skip=navigator.is_completed)
+
+PREFETCH_AHEAD = 5
+MAX_AGE = 30.0
+IDLE_TIMEOUT = 300.0
+
+
+class TweetPrefetcher:
+    def __init__(self, upcoming, prepare, ahead=PREFETCH_AHEAD, max_age=MAX_AGE, idle_timeout=IDLE_TIMEOUT):
+        # upcoming(after_row, count) -> [row] urut; prepare(row) -> dict dengan kunci "row"
+        self.upcoming = upcoming
+        self.prepare = prepare
+        self.ahead = ahead
+        self.max_age = max_age
+        self.idle_timeout = idle_timeout
+
+        self._buffer = deque(maxlen=ahead)
+        self._current = None
+        self._cursor = None
+        self._generation = 0
+        self._last_used = time.monotonic()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._thread = None
+        self.hits = 0
+        self.misses = 0
+        self.last_error = None
+
+    # ---- Dipanggil dari script Streamlit ----
+    def _fresh(self, entry):
+        return time.monotonic() - entry["prepared_at"] <= self.max_age
+
+    def follow(self, row):
+        # Tweet yang sedang ditampilkan; lompat ke tempat lain = buffer lama dibuang
+        with self._lock:
+            self._last_used = time.monotonic()
+            if row != self._cursor:
+                self._cursor = row
+                while self._buffer and self._buffer[0]["row"] != row:
+                    self._buffer.popleft()
+                if self._buffer:
+                    self._current = self._buffer.popleft()
+                elif self._current is not None and self._current["row"] != row:
+                    self._current = None
+                self._generation += 1
+            self._ensure_thread()
+            self._wakeup.notify()
+
+    def entry(self, row):
+        # Entri siap render untuk `row`, atau None (render membaca langsung)
+        with self._lock:
+            entry = self._current
+            if entry is not None and entry["row"] == row and self._fresh(entry):
+                self.hits += 1
+                return entry
+            self.misses += 1
+            return None
+
+    def advance(self, current_row, skip=None):
+        # Tweet berikutnya dari buffer (pop di memori); None kalau buffer kosong
+        with self._lock:
+            self._last_used = time.monotonic()
+            while self._buffer:
+                entry = self._buffer.popleft()
+                if entry["row"] == current_row or (skip is not None and skip(entry["row"])):
+                    continue
+                self._current = entry
+                self._cursor = entry["row"]
+                self._ensure_thread()
+                self._wakeup.notify()
+                return entry
+            self._ensure_thread()
+            self._wakeup.notify()
+            return None
+
+    def invalidate(self):
+        # Data berubah (mis. semua anotasi dihapus): siapkan ulang dari awal
+        with self._lock:
+            self._buffer.clear()
+            self._current = None
+            self._generation += 1
+            self._wakeup.notify()
+
+    def status(self):
+        with self._lock:
+            return {"buffered": len(self._buffer), "ahead": self.ahead, "hits": self.hits,
+                    "misses": self.misses, "running": self._thread is not None, "last_error": self.last_error}
+
+    # ---- Thread background ----
+    def _ensure_thread(self):
+        # Dipanggil dengan lock dipegang
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="prefetch", daemon=True)
+            self._thread.start()
+
+    def _needs_fill(self):
+        return (len(self._buffer) < self.ahead or any(not self._fresh(e) for e in self._buffer)
+                or (self._current is not None and not self._fresh(self._current)))
+
+    def _run(self):
+        while True:
+            with self._lock:
+                while not self._needs_fill():
+                    if time.monotonic() - self._last_used > self.idle_timeout:
+                        self._thread = None
+                        return
+                    self._wakeup.wait(timeout=self.max_age / 2)
+                if time.monotonic() - self._last_used > self.idle_timeout:
+                    self._thread = None
+                    return
+                cursor, generation = self._cursor, self._generation
+                have = {e["row"]: e for e in self._buffer if self._fresh(e)}
+                current = self._current
+            try:
+                if current is not None and not self._fresh(current):
+                    current = self._stamp(self.prepare(current["row"]))
+                rows = self.upcoming(cursor, self.ahead)
+                entries = [have.get(row) or self._stamp(self.prepare(row)) for row in rows]
+                with self._lock:
+                    if generation == self._generation:
+                        self._buffer = deque(entries, maxlen=self.ahead)
+                        if current is not None and self._current is not None and self._current["row"] == current["row"]:
+                            self._current = current
+                        self.last_error = None
+                        if len(entries) < self.ahead:
+                            # Tidak ada tweet lagi untuk saat ini: tunggu sampai dipakai lagi
+                            self._wakeup.wait(timeout=self.max_age / 2)
+            except Exception as e:
+                with self._lock:
+                    self.last_error = f"{type(e).__name__}: {e}"
+                    self._wakeup.wait(timeout=self.max_age / 2)
+
+    def _stamp(self, entry):
+        entry["prepared_at"] = time.monotonic()
+        return entry
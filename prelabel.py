@@ -0,0 +1,265 @@
+import datetime
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+
+# ==== Pre-labeling dengan model APC (PyABSA) ====
+# Checkpoint APC hasil notebook (BERT_SPC + indobenchmark/indobert-base-p1)
+# dijalankan di CPU pada thread background, per micro-batch atas tweet yang
+# belum dilabeli. Saran (aspek, sentimen, confidence) disimpan di SQLite dengan
+# kunci (tweet_id, versi model), jadi tiap tweet cukup diprediksi sekali per
+# checkpoint dan saran langsung tersedia lagi setelah app restart.
+#
+# PyABSA / torch tidak wajib: kalau belum terpasang atau checkpoint tidak
+# ada, layanan ini nonaktif dan app berjalan seperti biasa.
+
+PREDICTIONS_PATH = "predictions.db"
+APC_CHECKPOINT = os.environ.get("APC_CHECKPOINT", os.path.join("checkpoints", "apc_indobert"))
+BATCH_SIZE = 16
+CPU_THREADS = max(1, (os.cpu_count() or 2) // 2)
+
+# Label sentimen model (bahasa Inggris, lihat dataset/labeled_tweets.txt) -> label app
+SENTIMENT_LABELS = {
+    "positive": "Positif",
+    "negative": "Negatif",
+    "neutral": "Netral",
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS predictions (
+    tweet_id      TEXT NOT NULL,
+    model_version TEXT NOT NULL,
+    aspek         TEXT NOT NULL,
+    sentimen      TEXT NOT NULL,
+    confidence    REAL NOT NULL,
+    probs         TEXT,
+    created_at    TEXT NOT NULL,
+    PRIMARY KEY (tweet_id, model_version, aspek)
+);
+"""
+
+
+def model_version(checkpoint):
+    # Nama checkpoint + sidik isi folder: checkpoint dilatih ulang = versi baru
+    entries = []
+    for root, _, files in os.walk(checkpoint):
+        for name in sorted(files):
+            stat = os.stat(os.path.join(root, name))
+            entries.append(f"{name}:{stat.st_size}:{int(stat.st_mtime)}")
+    digest = hashlib.sha1("|".join(entries).encode("utf-8")).hexdigest()[:10]
+    return f"{os.path.basename(os.path.normpath(checkpoint))}@{digest}"
+
+
+class PredictionCache:
+    def __init__(self, path=PREDICTIONS_PATH):
+        self._conn = sqlite3.connect(path, timeout=30.0, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(SCHEMA)
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(predictions)")}
+            if "probs" not in columns:
+                # Database lama (sebelum ada probabilitas per kelas)
+                self._conn.execute("ALTER TABLE predictions ADD COLUMN probs TEXT")
+            self._conn.commit()
+
+    def get(self, tweet_id, version):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT aspek, sentimen, confidence FROM predictions "
+                "WHERE tweet_id = ? AND model_version = ? ORDER BY confidence DESC",
+                (tweet_id, version),
+            ).fetchall()
+        return [{"aspek": row[0], "sentimen": row[1], "confidence": row[2]} for row in rows]
+
+    def cached_ids(self, tweet_ids, version):
+        tweet_ids = list(tweet_ids)
+        if not tweet_ids:
+            return set()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT DISTINCT tweet_id FROM predictions WHERE model_version = ? AND tweet_id IN (%s)"
+                % ",".join("?" * len(tweet_ids)),
+                [version] + tweet_ids,
+            ).fetchall()
+        return {row[0] for row in rows}
+
+    def put_many(self, version, predictions):
+        now = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO predictions "
+                "(tweet_id, model_version, aspek, sentimen, confidence, probs, created_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(p["tweet_id"], version, p["aspek"], p["sentimen"], p["confidence"],
+                  json.dumps(p["probs"]) if p.get("probs") is not None else None, now) for p in predictions],
+            )
+
+    def since(self, rowid):
+        # Prediksi yang masuk setelah rowid tertentu (untuk pembaruan inkremental)
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT rowid, tweet_id, model_version, aspek, sentimen, confidence, probs "
+                "FROM predictions WHERE rowid > ? ORDER BY rowid",
+                (rowid,),
+            ).fetchall()
+        return [
+            {"rowid": row[0], "tweet_id": row[1], "model_version": row[2], "aspek": row[3],
+             "sentimen": row[4], "confidence": row[5], "probs": json.loads(row[6]) if row[6] else None}
+            for row in rows
+        ]
+
+
+class ApcPredictor:
+    # Bungkus SentimentClassifier PyABSA; diimpor malas karena berat
+    def __init__(self, checkpoint=APC_CHECKPOINT, cpu_threads=CPU_THREADS):
+        import torch
+        from pyabsa import AspectPolarityClassification as APC
+
+        torch.set_num_threads(cpu_threads)
+        self._torch = torch
+        self.classifier = APC.SentimentClassifier(checkpoint=checkpoint, auto_device=False)
+
+    def predict(self, pairs):
+        # pairs: list (tweet, aspek) -> list (sentimen, confidence, probabilitas per kelas)
+        # Aspek ditaruh di depan kalimat, sama seperti $T$ di data latih
+        texts = [f"[B-ASP]{aspek}[E-ASP] {tweet}" for tweet, aspek in pairs]
+        with self._torch.inference_mode():
+            results = self.classifier.predict(
+                text=texts, print_result=False, ignore_error=True, eval_batch_size=len(texts)
+            )
+        if isinstance(results, dict):
+            results = [results]
+        predictions = []
+        for result in results:
+            sentiment = result.get("sentiment") or [""]
+            confidence = result.get("confidence") or [0.0]
+            probs = result.get("probs") or [None]
+            label = str(sentiment[0])
+            predictions.append((
+                SENTIMENT_LABELS.get(label.lower(), label),
+                float(confidence[0]),
+                [float(p) for p in probs[0]] if probs[0] is not None else None,
+            ))
+        return predictions
+
+
+def load_predictor(checkpoint=APC_CHECKPOINT):
+    # None kalau PyABSA belum terpasang atau checkpoint belum ada
+    if not os.path.exists(checkpoint):
+        return None
+    try:
+        return ApcPredictor(checkpoint)
+    except ImportError:
+        return None
+
+
+class PrelabelService:
+    def __init__(self, cache, predictor_factory=load_predictor, checkpoint=APC_CHECKPOINT,
+                 batch_size=BATCH_SIZE):
+        self.cache = cache
+        self.predictor_factory = predictor_factory
+        self.checkpoint = checkpoint
+        self.batch_size = batch_size
+        self.enabled = os.path.exists(checkpoint)
+        self.version = model_version(checkpoint) if self.enabled else None
+
+        # tweet_id -> (tweet, [kandidat aspek]); urutan masuk = urutan prediksi
+        self._queue = {}
+        self._seen = set()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._stopped = False
+        self.predicted = 0
+        self.last_error = None
+        self._thread = None
+        if self.enabled:
+            self._thread = threading.Thread(target=self._run, name="prelabel", daemon=True)
+            self._thread.start()
+
+    # ---- Dipanggil dari script Streamlit ----
+    def submit(self, items):
+        # items: iterable (tweet_id, tweet, [kandidat aspek]); yang sudah ada di cache dilewati
+        if not self.enabled or self._stopped:
+            return
+        items = [item for item in items if item[0] not in self._seen]
+        if not items:
+            return
+        cached = self.cache.cached_ids([item[0] for item in items], self.version)
+        with self._lock:
+            for tweet_id, tweet, aspects in items:
+                self._seen.add(tweet_id)
+                if tweet_id not in cached:
+                    self._queue[tweet_id] = (tweet, list(aspects))
+            self._wakeup.notify()
+
+    def suggestions(self, tweet_id):
+        if not self.enabled:
+            return []
+        return self.cache.get(tweet_id, self.version)
+
+    def status(self):
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "version": self.version,
+                "queued": len(self._queue),
+                "predicted": self.predicted,
+                "last_error": self.last_error,
+            }
+
+    def stop(self):
+        with self._lock:
+            self._stopped = True
+            self._wakeup.notify()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    # ---- Thread background ----
+    def _next_batch(self):
+        with self._lock:
+            while not self._queue and not self._stopped:
+                self._wakeup.wait()
+            if self._stopped:
+                return None
+            batch = []
+            for tweet_id in list(self._queue)[:self.batch_size]:
+                batch.append((tweet_id,) + self._queue.pop(tweet_id))
+            return batch
+
+    def _run(self):
+        predictor = None
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            try:
+                if predictor is None:
+                    predictor = self.predictor_factory(self.checkpoint)
+                    if predictor is None:
+                        # Saran yang sudah ada di cache tetap ditampilkan
+                        with self._lock:
+                            self.last_error = "PyABSA / torch belum terpasang"
+                            self._stopped = True
+                            self._queue.clear()
+                        return
+                # Satu micro-batch = semua pasangan (tweet, aspek) dari beberapa tweet
+                pairs = [(tweet, aspek) for _, tweet, aspects in batch for aspek in aspects]
+                outputs = iter(predictor.predict(pairs)) if pairs else iter(())
+                predictions = []
+                for tweet_id, _, aspects in batch:
+                    for aspek in aspects:
+                        sentimen, confidence, *probs = next(outputs)
+                        predictions.append({"tweet_id": tweet_id, "aspek": aspek, "sentimen": sentimen,
+                                            "confidence": confidence, "probs": probs[0] if probs else None})
+                self.cache.put_many(self.version, predictions)
+                with self._lock:
+                    self.predicted += len(batch)
+                    self.last_error = None
+            except Exception as e:
+                with self._lock:
+                    self.last_error = f"{type(e).__name__}: {e}"
+                    # Dicoba lagi nanti saat tweet yang sama di-submit ulang
+                    for tweet_id, _, _ in batch:
+                        self._seen.discard(tweet_id)
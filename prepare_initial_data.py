@@ -1,13 +1,15 @@
-import pandas as pd
+from dataset_split import blank_absa_lines, build_splits
 
-# Baca file hasil segmentasi
-df = pd.read_csv('dataset/gabungan_dataset_segmented.csv')
-
-# Buat format awal untuk labeling (text saja, tanpa label)
-with open('dataset/train.txt', 'w', encoding='utf-8') as f:
-    for text in df['Segmented_Text']:
-        # Format dasar: text####
-        f.write(f"{text}####\n")
+# Baca file hasil segmentasi per chunk dan buat format awal untuk labeling
+# (text saja, tanpa label). Rasio (1, 0, 0): semua baris masuk train.txt,
+# urutan sama dengan file input.
+build_splits(
+    'dataset/gabungan_dataset_segmented.csv',
+    'dataset',
+    # Format dasar: text####
+    formatter=lambda chunk: blank_absa_lines(chunk, 'Segmented_Text', separator='####'),
+    ratios=(1.0, 0.0, 0.0),
+)
 
 print("File train.txt telah dibuat di folder dataset/")
 print("Selanjutnya Anda bisa menggunakan 2_ABSADatasetPrepareTool.html untuk melakukan labeling")
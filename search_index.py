@@ -0,0 +1,225 @@
+import argparse
+import hashlib
+import json
+import math
+import os
+import re
+import time
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+from corpus_cache import TEXT_COLUMN, normalize_text, open_corpus, save_array
+
+# ==== Inverted index + BM25 atas korpus tweet ====
+# token -> posting list (baris korpus + frekuensi), disimpan sebagai array CSR
+# di folder cache korpus sehingga cukup dibangun sekali lalu dibuka dengan mmap.
+# Kalau CSV sumber hanya bertambah baris di belakang, yang di-index cukup
+# baris barunya saja (inkremental).
+#
+# Sintaks query:
+#     kebijakan pangan         kedua kata harus ada (AND)
+#     "makan bergizi gratis"   frasa persis
+#     responsif OR tanggap     salah satu kelompok cocok
+#     menteri -korupsi         tanpa kata "korupsi"
+# Hasil diurutkan dengan skor BM25.
+
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+_QUERY_RE = re.compile(r'(-?)"([^"]*)"|(\S+)')
+
+
+def tokenize(text):
+    return normalize_text(text).split()
+
+
+def parse_query(query):
+    # Kembalikan list kelompok OR; tiap kelompok {"must": [...], "not": [...]}
+    # dengan klausa berupa tuple token (1 token = kata, >1 token = frasa)
+    groups = [{"must": [], "not": []}]
+    for match in _QUERY_RE.finditer(query):
+        negated, phrase, word = match.groups()
+        if word == "OR":
+            groups.append({"must": [], "not": []})
+            continue
+        if word is not None:
+            negated = "-" if word.startswith("-") and len(word) > 1 else ""
+            phrase = word[1:] if negated else word
+        tokens = tuple(tokenize(phrase))
+        if tokens:
+            groups[-1]["not" if negated else "must"].append(tokens)
+    return [group for group in groups if group["must"] or group["not"]]
+
+
+def _digest(ids):
+    return hashlib.sha1(np.ascontiguousarray(ids).tobytes()).hexdigest()
+
+
+class SearchIndex:
+    def __init__(self, corpus):
+        self.corpus = corpus
+        self.cache_dir = corpus.cache_dir
+        self._open()
+
+    # ---- Bangun / muat ----
+    def _path(self, name):
+        return os.path.join(self.cache_dir, f"search_{name}")
+
+    def _open(self):
+        meta = None
+        if os.path.exists(self._path("meta.json")):
+            with open(self._path("meta.json"), "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        indexed = meta["rows"] if meta else 0
+        if meta is None or indexed > len(self.corpus) or meta["ids"] != _digest(self.corpus.ids[:indexed]):
+            # Baris lama berubah: index ulang dari awal
+            self._build(0, None)
+        elif indexed < len(self.corpus):
+            self._build(indexed, meta)
+        self._load()
+
+    def _tokenize_rows(self, start):
+        entries = []
+        doc_len = []
+        for row in range(start, len(self.corpus)):
+            counts = Counter(tokenize(self.corpus.text(row)))
+            doc_len.append(sum(counts.values()))
+            entries.extend((token, row, tf) for token, tf in counts.items())
+        return entries, np.array(doc_len, dtype=np.int32)
+
+    def _build(self, start, meta):
+        entries, new_doc_len = self._tokenize_rows(start)
+        tokens = [token for token, _, _ in entries]
+        rows = np.array([row for _, row, _ in entries], dtype=np.int32)
+        tf = np.array([tf for _, _, tf in entries], dtype=np.int32)
+        doc_len = new_doc_len
+
+        if meta is not None:
+            # Gabungkan posting lama (sudah ada di disk) dengan baris baru
+            with open(self._path("vocab.json"), "r", encoding="utf-8") as f:
+                old_vocab = json.load(f)
+            old_offsets = np.load(self._path("offsets.npy"))
+            old_token_ids = np.repeat(np.arange(len(old_vocab)), np.diff(old_offsets))
+            tokens = [old_vocab[i] for i in old_token_ids] + tokens
+            rows = np.concatenate([np.load(self._path("rows.npy")), rows])
+            tf = np.concatenate([np.load(self._path("tf.npy")), tf])
+            doc_len = np.concatenate([np.load(self._path("doc_len.npy")), doc_len])
+
+        vocab = sorted(set(tokens))
+        position = {token: i for i, token in enumerate(vocab)}
+        token_ids = np.array([position[token] for token in tokens], dtype=np.int64)
+        order = np.lexsort((rows, token_ids))
+        offsets = np.zeros(len(vocab) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(token_ids, minlength=len(vocab)), out=offsets[1:])
+
+        save_array(self._path("offsets.npy"), offsets)
+        save_array(self._path("rows.npy"), rows[order])
+        save_array(self._path("tf.npy"), tf[order])
+        save_array(self._path("doc_len.npy"), doc_len)
+        with open(self._path("vocab.json"), "w", encoding="utf-8") as f:
+            json.dump(vocab, f, ensure_ascii=False)
+        # meta ditulis terakhir: tanda index lengkap
+        with open(self._path("meta.json"), "w", encoding="utf-8") as f:
+            json.dump({"rows": len(self.corpus), "ids": _digest(self.corpus.ids)}, f)
+
+    def _load(self):
+        with open(self._path("vocab.json"), "r", encoding="utf-8") as f:
+            self.vocab = {token: i for i, token in enumerate(json.load(f))}
+        self.offsets = np.load(self._path("offsets.npy"), mmap_mode="r")
+        self.rows = np.load(self._path("rows.npy"), mmap_mode="r")
+        self.tf = np.load(self._path("tf.npy"), mmap_mode="r")
+        self.doc_len = np.load(self._path("doc_len.npy"), mmap_mode="r")
+        self.avg_doc_len = float(self.doc_len.mean()) if len(self.doc_len) else 0.0
+
+    # ---- Posting ----
+    def postings(self, token):
+        token_id = self.vocab.get(token)
+        if token_id is None:
+            return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.int32)
+        start, end = int(self.offsets[token_id]), int(self.offsets[token_id + 1])
+        return self.rows[start:end], self.tf[start:end]
+
+    def document_frequency(self, token):
+        return len(self.postings(token)[0])
+
+    def _match_clause(self, tokens):
+        rows = self.postings(tokens[0])[0]
+        for token in tokens[1:]:
+            rows = np.intersect1d(rows, self.postings(token)[0], assume_unique=True)
+        if len(tokens) > 1:
+            # Frasa: kandidat dari irisan posting diverifikasi ke teksnya
+            phrase = " " + " ".join(tokens) + " "
+            rows = np.array([row for row in rows if phrase in " " + normalize_text(self.corpus.text(row)) + " "],
+                            dtype=np.int32)
+        return np.asarray(rows)
+
+    def match(self, query):
+        # Baris (terurut) yang cocok dengan query boolean/frasa
+        result = np.empty(0, dtype=np.int64)
+        for group in parse_query(query):
+            if group["must"]:
+                rows = self._match_clause(group["must"][0])
+                for clause in group["must"][1:]:
+                    rows = np.intersect1d(rows, self._match_clause(clause), assume_unique=True)
+            else:
+                rows = np.arange(len(self.corpus))
+            for clause in group["not"]:
+                rows = np.setdiff1d(rows, self._match_clause(clause), assume_unique=True)
+            result = np.union1d(result, rows)
+        return result.astype(np.int64)
+
+    # ---- Ranking ----
+    def bm25(self, query, rows):
+        scores = np.zeros(len(rows), dtype=np.float64)
+        if not len(rows):
+            return scores
+        total = len(self.corpus)
+        terms = {token for group in parse_query(query) for clause in group["must"] for token in clause}
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * self.doc_len[rows] / max(self.avg_doc_len, 1e-9))
+        for token in terms:
+            posting_rows, posting_tf = self.postings(token)
+            if not len(posting_rows):
+                continue
+            idf = math.log(1 + (total - len(posting_rows) + 0.5) / (len(posting_rows) + 0.5))
+            position = np.searchsorted(posting_rows, rows)
+            position = np.minimum(position, len(posting_rows) - 1)
+            found = posting_rows[position] == rows
+            tf = np.where(found, posting_tf[position], 0).astype(np.float64)
+            scores += idf * tf * (BM25_K1 + 1) / (tf + norm)
+        return scores
+
+    def search(self, query, limit=None, exclude=None):
+        # Kembalikan list (baris, skor) terurut skor BM25 menurun.
+        # exclude: mask bool per baris yang dilewati (mis. sudah dilabeli)
+        rows = self.match(query)
+        if exclude is not None and len(rows):
+            rows = rows[~exclude[rows]]
+        scores = self.bm25(query, rows)
+        order = np.lexsort((rows, -scores))
+        if limit is not None:
+            order = order[:limit]
+        return [(int(rows[i]), float(scores[i])) for i in order]
+
+
+def build_queue(csv_path, query, top, output_path):
+    # Pengganti filter kata kunci offline: tulis top-N tweet ke CSV
+    # (format sama dengan dataset/filtered_aspek_*_top100.csv)
+    name = os.path.splitext(os.path.basename(csv_path))[0]
+    corpus = open_corpus([(csv_path, None)], name)
+    start = time.perf_counter()
+    results = SearchIndex(corpus).search(query, limit=top)
+    elapsed = (time.perf_counter() - start) * 1000
+    pd.DataFrame({TEXT_COLUMN: [corpus.text(row) for row, _ in results]}).to_csv(output_path, index=False)
+    print(f"{len(results)} tweet ditulis ke {output_path} ({elapsed:.1f} ms)")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Buat antrian labeling dari query kata kunci")
+    parser.add_argument("query")
+    parser.add_argument("--input", default="dataset/dataset_labeling_bersih.csv")
+    parser.add_argument("--top", type=int, default=100)
+    parser.add_argument("--output", default="dataset/filtered_aspek_query_top100.csv")
+    args = parser.parse_args()
+    build_queue(args.input, args.query, args.top, args.output)
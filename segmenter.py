@@ -0,0 +1,204 @@
+import os
+import re
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+# ==== Mesin segmentasi kata ====
+# Dipakai 1_pre_word_segment_for_non_english_data.py. CSV dibaca per chunk,
+# tiap chunk disegmentasi lalu langsung di-append ke file output.
+#   - pola regex dikompilasi sekali; segmenter "simple" memakai operasi
+#     vektor Series.str (tanpa loop Python per tweet);
+#   - segmenter lain didaftarkan di SEGMENTERS (mis. stemmer Sastrawi) dan
+#     dijalankan paralel dengan process pool untuk input besar;
+#   - hasil disimpan per (segmenter, hash teks) di SQLite, jadi saat korpus
+#     bertambah hanya baris baru yang disegmentasi ulang.
+
+CHUNK_SIZE = 20_000
+CACHE_PATH = os.path.join("dataset", ".cache", "segments.db")
+# Di bawah jumlah ini, overhead process pool lebih besar dari untungnya
+MIN_PARALLEL = 2_000
+
+_PUNCT_RE = re.compile(r"([.,!?;:])")
+_NON_ALPHA_RE = re.compile(r"[^a-zA-Z\s.,!?;:]")
+
+SEGMENTERS = {}
+
+
+def register_segmenter(name, vectorized=None):
+    # Daftarkan seg_fn(text) -> list token; `vectorized(series) -> series`
+    # opsional untuk versi Series.str yang jauh lebih cepat
+    def decorator(seg_fn):
+        SEGMENTERS[name] = {"seg_fn": seg_fn, "vectorized": vectorized}
+        return seg_fn
+    return decorator
+
+
+# ---- Segmenter bawaan ----
+def _simple_series(texts):
+    texts = texts.str.replace(_PUNCT_RE, r" \1 ", regex=True)
+    texts = texts.str.replace(_NON_ALPHA_RE, " ", regex=True)
+    return texts.str.split().str.join(" ")
+
+
+@register_segmenter("simple", vectorized=_simple_series)
+def simple_tokenize(text):
+    if not isinstance(text, str):
+        return []
+    # Pisahkan tanda baca dari kata, buang karakter khusus & angka
+    text = _PUNCT_RE.sub(r" \1 ", text)
+    text = _NON_ALPHA_RE.sub(" ", text)
+    return text.split()
+
+
+def simple_tokenize_text(text):
+    return " ".join(simple_tokenize(text))
+
+
+_stemmer = None
+
+
+@register_segmenter("sastrawi")
+def sastrawi_stem(text):
+    # Stemmer Bahasa Indonesia (pip install Sastrawi), dimuat sekali per proses
+    global _stemmer
+    if _stemmer is None:
+        from Sastrawi.Stemmer.StemmerFactory import StemmerFactory
+
+        _stemmer = StemmerFactory().create_stemmer()
+    return _stemmer.stem(simple_tokenize_text(text)).split()
+
+
+# ---- Cache hasil per hash teks ----
+class SegmentCache:
+    def __init__(self, path=CACHE_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS segments ("
+            " segmenter TEXT NOT NULL, text_hash INTEGER NOT NULL, segmented TEXT NOT NULL,"
+            " PRIMARY KEY (segmenter, text_hash))"
+        )
+        self._conn.commit()
+
+    def get_many(self, segmenter, hashes):
+        found = {}
+        hashes = list(hashes)
+        # Batas parameter SQLite: kueri per potongan
+        for start in range(0, len(hashes), 900):
+            part = hashes[start:start + 900]
+            rows = self._conn.execute(
+                "SELECT text_hash, segmented FROM segments WHERE segmenter = ? AND text_hash IN (%s)"
+                % ",".join("?" * len(part)),
+                [segmenter] + part,
+            )
+            found.update(rows)
+        return found
+
+    def put_many(self, segmenter, items):
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO segments (segmenter, text_hash, segmented) VALUES (?, ?, ?)",
+                [(segmenter, text_hash, segmented) for text_hash, segmented in items],
+            )
+
+    def close(self):
+        self._conn.close()
+
+
+def _segment_texts(name, texts):
+    # Dijalankan di worker: segmenter dicari lewat nama (fungsi tidak perlu di-pickle)
+    seg_fn = SEGMENTERS[name]["seg_fn"]
+    return [" ".join(seg_fn(text)) for text in texts]
+
+
+def text_hashes(texts):
+    # Hash 64-bit deterministik per teks (vektor, tanpa loop Python)
+    return pd.util.hash_pandas_object(texts, index=False).astype("int64")
+
+
+class Segmenter:
+    def __init__(self, seg_fn="simple", cache=None, workers=None):
+        self.workers = workers or max(1, (os.cpu_count() or 2) - 1)
+        registered = {entry["seg_fn"]: name for name, entry in SEGMENTERS.items()}
+        if callable(seg_fn) and seg_fn in registered:
+            seg_fn = registered[seg_fn]
+        elif callable(seg_fn):
+            # Fungsi di luar registry belum tentu bisa dipanggil dari worker: jalankan di proses ini
+            name = getattr(seg_fn, "__name__", "custom")
+            SEGMENTERS.setdefault(name, {"seg_fn": seg_fn, "vectorized": None})
+            if SEGMENTERS[name]["seg_fn"] is not seg_fn:
+                raise ValueError(f"Nama segmenter '{name}' sudah dipakai fungsi lain")
+            seg_fn = name
+            self.workers = 1
+        if seg_fn not in SEGMENTERS:
+            raise ValueError(f"Segmenter tidak dikenal: {seg_fn} (tersedia: {', '.join(SEGMENTERS)})")
+        self.name = seg_fn
+        self.entry = SEGMENTERS[seg_fn]
+        self.cache = cache
+        self._pool = None
+
+    def _compute(self, texts):
+        if self.entry["vectorized"] is not None:
+            return self.entry["vectorized"](texts).tolist()
+        values = texts.tolist()
+        if len(values) < MIN_PARALLEL or self.workers == 1:
+            return _segment_texts(self.name, values)
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        size = -(-len(values) // (self.workers * 4))
+        parts = [values[i:i + size] for i in range(0, len(values), size)]
+        results = self._pool.map(_segment_texts, [self.name] * len(parts), parts)
+        return [segmented for part in results for segmented in part]
+
+    def segment(self, texts):
+        # texts: Series teks -> Series hasil segmentasi ('' untuk sel kosong)
+        valid = texts.notna()
+        result = pd.Series("", index=texts.index, dtype=object)
+        texts = texts[valid].astype(str)
+        if texts.empty:
+            return result
+        if self.cache is None:
+            result[valid] = self._compute(texts)
+            return result
+
+        hashes = text_hashes(texts)
+        known = self.cache.get_many(self.name, hashes.unique().tolist())
+        missing = ~hashes.isin(known.keys())
+        if missing.any():
+            fresh_texts = texts[missing]
+            fresh_hashes = hashes[missing]
+            first = ~fresh_hashes.duplicated()
+            computed = self._compute(fresh_texts[first])
+            fresh = dict(zip(fresh_hashes[first].tolist(), computed))
+            self.cache.put_many(self.name, fresh.items())
+            known.update(fresh)
+        result[valid] = hashes.map(known).tolist()
+        return result
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+
+def segment_file(input_file, output_file=None, seg_fn="simple", text_column="Cleaned_Tweet",
+                 output_column="Segmented_Text", chunksize=CHUNK_SIZE, use_cache=True, workers=None):
+    output_file = output_file or input_file.replace(".csv", "_segmented.csv")
+    cache = SegmentCache() if use_cache else None
+    segmenter = Segmenter(seg_fn, cache=cache, workers=workers)
+    rows = 0
+    try:
+        with open(output_file, "w", encoding="utf-8", newline="") as out:
+            header = True
+            for chunk in pd.read_csv(input_file, chunksize=chunksize):
+                chunk[output_column] = segmenter.segment(chunk[text_column])
+                chunk.to_csv(out, index=False, header=header)
+                header = False
+                rows += len(chunk)
+    finally:
+        segmenter.close()
+        if cache is not None:
+            cache.close()
+    return output_file, rows
@@ -0,0 +1,320 @@
+import argparse
+import json
+import os
+import random
+import re
+import threading
+import time
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# ==== Backend Google Sheet (asli / palsu) ====
+# SheetSync & SheetWriter hanya butuh objek "sheet" dengan method
+#   append_row, append_rows, get_all_values, batch_update
+# Backend dipilih lewat env SHEET_BACKEND:
+#   gspread (default)      Google Sheets asli, kredensial dari st.secrets
+#   fake                   sheet palsu di memori proses (satu per proses)
+#   http://host:port       sheet palsu di proses lain (python sheet_backend.py serve)
+# Sheet palsu bisa disuntik latensi, error kuota 429, dan kegagalan parsial
+# (sebagian baris sudah tertulis lalu request gagal), untuk menguji retry /
+# dedup dan mengukur throughput sinkronisasi tanpa menyentuh kuota asli.
+#
+#     SHEET_BACKEND=fake streamlit run app.py
+#     python sheet_backend.py serve --port 8765 --latency 0.3 --quota-rate 0.1
+#     python sheet_backend.py load --rows 5000 --quota-rate 0.05 --partial-rate 0.05
+
+SCOPE = [
+    "https://www.googleapis.com/auth/spreadsheets",
+    "https://www.googleapis.com/auth/drive"
+]
+SHEET_NAME = "Sentimen_Kabinet_Labeling"
+DEFAULT_BACKEND = "gspread"
+
+_RANGE_ROW_RE = re.compile(r"(?:^|!)[A-Z]+(\d+)")
+
+
+class _Response:
+    # Cukup mirip requests.Response untuk gsheet_writer.is_transient_error
+    def __init__(self, status_code):
+        self.status_code = status_code
+
+
+class FakeSheetError(Exception):
+    def __init__(self, status_code, message):
+        super().__init__(f"{status_code}: {message}")
+        self.response = _Response(status_code)
+
+
+# ---- Sheet palsu di memori ----
+class FakeSheet:
+    def __init__(self, latency=0.0, quota_rate=0.0, failure_rate=0.0, partial_rate=0.0, seed=None):
+        # latency: detik per request; *_rate: peluang per request (0..1)
+        self.latency = latency
+        self.quota_rate = quota_rate
+        self.failure_rate = failure_rate
+        self.partial_rate = partial_rate
+        self.rows = []
+        self.stats = {"requests": 0, "rows_appended": 0, "rows_updated": 0,
+                      "quota_errors": 0, "failures": 0, "partial_failures": 0}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def configure(self, **settings):
+        with self._lock:
+            for name, value in settings.items():
+                if value is not None:
+                    setattr(self, name, value)
+
+    def _request(self):
+        # Dipanggil dengan lock terpegang; mengembalikan True kalau request ini gagal parsial
+        self.stats["requests"] += 1
+        if self.latency:
+            time.sleep(self.latency)
+        roll = self._random.random()
+        if roll < self.quota_rate:
+            self.stats["quota_errors"] += 1
+            raise FakeSheetError(429, "Quota exceeded for quota metric 'Write requests'")
+        roll -= self.quota_rate
+        if roll < self.failure_rate:
+            self.stats["failures"] += 1
+            raise FakeSheetError(503, "The service is currently unavailable")
+        roll -= self.failure_rate
+        return roll < self.partial_rate
+
+    def get_all_values(self):
+        with self._lock:
+            self._request()
+            return [list(row) for row in self.rows]
+
+    def append_row(self, row, **kwargs):
+        return self.append_rows([row], **kwargs)
+
+    def append_rows(self, rows, **kwargs):
+        with self._lock:
+            partial = self._request()
+            rows = [[str(value) for value in row] for row in rows]
+            start = len(self.rows) + 1
+            if partial and rows:
+                # Sebagian baris masuk, lalu koneksi putus sebelum respons terkirim
+                written = self._random.randint(1, len(rows))
+                self.rows.extend(rows[:written])
+                self.stats["rows_appended"] += written
+                self.stats["partial_failures"] += 1
+                raise FakeSheetError(500, f"Internal error after writing {written} of {len(rows)} rows")
+            self.rows.extend(rows)
+            self.stats["rows_appended"] += len(rows)
+            return {"updates": {"updatedRange": f"Sheet1!A{start}:F{len(self.rows)}", "updatedRows": len(rows)}}
+
+    def batch_update(self, data, **kwargs):
+        with self._lock:
+            partial = self._request()
+            items = list(data)
+            if partial and items:
+                items = items[:self._random.randint(1, len(items))]
+            for item in items:
+                match = _RANGE_ROW_RE.search(item["range"])
+                row = int(match.group(1))
+                while len(self.rows) < row:
+                    self.rows.append([])
+                self.rows[row - 1] = [str(value) for value in item["values"][0]]
+            self.stats["rows_updated"] += len(items)
+            if partial:
+                self.stats["partial_failures"] += 1
+                raise FakeSheetError(500, f"Internal error after updating {len(items)} of {len(data)} ranges")
+            return {"totalUpdatedRows": len(items)}
+
+    def snapshot(self):
+        with self._lock:
+            return {"rows": len(self.rows), **self.stats}
+
+
+_fake_sheet = None
+_fake_lock = threading.Lock()
+
+
+def fake_sheet(**settings):
+    # Satu FakeSheet per proses, dipakai bersama app & benchmark
+    global _fake_sheet
+    with _fake_lock:
+        if _fake_sheet is None:
+            _fake_sheet = FakeSheet()
+        _fake_sheet.configure(**settings)
+        return _fake_sheet
+
+
+# ---- Sheet palsu lewat HTTP ----
+class HttpSheet:
+    def __init__(self, url, timeout=30.0):
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+
+    def _call(self, method, path, payload=None):
+        data = json.dumps(payload).encode("utf-8") if payload is not None else None
+        request = urllib.request.Request(self.url + path, data=data, method=method,
+                                         headers={"Content-Type": "application/json"})
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return json.loads(response.read() or b"null")
+        except urllib.error.HTTPError as e:
+            raise FakeSheetError(e.code, e.read().decode("utf-8", "replace")) from None
+
+    def get_all_values(self):
+        return self._call("GET", "/values")
+
+    def append_row(self, row, **kwargs):
+        return self.append_rows([row])
+
+    def append_rows(self, rows, **kwargs):
+        return self._call("POST", "/append_rows", {"rows": rows})
+
+    def batch_update(self, data, **kwargs):
+        return self._call("POST", "/batch_update", {"data": list(data)})
+
+    def snapshot(self):
+        return self._call("GET", "/stats")
+
+
+def serve(sheet, host="127.0.0.1", port=8765):
+    class Handler(BaseHTTPRequestHandler):
+        def _reply(self, status, body):
+            payload = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def _handle(self, action):
+            try:
+                self._reply(200, action())
+            except FakeSheetError as e:
+                self._reply(e.response.status_code, {"error": str(e)})
+
+        def do_GET(self):
+            if self.path == "/values":
+                self._handle(sheet.get_all_values)
+            elif self.path == "/stats":
+                self._handle(sheet.snapshot)
+            else:
+                self._reply(404, {"error": "not found"})
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            if self.path == "/append_rows":
+                self._handle(lambda: sheet.append_rows(body["rows"]))
+            elif self.path == "/batch_update":
+                self._handle(lambda: sheet.batch_update(body["data"]))
+            else:
+                self._reply(404, {"error": "not found"})
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    print(f"Sheet palsu di http://{host}:{server.server_address[1]}")
+    server.serve_forever()
+
+
+# ---- Pemilihan backend ----
+def open_sheet(secrets=None, backend=None):
+    # secrets: st.secrets (hanya dipakai backend gspread)
+    backend = backend or os.environ.get("SHEET_BACKEND", DEFAULT_BACKEND)
+    if backend == "fake":
+        return fake_sheet()
+    if backend.startswith(("http://", "https://")):
+        return HttpSheet(backend)
+    if backend != "gspread":
+        raise ValueError(f"SHEET_BACKEND tidak dikenal: {backend}")
+
+    import gspread
+    from google.oauth2.service_account import Credentials
+
+    # Ambil kredensial dari secrets Streamlit (bukan file JSON lokal)
+    creds = Credentials.from_service_account_info(dict(secrets["gcp_service_account"]), scopes=SCOPE)
+    client = gspread.authorize(creds)
+    return client.open(SHEET_NAME).sheet1
+
+
+# ---- Uji beban sinkronisasi ----
+def load_test(sheet, rows=5_000, annotators=2, rounds=3, change_rate=0.2, seed=0, timeout=600.0):
+    # Kirim `rows` anotasi per anotator lewat SheetWriter (beberapa putaran, sebagian
+    # sentimen berubah) lalu cek: throughput, jumlah retry, dan duplikat di Sheet
+    import tempfile
+
+    from gsheet_sync import SHEET_COLUMNS
+    from gsheet_writer import SheetWriter
+
+    rng = random.Random(seed)
+    work = tempfile.mkdtemp(prefix="sheet_load_")
+    previous_dir = os.getcwd()
+    os.chdir(work)
+    try:
+        writer = SheetWriter(lambda: sheet, flush_interval=0.2, base_backoff=0.1, max_backoff=2.0)
+        names = [f"Anotator {i + 1}" for i in range(annotators)]
+        latest = {}
+        sent = 0
+        started = time.perf_counter()
+        for round_number in range(rounds):
+            for name in names:
+                batch = []
+                for i in range(rows):
+                    if round_number and rng.random() >= change_rate:
+                        continue
+                    annotation = {"tweet_id": f"t{i:07d}", "tweet": f"tweet {i}", "aspek": "Transparansi",
+                                  "sentimen": rng.choice(["Positif", "Negatif", "Netral"])}
+                    latest[(name, annotation["tweet_id"])] = annotation["sentimen"]
+                    batch.append(annotation)
+                sent += len(batch)
+                writer.enqueue(name, batch)
+            writer.flush_now()
+            deadline = time.monotonic() + timeout
+            while writer.depth() and time.monotonic() < deadline:
+                time.sleep(0.05)
+        elapsed = time.perf_counter() - started
+        status = writer.status()
+        writer.stop(timeout=5)
+    finally:
+        os.chdir(previous_dir)
+
+    values = sheet.get_all_values()
+    keys = [(row[SHEET_COLUMNS.index("annotator")], row[SHEET_COLUMNS.index("tweet_id")]) for row in values if row]
+    stale = sum(1 for row in values if row and latest.get(
+        (row[SHEET_COLUMNS.index("annotator")], row[SHEET_COLUMNS.index("tweet_id")])
+    ) != row[SHEET_COLUMNS.index("sentimen")])
+    return {
+        "seconds": round(elapsed, 2),
+        "rows_sent": sent,
+        "rows_per_second": round(sent / max(elapsed, 1e-9), 1),
+        "unique_rows": len(latest),
+        "sheet_rows": len(values),
+        "duplicates": len(keys) - len(set(keys)),
+        "stale_rows": stale,
+        "pending": status["depth"],
+        "sheet": sheet.snapshot(),
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Sheet palsu untuk uji offline / uji beban sinkronisasi")
+    parser.add_argument("command", choices=["serve", "load"])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--url", default=None, help="load: pakai sheet HTTP ini, bukan sheet di memori")
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--quota-rate", type=float, default=0.0)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--partial-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--rows", type=int, default=5_000)
+    parser.add_argument("--annotators", type=int, default=2)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    faults = dict(latency=args.latency, quota_rate=args.quota_rate, failure_rate=args.failure_rate,
+                  partial_rate=args.partial_rate, seed=args.seed)
+    if args.command == "serve":
+        serve(FakeSheet(**faults), args.host, args.port)
+    else:
+        target = HttpSheet(args.url) if args.url else FakeSheet(**faults)
+        print(json.dumps(load_test(target, args.rows, args.annotators, args.rounds), indent=2))
@@ -0,0 +1,175 @@
+import json
+import os
+import zlib
+
+import numpy as np
+
+from corpus_cache import normalize_text, save_array
+
+# ==== Index tweet: ID stabil + deduplikasi ====
+# Setiap baris korpus dipetakan ke satu baris "kanonik" (kemunculan pertama
+# dari kelompok duplikatnya). ID tweet yang dipakai app = ID baris kanonik,
+# sehingga:
+#   - duplikat persis (setelah normalisasi) dan hampir persis (MinHash/LSH,
+#     Jaccard shingle >= NEAR_DUP_THRESHOLD) cukup dilabeli sekali;
+#   - satu label otomatis berlaku untuk semua anggota kelompok;
+#   - label tidak bergeser walaupun urutan ASPECT_FILES berubah.
+# Hasil pengelompokan disimpan di folder cache korpus (canonical.npy).
+
+NUM_PERM = 64
+BANDS = 16
+SHINGLE_SIZE = 3
+NEAR_DUP_THRESHOLD = 0.8
+
+_PRIME = 4294967311  # prima > 2^32
+_SEED = 20241021
+
+
+def shingles(text, size=SHINGLE_SIZE):
+    tokens = normalize_text(text).split()
+    if len(tokens) <= size:
+        return {" ".join(tokens)}
+    return {" ".join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)}
+
+
+def _minhash_params(num_perm):
+    rng = np.random.default_rng(_SEED)
+    a = rng.integers(1, 2**31, size=num_perm, dtype=np.uint64)
+    b = rng.integers(0, 2**31, size=num_perm, dtype=np.uint64)
+    return a, b
+
+
+def minhash_signature(shingle_set, a, b):
+    hashed = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingle_set), dtype=np.uint64)
+    # (a * x + b) mod p untuk semua permutasi sekaligus: matriks perm x shingle
+    return ((np.outer(a, hashed) + b[:, None]) % _PRIME).min(axis=1)
+
+
+def _jaccard(left, right):
+    return len(left & right) / len(left | right) if left or right else 1.0
+
+
+def find_duplicates(texts, threshold=NEAR_DUP_THRESHOLD, num_perm=NUM_PERM, bands=BANDS):
+    # Kembalikan array canonical: canonical[i] = baris pertama di kelompok baris i
+    parent = list(range(len(texts)))
+
+    def root(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def union(i, j):
+        ri, rj = root(i), root(j)
+        if ri != rj:
+            parent[max(ri, rj)] = min(ri, rj)
+
+    # 1) Duplikat persis setelah normalisasi
+    first_seen = {}
+    for i, text in enumerate(texts):
+        key = normalize_text(text)
+        if key in first_seen:
+            union(first_seen[key], i)
+        else:
+            first_seen[key] = i
+
+    # 2) Hampir persis: MinHash + LSH banding, kandidat diverifikasi Jaccard
+    a, b = _minhash_params(num_perm)
+    rows_per_band = num_perm // bands
+    unique_rows = sorted(first_seen.values())
+    shingle_sets = {i: shingles(texts[i]) for i in unique_rows}
+    buckets = {}
+    for i in unique_rows:
+        signature = minhash_signature(shingle_sets[i], a, b)
+        for band in range(bands):
+            band_key = (band, signature[band * rows_per_band:(band + 1) * rows_per_band].tobytes())
+            buckets.setdefault(band_key, []).append(i)
+    checked = set()
+    for members in buckets.values():
+        for pos, i in enumerate(members):
+            for j in members[pos + 1:]:
+                if (i, j) in checked or root(i) == root(j):
+                    continue
+                checked.add((i, j))
+                if _jaccard(shingle_sets[i], shingle_sets[j]) >= threshold:
+                    union(i, j)
+
+    return np.array([root(i) for i in range(len(texts))], dtype=np.int64)
+
+
+class TweetIndex:
+    def __init__(self, corpus, threshold=NEAR_DUP_THRESHOLD):
+        self.corpus = corpus
+        self.threshold = threshold
+        self.canonical = self._load_or_build()
+        # Anggota tiap kelompok berurutan di _order, batasnya lewat searchsorted
+        self._order = np.argsort(self.canonical, kind="stable")
+        self._sorted = self.canonical[self._order]
+        self.unique_rows = np.flatnonzero(self.canonical == np.arange(len(self.canonical)))
+
+    def _load_or_build(self):
+        path = os.path.join(self.corpus.cache_dir, "canonical.npy")
+        meta_path = os.path.join(self.corpus.cache_dir, "canonical.json")
+        key = {"sources": self.corpus.meta["sources"], "threshold": self.threshold,
+               "num_perm": NUM_PERM, "bands": BANDS, "shingle": SHINGLE_SIZE}
+        if os.path.exists(path) and os.path.exists(meta_path):
+            with open(meta_path, "r", encoding="utf-8") as f:
+                if json.load(f) == key:
+                    return np.load(path)
+        texts = [self.corpus.text(i) for i in range(len(self.corpus))]
+        canonical = find_duplicates(texts, self.threshold)
+        save_array(path, canonical)
+        with open(meta_path, "w", encoding="utf-8") as f:
+            json.dump(key, f)
+        return canonical
+
+    # ---- Baris -> ID ----
+    def canonical_row(self, row):
+        return int(self.canonical[row])
+
+    def tweet_id(self, row):
+        return self.corpus.tweet_id(self.canonical_row(row))
+
+    def group(self, row):
+        # Semua baris (termasuk row sendiri) yang berbagi label dengan row
+        canonical = self.canonical[row]
+        start = np.searchsorted(self._sorted, canonical, side="left")
+        end = np.searchsorted(self._sorted, canonical, side="right")
+        return [int(i) for i in self._order[start:end]]
+
+    def unique_ids(self):
+        return [self.corpus.tweet_id(int(row)) for row in self.unique_rows]
+
+    def next_unique_row(self, row):
+        # Baris kanonik berikutnya setelah row: duplikat dilewati saat "Selanjutnya"
+        position = np.searchsorted(self.unique_rows, row, side="right")
+        return int(self.unique_rows[position]) if position < len(self.unique_rows) else None
+
+    @property
+    def unique_count(self):
+        return len(self.unique_rows)
+
+    # ---- ID -> baris ----
+    def row_of(self, tweet_id):
+        row = self.corpus.index_of(tweet_id)
+        return None if row is None else self.canonical_row(row)
+
+    def rows_for_ids(self, tweet_ids):
+        # Propagasi label: ID yang sudah berlabel menandai seluruh kelompoknya
+        rows = set()
+        for tweet_id in tweet_ids:
+            row = self.row_of(str(tweet_id))
+            if row is not None:
+                rows.update(self.group(row))
+        return rows
+
+
+def migrate_positional_ids(store, index):
+    # Label lama memakai tweet_id = posisi baris + 1; ubah ke ID stabil
+    mapping = {}
+    for tweet_id in store.positional_tweet_ids():
+        if 1 <= tweet_id <= len(index.corpus):
+            mapping[tweet_id] = index.tweet_id(tweet_id - 1)
+    if mapping:
+        store.rename_tweet_ids(mapping)
+    return mapping
@@ -0,0 +1,23 @@
+import os
+import re
+
+# ==== Folder kerja per anotator ====
+# Semua file lokal milik seorang anotator (journal draft, backup ekspor)
+# disimpan di state/<slug-nama>/ supaya beberapa anotator bisa menjalankan
+# app yang sama dari satu checkout tanpa saling menimpa progress.
+
+STATE_DIR = "state"
+
+
+def annotator_slug(annotator_name):
+    return re.sub(r"[^a-z0-9]+", "_", annotator_name.lower()).strip("_") or "anon"
+
+
+def annotator_dir(annotator_name):
+    path = os.path.join(STATE_DIR, annotator_slug(annotator_name))
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def annotator_path(annotator_name, filename):
+    return os.path.join(annotator_dir(annotator_name), filename)